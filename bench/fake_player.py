@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Fake audio player for benchmarks.
+
+Reads audio from the files given as arguments (or takes non-file arguments
+as text, like `say`), otherwise from stdin, and appends one
+JSON line to $FAKE_PLAYER_LOG with the wall-clock time the first byte arrived,
+the time input ended and the byte count. FAKE_PLAYER_BYTES_PER_SEC simulates
+playback duration. Unknown options (e.g. ffplay's -nodisp) are ignored, so it
+can stand in for afplay, ffplay, aplay or say.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def main():
+    started = time.time()
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+    paths = [arg for arg in args if os.path.exists(arg)]
+    first_byte = None
+    total = 0
+
+    if paths:
+        streams = [open(path, "rb") for path in paths]
+    elif args:
+        # say-style invocation: the text itself is the input
+        streams = []
+        first_byte = started
+        total = len(" ".join(args).encode())
+    else:
+        streams = [sys.stdin.buffer]
+
+    for stream in streams:
+        while True:
+            chunk = stream.read1(65536) if hasattr(stream, "read1") else stream.read(65536)
+            if not chunk:
+                break
+            if first_byte is None:
+                first_byte = time.time()
+            total += len(chunk)
+
+    rate = float(os.getenv("FAKE_PLAYER_BYTES_PER_SEC", "0"))
+    if rate:
+        time.sleep(total / rate)
+
+    log_path = os.getenv("FAKE_PLAYER_LOG")
+    if log_path:
+        record = {
+            "argv": sys.argv[1:],
+            "started": started,
+            "first_byte": first_byte,
+            "ended": time.time(),
+            "bytes": total,
+        }
+        with open(log_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
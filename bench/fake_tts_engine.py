@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Fake local TTS engine for benchmarks and manual testing.
+
+Accepts the command lines lib/tts_backends.py uses for espeak-ng (--stdout),
+pico2wave (-w FILE), say (-o FILE) and piper (--output_file FILE, text on
+stdin), and writes a short silent WAV to the output file or stdout. FAKE_TTS_DELAY simulates
+synthesis time in seconds, FAKE_TTS_FAIL=1 makes it exit with an error, and
+every call is appended as a JSON line to $FAKE_TTS_LOG.
+"""
+
+import json
+import os
+import struct
+import sys
+import time
+
+SAMPLE_RATE = 16000
+
+
+def silent_wav(seconds: float = 0.1) -> bytes:
+    """A mono 16-bit PCM WAV file of silence."""
+    data = b"\x00\x00" * int(SAMPLE_RATE * seconds)
+    header = struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + len(data), b"WAVE", b"fmt ", 16,
+                         1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16, b"data", len(data))
+    return header + data
+
+
+def main():
+    started = time.time()
+    args = sys.argv[1:]
+    output = None
+    for flag in ("-w", "-o", "--output_file"):
+        if flag in args and args.index(flag) + 1 < len(args):
+            output = args[args.index(flag) + 1]
+
+    to_stdout = "--stdout" in args
+    text = " ".join(arg for arg in args if not arg.startswith("-") and arg != output)
+    if "--output_file" in args:
+        text = sys.stdin.read()
+
+    time.sleep(float(os.getenv("FAKE_TTS_DELAY", "0")))
+    failed = os.getenv("FAKE_TTS_FAIL") == "1"
+    if output and not failed:
+        with open(output, "wb") as f:
+            f.write(silent_wav())
+    elif to_stdout and not failed:
+        sys.stdout.buffer.write(silent_wav())
+
+    log_path = os.getenv("FAKE_TTS_LOG")
+    if log_path:
+        record = {"engine": os.path.basename(sys.argv[0]), "argv": args, "text": text,
+                  "started": started, "ended": time.time(), "failed": failed}
+        with open(log_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    sys.exit(1 if failed or not (output or to_stdout) else 0)
+
+
+if __name__ == "__main__":
+    main()
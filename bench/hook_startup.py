@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Claude Code hook entry points.
+
+Runs each hook script with `python -X importtime` against a sample payload,
+in an isolated HOME with fake `say`/`afplay` binaries and no OpenAI key, and
+fails if the wall-clock time goes over the budget in startup_budget.json or
+if a forbidden (non-stdlib) module gets imported on the fast path.
+
+The budget is each hook's baseline_ms (measured on a quiet machine) times
+the config's headroom factor. It is checked against the minimum of the runs
+by default ("statistic": "min"): other processes only ever add time to a
+cold start, so the fastest run is the most repeatable estimate of the
+hook's own cost. "median" is also accepted.
+
+Usage:
+    bench/hook_startup.py
+    bench/hook_startup.py --python ~/.claude/.venv/bin/python --runs 15
+    bench/hook_startup.py --json results.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+HOOKS_DIR = BENCH_DIR.parent / "dot-claude" / "hooks"
+DEFAULT_CONFIG = BENCH_DIR / "startup_budget.json"
+
+
+def parse_importtime(stderr: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Parse `-X importtime` output.
+
+    Args:
+        stderr: Captured stderr of the hook process
+
+    Returns:
+        Tuple of (total self time in microseconds, cumulative time per module)
+    """
+    total = 0
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2].strip()
+        total += self_us
+        cumulative[name] = cumulative_us
+    return total, cumulative
+
+
+def make_fake_bin(directory: Path) -> Path:
+    """Create no-op `say` and `afplay` binaries so no audio is produced."""
+    bin_dir = directory / "bin"
+    bin_dir.mkdir()
+    for name in ("say", "afplay"):
+        path = bin_dir / name
+        path.write_text("#!/bin/sh\nexit 0\n")
+        path.chmod(0o755)
+    return bin_dir
+
+
+def run_hook(python: str, hook: str, payload: Dict[str, Any], env: Dict[str, str]) -> Tuple[float, int, Dict[str, int]]:
+    """
+    Run one hook invocation.
+
+    Returns:
+        Tuple of (wall time in ms, total import time in us, per-module cumulative us)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [python, "-X", "importtime", str(HOOKS_DIR / f"{hook}.py")],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    if '"continue": true' not in result.stdout:
+        raise RuntimeError(f"{hook} hook returned unexpected output: {result.stdout!r}")
+
+    import_us, modules = parse_importtime(result.stderr)
+    return wall_ms, import_us, modules
+
+
+def bench_hook(python: str, hook: str, spec: Dict[str, Any], runs: int,
+               env: Dict[str, str], forbidden: List[str],
+               statistic: str = "min", headroom: float = 1.0) -> Dict[str, Any]:
+    """Benchmark one hook and compare its min or median time against its budget."""
+    walls, imports = [], []
+    modules: Dict[str, int] = {}
+    for _ in range(runs):
+        wall_ms, import_us, modules = run_hook(python, hook, spec["payload"], env)
+        walls.append(wall_ms)
+        imports.append(import_us / 1000)
+
+    own = {name: us for name, us in modules.items() if name.startswith("lib.")}
+    median_ms = statistics.median(walls)
+    measured_ms = min(walls) if statistic == "min" else median_ms
+    budget_ms = round(spec["baseline_ms"] * headroom, 1)
+    leaked = sorted(name for name in modules if name.split(".")[0] in forbidden)
+
+    return {
+        "hook": hook,
+        "baseline_ms": spec["baseline_ms"],
+        "budget_ms": budget_ms,
+        "statistic": statistic,
+        "median_ms": round(median_ms, 2),
+        "min_ms": round(min(walls), 2),
+        "max_ms": round(max(walls), 2),
+        "median_import_ms": round(statistics.median(imports), 2),
+        "lib_modules_us": dict(sorted(own.items(), key=lambda item: -item[1])),
+        "forbidden_imports": leaked,
+        "passed": measured_ms <= budget_ms and not leaked,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hook cold-start time")
+    parser.add_argument("--python", default=sys.executable,
+                        help="Interpreter used by the hooks (default: current)")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG),
+                        help="Budget configuration file")
+    parser.add_argument("--runs", type=int, help="Runs per hook (overrides config)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    config = json.loads(Path(args.config).read_text())
+    runs = args.runs or config.get("runs", 5)
+    forbidden = config.get("forbidden_modules", [])
+    statistic = config.get("statistic", "min")
+    headroom = config.get("headroom", 1.0)
+
+    with tempfile.TemporaryDirectory(prefix="hook-bench-") as tmp:
+        tmp_path = Path(tmp)
+        env = dict(os.environ)
+        env.pop("OPENAI_API_KEY", None)
+        env["HOME"] = str(tmp_path)
+        env["CLAUDE_HOOKD_SOCKET"] = str(tmp_path / "no-daemon.sock")
+        env["PATH"] = f"{make_fake_bin(tmp_path)}{os.pathsep}{env.get('PATH', '')}"
+        (tmp_path / ".claude").mkdir()
+
+        results = [
+            bench_hook(args.python, hook, spec, runs, env, forbidden, statistic, headroom)
+            for hook, spec in config["hooks"].items()
+        ]
+
+    for result in results:
+        status = "ok" if result["passed"] else "FAIL"
+        print(f"{result['hook']:<14} min {result['min_ms']:>7.1f} ms  median {result['median_ms']:>7.1f} ms "
+              f"(budget {result['budget_ms']} ms on {result['statistic']}, "
+              f"imports {result['median_import_ms']:.1f} ms) {status}")
+        for name, us in list(result["lib_modules_us"].items())[:5]:
+            print(f"    {name:<32} {us / 1000:>6.2f} ms")
+        if result["forbidden_imports"]:
+            print(f"    forbidden imports: {', '.join(result['forbidden_imports'])}")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+    sys.exit(0 if all(result["passed"] for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI speech endpoint.
+
+Serves POST /v1/audio/speech with a chunked audio body, with configurable
+time-to-first-byte, chunk size, chunk count and inter-chunk delay. A
+fraction of requests (error_rate) can be answered with an error status
+instead, to exercise fallbacks. Point the hooks at it with
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any OPENAI_API_KEY.
+
+Usage:
+    bench/mock_tts_server.py --port 8765 --first-byte-delay 0.2 --chunk-delay 0.05
+    bench/mock_tts_server.py --error-rate 0.2 --error-status 429
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+
+
+DEFAULT_CONFIG = {
+    "first_byte_delay": 0.0,
+    "chunk_size": 4096,
+    "chunks": 8,
+    "chunk_delay": 0.0,
+    "error_rate": 0.0,
+    "error_status": 500,
+    "seed": None,
+}
+
+
+class MockTTSHandler(BaseHTTPRequestHandler):
+    """Answer speech requests with a synthetic chunked mp3 body."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        config = self.server.config
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests.append({"path": self.path, "body": request, "at": time.time()})
+
+        if self.path.rstrip("/") != "/v1/audio/speech":
+            self.send_error(404)
+            return
+
+        time.sleep(config["first_byte_delay"])
+        with self.server.lock:
+            failed = self.server.random.random() < config["error_rate"]
+            self.server.errors += failed
+        if failed:
+            body = json.dumps({"error": {"message": "mock failure"}}).encode()
+            self.send_response(config["error_status"])
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        # MPEG frame sync header followed by filler, so players see mp3-ish data
+        for index in range(config["chunks"]):
+            if index:
+                time.sleep(config["chunk_delay"])
+            body = (b"\xff\xfb\x90\x64" + bytes([index % 256]) * config["chunk_size"])[:config["chunk_size"]]
+            self.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def start_server(port: int = 0, **config: Any) -> ThreadingHTTPServer:
+    """
+    Start the mock server on a background thread.
+
+    Args:
+        port: Port to bind on 127.0.0.1 (0 picks a free one)
+        **config: Overrides for DEFAULT_CONFIG
+
+    Returns:
+        Running server; its base URL is f"http://127.0.0.1:{server.server_port}/v1"
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockTTSHandler)
+    server.daemon_threads = True
+    server.config: Dict[str, Any] = {**DEFAULT_CONFIG, **config}
+    server.requests = []
+    server.errors = 0
+    server.lock = threading.Lock()
+    server.random = random.Random(server.config["seed"])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI speech endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-byte-delay", type=float, default=0.0)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500)
+    args = parser.parse_args()
+
+    server = start_server(
+        args.port,
+        first_byte_delay=args.first_byte_delay,
+        chunk_size=args.chunk_size,
+        chunks=args.chunks,
+        chunk_delay=args.chunk_delay,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    print(f"Mock TTS server on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Claude Code hook libraries.
+
+Measures, on synthetic transcripts of each requested size:
+
+    parse_transcript/<size>              full parse into dicts
+    get_recent_messages/<size>           last 10 entries (reverse tail read)
+    get_recent_messages_roles/<size>     last 10 user/assistant entries (index)
+    find_recent_tool_use/<size>          most recent tool_use (index)
+    notification_message/<size>          generate_enhanced_notification_message
+    completion_message/<size>            generate_completion_message
+
+    index_build/<size>                   one-off sidecar index build
+
+The index-backed readers are measured after the build. It also measures end-to-end hook
+latency by running hooks/notification.py and hooks/stop.py as subprocesses
+against bench/mock_tts_server.py, with bench/fake_player.py standing in for
+afplay and the streaming player and bench/fake_tts_engine.py for say:
+
+    hook/<hook>/detached                 hook returns after queueing speech
+    hook/<hook>/sync                     hook speaks in-process (TTS cache miss)
+
+Results are written as JSON, checked against the thresholds in
+bench/thresholds.json and optionally against a previous results file.
+Exits 1 on any regression. Each threshold is a baseline_ms measured on a
+quiet machine times the file's headroom factor, applied to the median or,
+for the noisy subprocess metrics, to the minimum of the runs ("stat":
+"min_ms"); an explicit max_ms overrides the product.
+
+Usage:
+    bench/run.py
+    bench/run.py --sizes 1k,10k,100k,1M --json results.json
+    bench/run.py --error-rate 0.2 --latency 0.3 --baseline previous.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+LIB_ROOT = BENCH_DIR.parent / "dot-claude"
+HOOKS_DIR = LIB_ROOT / "hooks"
+DEFAULT_THRESHOLDS = BENCH_DIR / "thresholds.json"
+
+sys.path.insert(0, str(BENCH_DIR))
+
+from mock_tts_server import start_server
+from synthetic_transcript import write_transcript
+
+
+def parse_size(text: str) -> int:
+    """Parse '1k', '10k' or '1M' into a line count."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def size_label(lines: int) -> str:
+    if lines >= 1_000_000 and lines % 1_000_000 == 0:
+        return f"{lines // 1_000_000}M"
+    if lines >= 1_000 and lines % 1_000 == 0:
+        return f"{lines // 1_000}k"
+    return str(lines)
+
+
+def timed(fn: Callable[[], Any], repeat: int, max_seconds: float = 10.0) -> Dict[str, Any]:
+    """
+    Run fn up to repeat times (stopping early once max_seconds is spent).
+
+    Returns:
+        Dictionary with median_ms, min_ms, p95_ms and runs
+    """
+    samples = []
+    budget_end = time.perf_counter() + max_seconds
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        if time.perf_counter() > budget_end:
+            break
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+        "runs": len(ordered),
+    }
+
+
+def get_transcript(cache_dir: Path, lines: int, seed: int) -> Path:
+    """Generate (or reuse) a synthetic transcript with the given line count."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"transcript-{lines}-{seed}.jsonl"
+    if not path.exists():
+        tmp_path = path.with_suffix(".tmp")
+        write_transcript(str(tmp_path), lines=lines, seed=seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def bench_transcripts(sizes: List[int], cache_dir: Path, repeat: int, seed: int) -> Dict[str, Any]:
+    """Measure the transcript readers and message generators at each size."""
+    sys.path.insert(0, str(LIB_ROOT))
+    from lib.transcript_parser import parse_transcript, get_recent_messages
+    from lib.tool_context_extractor import find_recent_tool_use
+    from lib.transcript_index import TranscriptIndex
+    from lib.message_generator import generate_enhanced_notification_message, generate_completion_message
+
+    metrics = {}
+    for lines in sizes:
+        label = size_label(lines)
+        path = str(get_transcript(cache_dir, lines, seed))
+        print(f"  transcripts {label} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)", file=sys.stderr)
+
+        notification = {"session_id": "bench", "transcript_path": path, "hook_event_name": "Notification",
+                        "message": "Claude needs your permission to use Bash"}
+        stop = {"session_id": "bench", "transcript_path": path, "hook_event_name": "Stop"}
+
+        metrics[f"parse_transcript/{label}"] = timed(lambda: parse_transcript(path), repeat)
+        metrics[f"get_recent_messages/{label}"] = timed(lambda: get_recent_messages(path, 10), repeat)
+
+        # Building the sidecar index is a one-off per transcript
+        metrics[f"index_build/{label}"] = timed(lambda: TranscriptIndex(path).update(), 1)
+        metrics[f"get_recent_messages_roles/{label}"] = timed(
+            lambda: get_recent_messages(path, 10, roles=["user", "assistant"]), repeat)
+        metrics[f"find_recent_tool_use/{label}"] = timed(lambda: find_recent_tool_use(path), repeat)
+
+        metrics[f"notification_message/{label}"] = timed(
+            lambda: generate_enhanced_notification_message(notification), repeat)
+        metrics[f"completion_message/{label}"] = timed(lambda: generate_completion_message(stop), repeat)
+    return metrics
+
+
+def make_fake_bin(directory: Path) -> Path:
+    """Create afplay and say wrappers around the fake player and fake engine."""
+    bin_dir = directory / "bin"
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    for name, script in (("afplay", "fake_player.py"), ("say", "fake_tts_engine.py")):
+        wrapper = bin_dir / name
+        wrapper.write_text(f"#!/bin/sh\nexec {sys.executable} {BENCH_DIR / script} \"$@\"\n")
+        wrapper.chmod(0o755)
+    return bin_dir
+
+
+def bench_hooks(root: Path, server_url: str, repeat: int, python: str) -> Dict[str, Any]:
+    """Measure hook wall-clock latency in detached and sync speech modes."""
+    bin_dir = make_fake_bin(root)
+    payloads = {
+        "notification": {"session_id": "bench", "transcript_path": "", "hook_event_name": "Notification",
+                         "message": "Claude needs your permission to use Bash"},
+        "stop": {"session_id": "bench", "transcript_path": "", "hook_event_name": "Stop"},
+    }
+
+    metrics = {}
+    for hook, payload in payloads.items():
+        for mode in ("detached", "sync"):
+            print(f"  hook {hook} {mode}", file=sys.stderr)
+            runs = iter(range(repeat))
+
+            def run_hook():
+                # A fresh HOME per run: no daemon, empty TTS cache
+                home = root / f"home-{hook}-{mode}-{next(runs)}"
+                home.mkdir()
+                env = {
+                    **os.environ,
+                    "HOME": str(home),
+                    "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+                    "OPENAI_API_KEY": "bench",
+                    "OPENAI_BASE_URL": server_url,
+                    "CLAUDE_TTS_STREAM_PLAYER": f"{sys.executable} {BENCH_DIR / 'fake_player.py'}",
+                    # Keep a real aplay/paplay sink out of the measurement
+                    "CLAUDE_AUDIO_SINK": "none",
+                    "CLAUDE_HOOKS_SPEECH": mode,
+                }
+                subprocess.run([python, str(HOOKS_DIR / f"{hook}.py")], input=json.dumps(payload).encode(),
+                               env=env, capture_output=True, check=True)
+
+            metrics[f"hook/{hook}/{mode}"] = timed(run_hook, repeat, max_seconds=60)
+    return metrics
+
+
+def limit_ms(limit: Dict[str, Any], headroom: float) -> float:
+    """A threshold's limit: max_ms if set, else baseline_ms times the headroom."""
+    if "max_ms" in limit:
+        return limit["max_ms"]
+    return round(limit["baseline_ms"] * headroom, 3)
+
+
+def check(metrics: Dict[str, Any], thresholds: Dict[str, Any],
+          baseline: Optional[Dict[str, Any]], tolerance: float,
+          headroom: float = 1.0) -> List[str]:
+    """
+    Compare metrics against absolute thresholds and a previous run.
+
+    Args:
+        metrics: Results of this run
+        thresholds: Per-metric baseline_ms (or max_ms) and optional stat
+        baseline: Metrics of a previous run, if any
+        tolerance: Allowed slowdown vs the previous run
+        headroom: Factor applied to each threshold's baseline_ms
+
+    Returns:
+        Human-readable descriptions of every regression
+    """
+    failures = []
+    for name, limit in thresholds.items():
+        result = metrics.get(name)
+        stat = limit.get("stat", "median_ms")
+        if result and result[stat] > limit_ms(limit, headroom):
+            failures.append(f"{name}: {stat[:-3]} {result[stat]:.2f} ms > threshold "
+                            f"{limit_ms(limit, headroom)} ms")
+
+    for name, previous in (baseline or {}).items():
+        result = metrics.get(name)
+        if result and result["median_ms"] > previous["median_ms"] * (1 + tolerance):
+            failures.append(f"{name}: median {result['median_ms']:.2f} ms vs baseline "
+                            f"{previous['median_ms']:.2f} ms (+{tolerance:.0%} allowed)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hook benchmark suite")
+    parser.add_argument("--sizes", default="1k,10k,100k", help="Transcript sizes in lines (e.g. 1k,10k,1M)")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per metric")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cache-dir", default=os.path.join(tempfile.gettempdir(), "claude-bench-transcripts"),
+                        help="Where generated transcripts are kept between runs")
+    parser.add_argument("--python", default=sys.executable, help="Interpreter for the hook subprocesses")
+    parser.add_argument("--latency", type=float, default=0.1, help="Mock TTS time to first byte (s)")
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    parser.add_argument("--chunk-delay", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock TTS requests that fail")
+    parser.add_argument("--skip-hooks", action="store_true", help="Only run the transcript benchmarks")
+    parser.add_argument("--thresholds", default=str(DEFAULT_THRESHOLDS))
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs --baseline")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size]
+    root = Path(tempfile.mkdtemp(prefix="hook-bench-"))
+    os.environ["HOME"] = str(root / "home")
+    os.makedirs(os.environ["HOME"])
+
+    server = start_server(first_byte_delay=args.latency, chunks=args.chunks, chunk_size=args.chunk_size,
+                          chunk_delay=args.chunk_delay, error_rate=args.error_rate, seed=args.seed)
+    try:
+        metrics = bench_transcripts(sizes, Path(args.cache_dir), args.repeat, args.seed)
+        if not args.skip_hooks:
+            metrics.update(bench_hooks(root, f"http://127.0.0.1:{server.server_port}/v1",
+                                       args.repeat, args.python))
+    finally:
+        server.shutdown()
+        # Detached speech workers may still be running against these homes
+        shutil.rmtree(root, ignore_errors=True)
+
+    config = json.loads(Path(args.thresholds).read_text()) if args.thresholds else {}
+    thresholds, headroom = config.get("metrics", {}), config.get("headroom", 1.0)
+    baseline = json.loads(Path(args.baseline).read_text())["metrics"] if args.baseline else None
+    failures = check(metrics, thresholds, baseline, args.tolerance, headroom)
+
+    results = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("json_path",)},
+        "mock_tts": {"requests": len(server.requests), "errors": server.errors},
+        "metrics": metrics,
+        "failures": failures,
+    }
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+    for name, result in metrics.items():
+        limit = thresholds.get(name)
+        print(f"{name:<44} {result['median_ms']:>10.2f} ms  min {result['min_ms']:>10.2f} ms"
+              f"  p95 {result['p95_ms']:>10.2f} ms"
+              + (f"  (max {limit_ms(limit, headroom)} on {limit.get('stat', 'median_ms')[:-3]})"
+                 if limit else ""))
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
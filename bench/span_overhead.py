@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Per-span overhead of the hook timing instrumentation.
+
+Times an empty with-block against the same block wrapped in span(), both
+inside a HookInvocation (recording) and outside one (no-op), and fails if
+the recording overhead exceeds the budget.
+
+Usage:
+    bench/span_overhead.py --iterations 1000000 --budget-us 3
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "dot-claude"))
+
+
+def per_call_ns(fn, iterations: int) -> float:
+    """Best of three runs, in nanoseconds per iteration."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter_ns()
+        fn(iterations)
+        best = min(best, (time.perf_counter_ns() - start) / iterations)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure span() overhead")
+    parser.add_argument("--iterations", type=int, default=1_000_000)
+    parser.add_argument("--budget-us", type=float, default=3.0,
+                        help="Maximum recording overhead per span in microseconds")
+    args = parser.parse_args()
+
+    import lib.hook_logger as hook_logger
+    from lib.hook_events import HookInvocation, span
+
+    # Keep the benchmark's own event out of the real logs
+    hook_logger.default_logger = hook_logger.HookLogger(tempfile.mkdtemp(prefix="span-bench-"))
+
+    def baseline(n):
+        for _ in range(n):
+            pass
+
+    def spans(n):
+        for _ in range(n):
+            with span("stage"):
+                pass
+
+    base = per_call_ns(baseline, args.iterations)
+    idle = per_call_ns(spans, args.iterations) - base
+    with HookInvocation("bench", None):
+        recording = per_call_ns(spans, args.iterations) - base
+
+    print(f"span() outside an invocation: {idle:8.1f} ns")
+    print(f"span() recording:             {recording:8.1f} ns (budget {args.budget_us * 1000:.0f} ns)")
+    sys.exit(0 if recording <= args.budget_us * 1000 else 1)
+
+
+if __name__ == "__main__":
+    main()
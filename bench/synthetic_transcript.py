@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Synthetic Claude Code transcript generator for benchmarks.
+
+Produces JSONL shaped like real session transcripts: user prompts, assistant
+text, assistant tool_use blocks with a realistic tool mix, and user
+tool_result blocks (a few of them errors), with payload sizes in the range
+real Write/Read/Bash traffic produces. Output is deterministic for a seed.
+
+Usage:
+    bench/synthetic_transcript.py out.jsonl --lines 100000
+    bench/synthetic_transcript.py out.jsonl --megabytes 100
+"""
+
+import argparse
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterator, Optional
+
+
+# (tool name, weight)
+TOOL_MIX = [
+    ("Bash", 30), ("Read", 25), ("Edit", 15), ("Grep", 10), ("Write", 5),
+    ("Glob", 5), ("TodoWrite", 5), ("Task", 3), ("WebFetch", 2),
+]
+ERROR_RATE = 0.03
+COMMANDS = ["pytest -q", "git status", "ls -la", "npm test", "make build",
+            "python manage.py migrate", "rg TODO", "docker compose up -d"]
+FILES = [f"src/{pkg}/{name}.py" for pkg in ("api", "core", "utils", "models")
+         for name in ("views", "service", "helpers", "schema", "settings")]
+
+
+def _filler(rng: random.Random, size: int) -> str:
+    words = ("def", "return", "self", "value", "import", "class", "for", "in",
+             "if", "None", "config", "result", "data", "path", "print")
+    out = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        out.append(word)
+        length += len(word) + 1
+    return " ".join(out)
+
+
+def _tool_input(rng: random.Random, tool: str) -> Dict[str, Any]:
+    path = f"/home/dev/project/{rng.choice(FILES)}"
+    if tool == "Bash":
+        command = rng.choice(COMMANDS)
+        return {"command": command, "description": f"Run {command.split()[0]}"}
+    if tool == "Read":
+        return {"file_path": path}
+    if tool == "Edit":
+        return {"file_path": path, "old_string": _filler(rng, 200), "new_string": _filler(rng, 240)}
+    if tool == "Write":
+        return {"file_path": path, "content": _filler(rng, rng.randint(1000, 4000))}
+    if tool in ("Grep", "Glob"):
+        return {"pattern": rng.choice(["TODO", "*.py", "def main", "import os"])}
+    if tool == "TodoWrite":
+        return {"todos": [{"content": _filler(rng, 40), "status": "pending", "id": str(i)} for i in range(3)]}
+    if tool == "Task":
+        return {"description": "Investigate", "prompt": _filler(rng, 600)}
+    return {"url": "https://example.com/docs", "prompt": "Summarize"}
+
+
+def generate_entries(seed: int = 1, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield an endless stream of transcript entries.
+
+    Args:
+        seed: Random seed
+        session_id: Session id to stamp on every entry
+
+    Yields:
+        Transcript entry dictionaries
+    """
+    rng = random.Random(seed)
+    session_id = session_id or str(uuid.UUID(int=rng.getrandbits(128)))
+    clock = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    tools, weights = zip(*TOOL_MIX)
+    parent = None
+
+    def entry(kind: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal clock, parent
+        clock += timedelta(seconds=rng.random() * 5)
+        current = str(uuid.UUID(int=rng.getrandbits(128)))
+        record = {
+            "parentUuid": parent,
+            "isSidechain": False,
+            "userType": "external",
+            "cwd": "/home/dev/project",
+            "sessionId": session_id,
+            "version": "1.0.0",
+            "type": kind,
+            "message": message,
+            "uuid": current,
+            "timestamp": clock.isoformat().replace("+00:00", "Z"),
+        }
+        parent = current
+        return record
+
+    while True:
+        yield entry("user", {"role": "user", "content": _filler(rng, rng.randint(40, 400))})
+
+        for _ in range(rng.randint(1, 8)):
+            if rng.random() < 0.3:
+                yield entry("assistant", {"role": "assistant", "content": [
+                    {"type": "text", "text": _filler(rng, rng.randint(80, 800))}]})
+
+            tool = rng.choices(tools, weights)[0]
+            tool_id = f"toolu_{rng.getrandbits(64):016x}"
+            yield entry("assistant", {"role": "assistant", "content": [
+                {"type": "tool_use", "id": tool_id, "name": tool, "input": _tool_input(rng, tool)}]})
+
+            is_error = rng.random() < ERROR_RATE
+            result = "Error: command failed" if is_error else _filler(rng, rng.randint(100, 3000))
+            yield entry("user", {"role": "user", "content": [
+                {"type": "tool_result", "tool_use_id": tool_id, "content": result, "is_error": is_error}]})
+
+
+def write_transcript(path: str, lines: Optional[int] = None, size_bytes: Optional[int] = None,
+                     seed: int = 1) -> int:
+    """
+    Write a synthetic transcript.
+
+    Args:
+        path: Output file path
+        lines: Number of lines to write
+        size_bytes: Approximate target size (used when lines is None)
+        seed: Random seed
+
+    Returns:
+        Number of lines written
+    """
+    written = 0
+    total = 0
+    with open(path, "w") as f:
+        for item in generate_entries(seed):
+            line = json.dumps(item, separators=(",", ":")) + "\n"
+            f.write(line)
+            written += 1
+            total += len(line)
+            if lines is not None and written >= lines:
+                break
+            if lines is None and size_bytes is not None and total >= size_bytes:
+                break
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Claude transcript")
+    parser.add_argument("output", help="Output JSONL path")
+    parser.add_argument("--lines", type=int, help="Number of lines")
+    parser.add_argument("--megabytes", type=float, help="Approximate size in MB")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.lines is None and args.megabytes is None:
+        parser.error("Give --lines or --megabytes")
+
+    size = int(args.megabytes * 1024 * 1024) if args.megabytes else None
+    count = write_transcript(args.output, args.lines, size, args.seed)
+    print(f"Wrote {count} lines to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Memory and CPU comparison of dict-based and typed transcript decoding.
+
+Generates (or reuses) a synthetic transcript and runs each scenario in a
+fresh interpreter, reporting wall time, peak RSS growth (which includes the
+mmap'd transcript pages the record reader touches) and peak Python heap
+(tracemalloc, measured in a second untimed pass):
+
+    dicts_all        parse_transcript() into a list of dicts
+    records_all      list(iter_records()) of __slots__ records
+    dicts_bash       parse_transcript() then filter Bash tool_use in Python
+    records_bash     iter_records(tool_names=["Bash"]) with byte prefilter
+
+Usage:
+    bench/transcript_records.py --megabytes 100
+    bench/transcript_records.py --transcript existing.jsonl --json out.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+LIB_ROOT = BENCH_DIR.parent / "dot-claude"
+
+SCENARIOS = {
+    "dicts_all": "result = parse_transcript(path)",
+    "records_all": "result = list(iter_records(path))",
+    "dicts_bash": (
+        "result = [m for m in parse_transcript(path) "
+        "if (extract_tool_use_from_message(m) or {}).get('name') == 'Bash']"
+    ),
+    "records_bash": "result = list(iter_records(path, tool_names=['Bash']))",
+}
+
+RUNNER = """
+import resource, sys, time, tracemalloc
+sys.path.insert(0, {lib_root!r})
+from lib.transcript_parser import parse_transcript
+from lib.transcript_records import iter_records
+from lib.tool_context_extractor import extract_tool_use_from_message
+path = {path!r}
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform == "darwin" else 1024
+count = len(result)
+del result
+tracemalloc.start()
+{statement}
+heap = tracemalloc.get_traced_memory()[1]
+print(elapsed, (peak - base) * scale, heap, count)
+"""
+
+
+def run_scenario(name: str, path: str) -> dict:
+    """Run one scenario in a fresh interpreter."""
+    code = RUNNER.format(lib_root=str(LIB_ROOT), path=path, statement=SCENARIOS[name])
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                            text=True, check=True).stdout.split()
+    elapsed, rss, heap, count = float(output[0]), int(output[1]), int(output[2]), int(output[3])
+    return {"scenario": name, "seconds": round(elapsed, 3),
+            "peak_rss_mb": round(rss / 1024 / 1024, 1),
+            "peak_heap_mb": round(heap / 1024 / 1024, 1), "results": count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcript decoding strategies")
+    parser.add_argument("--transcript", help="Existing transcript to use")
+    parser.add_argument("--megabytes", type=float, default=100,
+                        help="Size of the generated transcript (default: 100)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="records-bench-") as tmp:
+        path = args.transcript
+        if not path:
+            sys.path.insert(0, str(BENCH_DIR))
+            from synthetic_transcript import write_transcript
+            path = os.path.join(tmp, "transcript.jsonl")
+            write_transcript(path, size_bytes=int(args.megabytes * 1024 * 1024))
+
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        results = [run_scenario(name, path) for name in SCENARIOS]
+
+    print(f"Transcript: {size_mb:.1f} MB")
+    for result in results:
+        print(f"  {result['scenario']:<14} {result['seconds']:>8.3f} s "
+              f"rss {result['peak_rss_mb']:>7.1f} MB  heap {result['peak_heap_mb']:>7.1f} MB  "
+              f"({result['results']} results)")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-audio benchmark for OpenAI TTS playback.
+
+Runs speak_with_openai against bench/mock_tts_server.py with a slow chunked
+response, once streaming PCM into the in-process audio sink (a FakeSink),
+once streaming into bench/fake_player.py and once through download-then-play,
+and reports when the sink or player received its first byte relative to the
+call.
+
+Usage:
+    bench/tts_streaming.py --chunks 10 --chunk-delay 0.1
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "dot-claude"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from mock_tts_server import start_server
+
+
+def make_fake_afplay(directory: Path) -> Path:
+    """Create an `afplay` wrapper around the fake player."""
+    bin_dir = directory / "bin"
+    bin_dir.mkdir()
+    afplay = bin_dir / "afplay"
+    afplay.write_text(f"#!/bin/sh\nexec {sys.executable} {BENCH_DIR / 'fake_player.py'} \"$@\"\n")
+    afplay.chmod(0o755)
+    return bin_dir
+
+
+def measure(mode: str, text: str, log_path: Path) -> dict:
+    """Speak one uncached phrase and return the fake sink's or player's timings."""
+    import lib.tts_manager as tts_manager
+    from lib.audio_sink import FakeSink, set_sink
+
+    sink = FakeSink() if mode == "sink" else None
+    set_sink(sink)
+    # None re-runs player detection (finds the env override); [] means
+    # "no streaming player", forcing download-then-afplay
+    tts_manager._stream_player = None if mode == "streaming" else []
+
+    log_path.write_text("")
+    started = time.time()
+    ok = tts_manager.speak_with_openai(text)
+    finished = time.time()
+
+    if sink is not None:
+        first_byte = sink.plays[-1]["first_chunk"] if sink.plays else None
+    else:
+        records = [json.loads(line) for line in log_path.read_text().splitlines()]
+        first_byte = records[-1]["first_byte"] if records else None
+    return {
+        "mode": mode,
+        "ok": ok,
+        "first_audio_ms": round((first_byte - started) * 1000, 1) if first_byte else None,
+        "total_ms": round((finished - started) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure TTS time-to-first-audio")
+    parser.add_argument("--first-byte-delay", type=float, default=0.05)
+    parser.add_argument("--chunks", type=int, default=10)
+    parser.add_argument("--chunk-delay", type=float, default=0.1)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    server = start_server(
+        first_byte_delay=args.first_byte_delay,
+        chunks=args.chunks,
+        chunk_delay=args.chunk_delay,
+        chunk_size=args.chunk_size,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="tts-bench-") as tmp:
+        tmp_path = Path(tmp)
+        log_path = tmp_path / "player.jsonl"
+        os.environ.update({
+            "HOME": tmp,
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_port}/v1",
+            "CLAUDE_TTS_STREAM_PLAYER": f"{sys.executable} {BENCH_DIR / 'fake_player.py'}",
+            "FAKE_PLAYER_LOG": str(log_path),
+            "PATH": f"{make_fake_afplay(tmp_path)}{os.pathsep}{os.environ.get('PATH', '')}",
+        })
+
+        import lib.tts_cache as tts_cache
+        tts_cache.default_cache = tts_cache.TTSCache(cache_dir=str(tmp_path / "cache"))
+
+        results = [
+            measure("sink", "sink benchmark phrase", log_path),
+            measure("streaming", "streaming benchmark phrase", log_path),
+            measure("download", "download benchmark phrase", log_path),
+        ]
+
+    server.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,40 +6,39 @@ Stop hook for Claude Code - announces when Claude has finished its work.
 import json
 import sys
 import os
+import time
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from lib.message_generator import generate_completion_message
-from lib.tts_manager import speak_text
-from lib.error_handler import log_error
-from lib.hook_logger import log_hook_input, log_hook_error
+from lib.daemon_client import forward_event
 
 
 def main():
+    data = None
     try:
         # Read input from stdin
+        started = time.perf_counter_ns()
         data = json.load(sys.stdin)
+        timings = {"stdin": (time.perf_counter_ns() - started) / 1_000_000}
 
-        # Log hook input using centralized logger
-        log_hook_input("stop", data)
+        # Let the daemon handle it if one is running, otherwise do it here
+        if not forward_event("stop", data, timings=timings):
+            started = time.perf_counter_ns()
+            from lib.hook_handlers import handle_stop
+            timings["import"] = (time.perf_counter_ns() - started) / 1_000_000
+            handle_stop(data, timings)
 
-        # Generate contextual completion message
-        message = generate_completion_message(data)
-        
-        # Speak the message using improved TTS manager
-        speak_text(message)
-        
         # Return success response
         response = {"continue": True}
         json.dump(response, sys.stdout)
         
     except Exception as e:
-        # Log error and continue
-        log_error(f"Stop hook error: {str(e)}", data)
-        log_hook_error("stop", str(e), data)
+        # Record the failure once (unless the handler already did) and continue
+        from lib.hook_events import record_error
+        record_error("stop", e, data)
         response = {"continue": True}
         json.dump(response, sys.stdout)
         sys.exit(0)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
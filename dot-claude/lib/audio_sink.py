@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Persistent audio output for Claude Code hooks.
+
+Spawning a player per utterance costs a process start and an audio device
+open on every short phrase. A PipeSink instead keeps one raw PCM player
+(aplay, paplay or ffplay) running and writes each utterance's samples into
+its stdin, so audio is handed over in memory and playback of the next
+phrase starts as soon as its bytes arrive. The player is respawned only when
+the sample format changes (e.g., OpenAI's 24 kHz after espeak-ng's
+22.05 kHz) and is closed after CLAUDE_AUDIO_SINK_IDLE seconds without audio
+(default 120) so it does not hold the device forever.
+
+CLAUDE_AUDIO_SINK selects the sink: unset detects a player, 'none' disables
+the sink (engines fall back to playing files), 'fake' records plays in
+memory and appends them to $CLAUDE_AUDIO_SINK_LOG, and anything else is a
+player command line with {rate} and {channels} placeholders.
+"""
+
+import abc
+import io
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+
+
+DEFAULT_IDLE_TIMEOUT = 120.0
+# Audio written per pipe write; bounds how long a cancel can go unnoticed
+WRITE_SECONDS = 0.1
+
+# Raw PCM players reading s16le from stdin, in order of preference
+SINK_COMMANDS = [
+    ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", "{rate}", "-c", "{channels}", "-"],
+    ["paplay", "--raw", "--format=s16le", "--rate={rate}", "--channels={channels}"],
+    ["ffplay", "-nodisp", "-loglevel", "quiet", "-f", "s16le", "-ar", "{rate}",
+     "-ac", "{channels}", "-i", "-"],
+]
+
+
+class PCMFormat(NamedTuple):
+    """Layout of raw PCM samples."""
+
+    rate: int
+    channels: int = 1
+    width: int = 2
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * self.width
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.rate * self.frame_bytes
+
+
+# What the OpenAI speech API returns for response_format=pcm
+OPENAI_PCM_FORMAT = PCMFormat(24000)
+
+
+def read_wav(data: bytes) -> Optional[Tuple[PCMFormat, bytes]]:
+    """
+    Split WAV file bytes into their format and samples.
+
+    Args:
+        data: Contents of a WAV file
+
+    Returns:
+        Tuple of (format, PCM bytes), or None if the data is not 16-bit PCM WAV
+    """
+    import wave
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            if wav.getsampwidth() != 2 or wav.getcomptype() != "NONE":
+                return None
+            fmt = PCMFormat(wav.getframerate(), wav.getnchannels())
+            # Engines writing to a pipe leave the length unset; read what is there
+            pcm = wav.readframes(max(wav.getnframes(), len(data)))
+    except (wave.Error, EOFError):
+        return None
+    return fmt, pcm
+
+
+def _slices(chunks: Iterable[bytes], size: int) -> Iterable[bytes]:
+    """Re-cut chunks into pieces of at most size bytes."""
+    for chunk in chunks:
+        for offset in range(0, len(chunk), size):
+            yield chunk[offset:offset + size]
+
+
+class AudioSink(abc.ABC):
+    """Base class: somewhere PCM audio can be played from memory."""
+
+    @abc.abstractmethod
+    def play_stream(self, chunks: Iterable[bytes], fmt: PCMFormat,
+                    cancel: Optional[threading.Event] = None) -> bool:
+        """
+        Play PCM audio as it arrives and wait until it has been heard.
+
+        Args:
+            chunks: PCM bytes, in order
+            fmt: Sample format
+            cancel: Stops playback when set
+
+        Returns:
+            True if all of the audio was played
+        """
+
+    def play(self, pcm: bytes, fmt: PCMFormat, cancel: Optional[threading.Event] = None) -> bool:
+        """Play a complete clip (see play_stream)."""
+        return self.play_stream([pcm], fmt, cancel)
+
+    def stop(self) -> None:
+        """Cut off whatever is playing."""
+
+    def close(self) -> None:
+        """Release the output after letting queued audio finish."""
+
+    def describe(self) -> str:
+        """Short description for `speak.py --probe`."""
+        return type(self).__name__
+
+
+class PipeSink(AudioSink):
+    """One long-lived raw PCM player fed through its stdin."""
+
+    def __init__(self, command: List[str], idle_timeout: Optional[float] = None):
+        """
+        Initialize the sink; the player starts on first use.
+
+        Args:
+            command: Player command line with {rate} and {channels} placeholders
+            idle_timeout: Seconds without audio before the player is closed
+                (defaults to CLAUDE_AUDIO_SINK_IDLE or 120)
+        """
+        self.command = command
+        if idle_timeout is None:
+            try:
+                idle_timeout = float(os.getenv("CLAUDE_AUDIO_SINK_IDLE", DEFAULT_IDLE_TIMEOUT))
+            except ValueError:
+                idle_timeout = DEFAULT_IDLE_TIMEOUT
+        self.idle_timeout = idle_timeout
+        self._lock = threading.RLock()
+        self._proc = None
+        self._fmt: Optional[PCMFormat] = None
+        # When the audio written so far should have finished playing
+        self._busy_until = 0.0
+        self._last_used = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._atexit = False
+
+    def _spawn(self, fmt: PCMFormat):
+        """Start the player for a format, closing one for another format."""
+        if self._proc is not None and self._proc.poll() is None and self._fmt == fmt:
+            return self._proc
+        self.close()
+
+        import subprocess
+        command = [arg.format(rate=fmt.rate, channels=fmt.channels) for arg in self.command]
+        self._proc = subprocess.Popen(command, stdin=subprocess.PIPE, bufsize=0,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._fmt = fmt
+        self._busy_until = 0.0
+        if not self._atexit:
+            import atexit
+            atexit.register(self.close)
+            self._atexit = True
+        return self._proc
+
+    def play_stream(self, chunks: Iterable[bytes], fmt: PCMFormat,
+                    cancel: Optional[threading.Event] = None) -> bool:
+        piece = max(fmt.frame_bytes, int(fmt.bytes_per_second * WRITE_SECONDS) // fmt.frame_bytes * fmt.frame_bytes)
+        with self._lock:
+            started = None
+            written = 0
+            try:
+                for data in _slices(chunks, piece):
+                    if cancel is not None and cancel.is_set():
+                        self.stop()
+                        return False
+                    proc = self._spawn(fmt)
+                    if started is None:
+                        started = max(time.monotonic(), self._busy_until)
+                    proc.stdin.write(data)
+                    written += len(data)
+            except (OSError, ValueError):
+                self.stop()
+                return False
+            except BaseException:
+                # e.g., Ctrl-C in speak.py: don't leave the player talking
+                self.stop()
+                raise
+
+            if not written:
+                return False
+            self._busy_until = started + written / fmt.bytes_per_second
+            try:
+                return self._wait(cancel)
+            finally:
+                self._last_used = time.monotonic()
+                self._schedule_close()
+
+    def _wait(self, cancel: Optional[threading.Event]) -> bool:
+        """Wait until the written audio should have been heard."""
+        try:
+            while True:
+                remaining = self._busy_until - time.monotonic()
+                if remaining <= 0:
+                    return True
+                if cancel is not None and cancel.is_set():
+                    self.stop()
+                    return False
+                if self._proc is None or self._proc.poll() is not None:
+                    return False
+                time.sleep(min(0.01, remaining))
+        except BaseException:
+            self.stop()
+            raise
+
+    def _schedule_close(self) -> None:
+        """(Re)arm the idle timer."""
+        if self.idle_timeout is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.idle_timeout, self._close_if_idle)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _close_if_idle(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self._last_used >= self.idle_timeout:
+                self.close()
+        finally:
+            self._lock.release()
+
+    def stop(self) -> None:
+        # Not under the lock: this is how another thread interrupts play_stream()
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        self._busy_until = 0.0
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            # The player exits once it has played what is still buffered
+            proc.wait(timeout=max(0.0, self._busy_until - time.monotonic()) + 1.0)
+        except Exception:
+            proc.kill()
+            proc.wait()
+        self._busy_until = 0.0
+
+    def describe(self) -> str:
+        return " ".join(self.command)
+
+
+class FakeSink(AudioSink):
+    """Records plays instead of making sound; for tests and benchmarks."""
+
+    def __init__(self, log_path: Optional[str] = None, realtime: bool = False):
+        """
+        Initialize the fake sink.
+
+        Args:
+            log_path: Append each play as a JSON line to this file
+            realtime: Take as long as the audio lasts (so cancel can be tested)
+        """
+        self.log_path = log_path
+        self.realtime = realtime
+        self.plays: List[Dict[str, Any]] = []
+
+    def play_stream(self, chunks: Iterable[bytes], fmt: PCMFormat,
+                    cancel: Optional[threading.Event] = None) -> bool:
+        started = time.time()
+        first_chunk = None
+        total = 0
+        cancelled = False
+        for chunk in chunks:
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+                break
+            if first_chunk is None:
+                first_chunk = time.time()
+            total += len(chunk)
+
+        if self.realtime and not cancelled:
+            ends = time.monotonic() + total / fmt.bytes_per_second
+            while time.monotonic() < ends:
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    break
+                time.sleep(0.005)
+
+        record = {"started": started, "first_chunk": first_chunk, "ended": time.time(),
+                  "bytes": total, "rate": fmt.rate, "channels": fmt.channels,
+                  "seconds": round(total / fmt.bytes_per_second, 3), "cancelled": cancelled}
+        self.plays.append(record)
+        if self.log_path:
+            try:
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                pass
+        return total > 0 and not cancelled
+
+    def describe(self) -> str:
+        return "fake"
+
+
+_sink: Optional[AudioSink] = None
+_sink_resolved = False
+
+
+def create_sink(setting: Optional[str] = None) -> Optional[AudioSink]:
+    """
+    Build the sink named by a CLAUDE_AUDIO_SINK value.
+
+    Args:
+        setting: '', 'none', 'fake' or a player command line (defaults to
+            the environment)
+
+    Returns:
+        The sink, or None if there is none
+    """
+    if setting is None:
+        setting = os.getenv("CLAUDE_AUDIO_SINK", "")
+    setting = setting.strip()
+    if setting.lower() in ("none", "off", "0"):
+        return None
+    if setting.lower() == "fake":
+        return FakeSink(log_path=os.getenv("CLAUDE_AUDIO_SINK_LOG"))
+    if setting:
+        import shlex
+        return PipeSink(shlex.split(setting))
+
+    import shutil
+    command = next((command for command in SINK_COMMANDS if shutil.which(command[0])), None)
+    return PipeSink(command) if command else None
+
+
+def get_sink() -> Optional[AudioSink]:
+    """Get the process-wide sink, creating it on first use."""
+    global _sink, _sink_resolved
+    if not _sink_resolved:
+        _sink = create_sink()
+        _sink_resolved = True
+    return _sink
+
+
+def set_sink(sink: Optional[AudioSink]) -> None:
+    """Replace the process-wide sink (e.g., with a FakeSink in tests)."""
+    global _sink, _sink_resolved
+    if _sink is not None and _sink is not sink:
+        _sink.close()
+    _sink = sink
+    _sink_resolved = True
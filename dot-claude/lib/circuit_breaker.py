@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Cross-process circuit breakers for Claude Code hooks.
+
+Every hook is a fresh process, so without shared state each one would
+rediscover a dead endpoint by waiting for its request to fail. Breaker state
+lives in ~/.claude/.circuit-breakers.json, updated under an flock:
+
+- closed: calls go through; consecutive failures are counted and
+  failure_threshold of them open the breaker
+- open: calls are refused until the cooldown deadline
+- half-open: after the cooldown, exactly one caller (across all processes)
+  is let through as a probe; success closes the breaker, failure opens it
+  again with a doubled cooldown (up to max_cooldown)
+
+Every transition is recorded as a 'circuit' event in the hook logs.
+"""
+
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+
+DEFAULT_STATE_PATH = "~/.claude/.circuit-breakers.json"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """A named breaker whose state is shared by every process."""
+
+    def __init__(self, name: str, state_path: str = DEFAULT_STATE_PATH,
+                 failure_threshold: int = 3, cooldown: float = 30.0,
+                 max_cooldown: float = 600.0, probe_timeout: float = 60.0):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Breaker name (e.g., the backend it guards)
+            state_path: Shared state file (supports ~ expansion)
+            failure_threshold: Consecutive failures that open the breaker
+            cooldown: Seconds the breaker stays open after tripping
+            max_cooldown: Upper bound for the cooldown after failed probes
+            probe_timeout: Seconds after which an unfinished half-open probe
+                is presumed dead and another caller may probe
+        """
+        self.name = name
+        self.state_path = Path(state_path).expanduser()
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_timeout = probe_timeout
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict[str, Any]]:
+        """
+        Hold the state file lock and yield this breaker's state.
+
+        Changes to the yielded dictionary are written back on exit.
+        """
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = b""
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                raw += chunk
+            try:
+                breakers = json.loads(raw) if raw.strip() else {}
+            except ValueError:
+                breakers = {}
+            state = dict(breakers.get(self.name) or {"state": CLOSED, "failures": 0})
+            before = dict(state)
+
+            yield state
+
+            if state != before:
+                breakers[self.name] = state
+                payload = json.dumps(breakers, indent=2).encode()
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, payload)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _transition(self, state: Dict[str, Any], new_state: str, reason: str) -> None:
+        """Change state and record the transition."""
+        old_state = state.get("state", CLOSED)
+        state["state"] = new_state
+        state["changed_at"] = round(time.time(), 3)
+        try:
+            from lib.hook_events import emit_event
+            emit_event("circuit", "transition", breaker=self.name, from_state=old_state,
+                       to_state=new_state, failures=state.get("failures", 0), reason=reason)
+        except Exception:
+            pass
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get the current state without changing it.
+
+        Returns:
+            Dictionary with 'state', 'failures' and, while open, 'retry_at'
+        """
+        try:
+            breakers = json.loads(self.state_path.read_text())
+            return dict(breakers.get(self.name) or {"state": CLOSED, "failures": 0})
+        except (OSError, ValueError):
+            return {"state": CLOSED, "failures": 0}
+
+    def is_blocked(self) -> bool:
+        """
+        Whether a call would be refused right now (read-only check).
+
+        Returns:
+            True while open before the cooldown deadline, or while another
+            caller's half-open probe is running
+        """
+        state = self.status()
+        now = time.time()
+        if state.get("state") == OPEN:
+            return now < state.get("retry_at", 0)
+        if state.get("state") == HALF_OPEN:
+            return now - state.get("probe_started", 0) < self.probe_timeout
+        return False
+
+    def allow(self) -> bool:
+        """
+        Decide whether the caller may make a call.
+
+        After the cooldown this claims the single half-open probe, so a
+        caller that gets True must report back with record_success(),
+        record_failure() or release().
+
+        Returns:
+            True if the call may go ahead
+        """
+        try:
+            with self._locked() as state:
+                now = time.time()
+                current = state.get("state", CLOSED)
+                if current == CLOSED:
+                    return True
+                if current == OPEN:
+                    if now < state.get("retry_at", 0):
+                        return False
+                    self._transition(state, HALF_OPEN, "cooldown elapsed")
+                elif now - state.get("probe_started", 0) < self.probe_timeout:
+                    return False
+                state["probe_started"] = now
+                state["probe_pid"] = os.getpid()
+                return True
+        except OSError:
+            # Without shared state, fail open
+            return True
+
+    def record_success(self) -> None:
+        """Report a successful call; closes the breaker."""
+        try:
+            with self._locked() as state:
+                if state.get("state", CLOSED) != CLOSED:
+                    self._transition(state, CLOSED, "call succeeded")
+                    for key in ("retry_at", "probe_started", "probe_pid", "cooldown"):
+                        state.pop(key, None)
+                state["failures"] = 0
+        except OSError:
+            pass
+
+    def record_failure(self, reason: str = "call failed") -> None:
+        """
+        Report a failed call; may open the breaker.
+
+        Args:
+            reason: What went wrong, for the transition log
+        """
+        try:
+            with self._locked() as state:
+                now = time.time()
+                state["failures"] = state.get("failures", 0) + 1
+                current = state.get("state", CLOSED)
+                if current == HALF_OPEN:
+                    cooldown = min(self.max_cooldown, state.get("cooldown", self.cooldown) * 2)
+                elif current == CLOSED and state["failures"] >= self.failure_threshold:
+                    cooldown = self.cooldown
+                else:
+                    return
+                state["cooldown"] = cooldown
+                state["retry_at"] = round(now + cooldown, 3)
+                state.pop("probe_started", None)
+                state.pop("probe_pid", None)
+                self._transition(state, OPEN, reason)
+        except OSError:
+            pass
+
+    def release(self) -> None:
+        """Give back a half-open probe that ended without a verdict (e.g., cancelled)."""
+        try:
+            with self._locked() as state:
+                if state.get("state") == HALF_OPEN and state.get("probe_pid") == os.getpid():
+                    state.pop("probe_started", None)
+                    state.pop("probe_pid", None)
+        except OSError:
+            pass
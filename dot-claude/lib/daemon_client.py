@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Client side of the hook daemon protocol.
+
+Only imports the standard library so hook scripts can forward their payload
+without paying for the heavier lib modules. Requests and responses are single
+JSON lines exchanged over a Unix domain socket.
+"""
+
+import json
+import os
+from typing import Dict, Any, Optional
+
+
+DEFAULT_SOCKET_PATH = "~/.claude/.hookd.sock"
+DEFAULT_PID_PATH = "~/.claude/.hookd.pid"
+
+
+def get_socket_path() -> str:
+    """
+    Get the daemon socket path.
+
+    Returns:
+        Socket path, honouring the CLAUDE_HOOKD_SOCKET override
+    """
+    return os.path.expanduser(os.getenv("CLAUDE_HOOKD_SOCKET", DEFAULT_SOCKET_PATH))
+
+
+def get_pid_path() -> str:
+    """
+    Get the daemon PID file path.
+
+    Returns:
+        PID file path next to the socket
+    """
+    return os.path.expanduser(DEFAULT_PID_PATH)
+
+
+def send_request(request: Dict[str, Any], timeout: float = 0.25) -> Optional[Dict[str, Any]]:
+    """
+    Send a single request to the daemon and wait for its reply.
+
+    Args:
+        request: Request dictionary (must contain an 'op' key)
+        timeout: Socket timeout in seconds for connect, send and receive
+
+    Returns:
+        Response dictionary, or None if the daemon is unreachable
+    """
+    path = get_socket_path()
+    if not os.path.exists(path):
+        return None
+
+    # Deferred so the no-daemon fallback doesn't pay for the socket module
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+
+            reply = b""
+            while not reply.endswith(b"\n"):
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                reply += chunk
+
+        return json.loads(reply) if reply else None
+    except (OSError, ValueError):
+        return None
+
+
+def forward_event(hook_name: str, data: Dict[str, Any], timeout: float = 0.25,
+                  timings: Optional[Dict[str, float]] = None) -> bool:
+    """
+    Hand a hook payload to the daemon for processing.
+
+    Args:
+        hook_name: Name of the hook (e.g., 'notification', 'stop')
+        data: Hook input payload
+        timeout: Socket timeout in seconds
+        timings: Stage timings (ms) measured in the hook process
+
+    Returns:
+        True if the daemon accepted the event, False if the caller should
+        handle it in-process
+    """
+    request = {"op": "event", "hook": hook_name, "data": data}
+    if timings:
+        request["timings"] = timings
+    response = send_request(request, timeout)
+    return bool(response and response.get("ok"))
+
+
+def is_daemon_running() -> bool:
+    """
+    Check whether the daemon answers on its socket.
+
+    Returns:
+        True if a ping succeeds
+    """
+    response = send_request({"op": "ping"})
+    return bool(response and response.get("ok"))
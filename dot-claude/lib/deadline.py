@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Cooperative deadlines for latency-bounded work in Claude Code hooks.
+
+Work that must not delay a hook (e.g., digging the pending tool use out of a
+transcript) takes a Deadline and calls check() between units of work. Once
+the budget is spent, check() raises DeadlineExceeded and the caller falls
+back to a cheaper answer.
+"""
+
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised by Deadline.check() once the budget is spent."""
+
+
+class Deadline:
+    """A latency budget measured from construction."""
+
+    __slots__ = ("budget_ms", "_expires")
+
+    def __init__(self, budget_ms: float):
+        """
+        Start the clock.
+
+        Args:
+            budget_ms: Budget in milliseconds
+        """
+        self.budget_ms = budget_ms
+        self._expires = time.perf_counter_ns() + int(budget_ms * 1_000_000)
+
+    def remaining_ms(self) -> float:
+        """Milliseconds left (negative once expired)."""
+        return (self._expires - time.perf_counter_ns()) / 1_000_000
+
+    @property
+    def expired(self) -> bool:
+        """Whether the budget is spent."""
+        return time.perf_counter_ns() >= self._expires
+
+    def check(self) -> None:
+        """
+        Raise if the budget is spent.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if time.perf_counter_ns() >= self._expires:
+            raise DeadlineExceeded(f"deadline of {self.budget_ms:g} ms exceeded")
+
+
+def check_deadline(deadline: Optional[Deadline]) -> None:
+    """Deadline.check() for code where the deadline is optional."""
+    if deadline is not None:
+        deadline.check()
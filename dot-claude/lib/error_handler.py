@@ -9,32 +9,26 @@ import sys
 from typing import Dict, Any, Optional
 
 
-def log_error(error_msg: str, data: Optional[Dict[str, Any]] = None, 
-              error_file: str = "/tmp/hook_error.txt") -> None:
+def log_error(error_msg: str, data: Optional[Dict[str, Any]] = None) -> None:
     """
-    Log error information to a debug file.
+    Log error information as a structured hook event.
+
+    Inside a HookInvocation the error is attached to that invocation's
+    record (see HookInvocation.fail) instead of being written separately.
     
     Args:
         error_msg: Error message to log
-        data: Optional data dictionary to include in log
-        error_file: Path to error log file
+        data: Optional data dictionary, used outside an invocation; only a
+            compact summary is kept, and the record is size-bounded by
+            lib.log_encoder
     """
     try:
-        with open(error_file, "a") as f:
-            f.write(f"Hook error: {error_msg}\n")
-            
-            if data:
-                f.write(f"Hook data: {json.dumps(data, indent=2)}\n")
-                
-                # Log specific context if available
-                if "transcript_path" in data:
-                    f.write(f"Transcript path: {data['transcript_path']}\n")
-                if "message" in data:
-                    f.write(f"Base message: {data['message']}\n")
-                if "session_id" in data:
-                    f.write(f"Session ID: {data['session_id']}\n")
-            
-            f.write("-" * 50 + "\n")
+        from lib.hook_events import current_invocation, emit_event
+        invocation = current_invocation()
+        if invocation is not None:
+            invocation.fail(error_msg)
+            return
+        emit_event("hook", "error", data, error=error_msg)
     except Exception:
         # Silent failure - don't break hook execution
         pass
@@ -77,24 +71,21 @@ def handle_hook_main(hook_function, log_file: str,
     
     Args:
         hook_function: Function that generates the message
-        log_file: File to log hook inputs to
+        log_file: Hook log file name; its stem names the hook in the event log
         default_message: Default message if hook fails
     """
     try:
         # Read input from stdin
         data = json.load(sys.stdin)
         
-        # Log all raw inputs to debug file
-        try:
-            os.makedirs(os.path.dirname(log_file), exist_ok=True)
-            with open(log_file, "a") as f:
-                json.dump(data, f)
-                f.write("\n")
-        except Exception:
-            pass
-        
-        # Generate message using the provided function
-        message = safe_hook_execution(hook_function, data, default_message)
+        # Generate message using the provided function; the invocation is
+        # one event in the hook event log, and errors logged during it
+        # (including a failing hook_function) are attached to that event
+        from lib.hook_events import HookInvocation
+        hook_name = os.path.splitext(os.path.basename(log_file))[0]
+        with HookInvocation(hook_name, data) as event:
+            message = safe_hook_execution(hook_function, data, default_message)
+            event.update(message=message)
         
         # Output the message (hook-specific logic handles TTS)
         # This function just handles the framework
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Long-lived hook daemon for Claude Code hooks.
+
+Listens on a Unix domain socket and processes hook events on a single worker
+thread, so the TTS backends, HTTP session, loggers and caches are loaded once
+instead of on every event. It also runs the speech queue worker, so queued
+utterances are synthesized and played here rather than in a spawned process.
+Hook scripts talk to it through lib.daemon_client.
+"""
+
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from lib.daemon_client import get_socket_path, get_pid_path
+from lib.hook_handlers import HOOK_HANDLERS, handle_hook_event
+from lib.hook_events import record_error
+from lib.hook_logger import flush_logs
+from lib.speech_queue import run_worker
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle one JSON-line request per connection."""
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self.server.daemon.handle_request(request)
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+
+        try:
+            self.wfile.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+        except OSError:
+            pass
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class HookDaemon:
+    """Socket server plus an ordered worker queue for hook events."""
+
+    def __init__(self, socket_path: Optional[str] = None, max_queue: int = 256):
+        """
+        Initialize the daemon.
+
+        Args:
+            socket_path: Path of the Unix socket to listen on
+            max_queue: Maximum number of pending events before new ones are refused
+        """
+        self.socket_path = socket_path or get_socket_path()
+        self.events: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_queue)
+        self.started_at = time.time()
+        self.processed = 0
+        self.failed = 0
+        self._server: Optional[_UnixServer] = None
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Handle a decoded client request.
+
+        Args:
+            request: Request dictionary with an 'op' key
+
+        Returns:
+            Response dictionary
+        """
+        op = request.get("op")
+
+        if op == "event":
+            hook_name = request.get("hook")
+            if hook_name not in HOOK_HANDLERS:
+                return {"ok": False, "error": f"unknown hook: {hook_name}"}
+            try:
+                self.events.put_nowait((hook_name, request.get("data") or {},
+                                        request.get("timings") or {}, time.perf_counter()))
+            except queue.Full:
+                return {"ok": False, "error": "queue full"}
+            return {"ok": True}
+
+        if op == "ping":
+            return {"ok": True}
+
+        if op == "status":
+            return {"ok": True, **self.status()}
+
+        if op == "stop":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+
+        return {"ok": False, "error": f"unknown op: {op}"}
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get runtime statistics.
+
+        Returns:
+            Dictionary with pid, uptime, queue depth and event counters
+        """
+        return {
+            "pid": os.getpid(),
+            "socket": self.socket_path,
+            "uptime": round(time.time() - self.started_at, 1),
+            "queued": self.events.qsize(),
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+    def _worker(self) -> None:
+        """Process queued events one at a time, in arrival order."""
+        while True:
+            item = self.events.get()
+            if item is None:
+                return
+
+            hook_name, data, timings, received = item
+            timings["daemon_queue"] = (time.perf_counter() - received) * 1000
+            try:
+                handle_hook_event(hook_name, data, timings)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                record_error(hook_name, e, data)
+            flush_logs()
+
+    def _speech_worker(self) -> None:
+        """Own the speech queue; retry if a detached worker holds it right now."""
+        while True:
+            run_worker(idle_timeout=None)
+            time.sleep(1.0)
+
+    def _claim(self) -> int:
+        """
+        Lock the PID file and clear a stale socket left by a dead daemon.
+
+        Returns:
+            Descriptor of the locked PID file; the lock is held until exit
+
+        Raises:
+            RuntimeError: If another daemon holds the lock or answers on the socket
+        """
+        import errno
+        import fcntl
+        import socket
+
+        pid_path = get_pid_path()
+        os.makedirs(os.path.dirname(pid_path), exist_ok=True)
+        fd = os.open(pid_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                raise RuntimeError(f"hookd already running (PID file {pid_path} is locked)")
+
+            # A daemon started before the PID lock existed may still be listening
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(0.5)
+                    sock.connect(self.socket_path)
+            except OSError as e:
+                if e.errno == errno.ECONNREFUSED:
+                    os.unlink(self.socket_path)
+                elif e.errno != errno.ENOENT:
+                    raise RuntimeError(f"can't tell whether {self.socket_path} is in use: {e}")
+            else:
+                raise RuntimeError(f"hookd already listening on {self.socket_path}")
+
+            os.ftruncate(fd, 0)
+            os.write(fd, str(os.getpid()).encode())
+            return fd
+        except BaseException:
+            os.close(fd)
+            raise
+
+    def serve_forever(self) -> None:
+        """
+        Claim the PID file, bind the socket and serve until shut down.
+
+        Raises:
+            RuntimeError: If another daemon is already running
+        """
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        pid_fd = self._claim()
+        try:
+            self._server = _UnixServer(self.socket_path, _RequestHandler)
+        except BaseException:
+            os.unlink(get_pid_path())
+            os.close(pid_fd)
+            raise
+        self._server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+
+        worker = threading.Thread(target=self._worker, name="hookd-worker", daemon=True)
+        worker.start()
+        threading.Thread(target=self._speech_worker, name="hookd-speech", daemon=True).start()
+
+        try:
+            self._server.serve_forever()
+        finally:
+            self.events.put(None)
+            worker.join(timeout=5)
+            self._server.server_close()
+            # Unlinked while still locked, so a new daemon can't claim the old file
+            for path in (self.socket_path, get_pid_path()):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            os.close(pid_fd)
+
+    def shutdown(self) -> None:
+        """Stop serving; pending events are drained by the worker first."""
+        if self._server:
+            self._server.shutdown()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Structured event pipeline for Claude Code hooks.
+
+Every hook invocation produces exactly one compact record in
+~/.claude/.hook-logs/hook_events.jsonl with a summary of its input, its
+outcome, any error and its timings. lib.hook_logger and lib.error_handler
+build their records here too, so there is a single format and a single file
+to query (see lib/log_index.py).
+
+High-volume events can be sampled with CLAUDE_HOOK_EVENT_SAMPLE, either a
+single rate ("0.1") or per-hook rates ("notification=0.1,speech=0.5,*=1").
+Errors are always kept; sampled records carry their sample_rate so counts
+can be scaled back up. With CLAUDE_HOOK_LOG_FULL=1 records also carry the
+full hook payload (see lib/log_encoder.py); use it only for debugging.
+
+Code running inside an invocation can time its stages with span() and
+attach tags such as the TTS backend with tag(); both are near no-ops when
+no invocation is active. The active invocation is per thread; work handed
+to another thread collects its spans and tags in a SpanCapture, which the
+invocation's thread merges back. tools/hook_stats.py reports percentiles
+per stage.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from lib.log_encoder import full_logging
+
+
+EVENTS_FILE = "hook_events.jsonl"
+MAX_TEXT = 200
+
+_sample_rates: Optional[Dict[str, float]] = None
+
+
+class _Local(threading.local):
+    # Class-level default: a missing attribute on threading.local costs far
+    # more than a span itself
+    current = None
+
+
+_local = _Local()
+
+
+def summarize_input(data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce a hook payload to the fields worth keeping.
+
+    Args:
+        data: Hook input payload
+
+    Returns:
+        Compact summary (message truncated, transcript path shortened)
+    """
+    if not isinstance(data, dict):
+        return {}
+
+    summary = {}
+    message = data.get("message")
+    if isinstance(message, str):
+        summary["message"] = message if len(message) <= MAX_TEXT else message[:MAX_TEXT] + "…"
+    if data.get("transcript_path"):
+        summary["transcript"] = os.path.basename(str(data["transcript_path"]))
+    for key in ("tool_name", "stop_hook_active"):
+        if key in data:
+            summary[key] = data[key]
+    return summary
+
+
+def get_sample_rate(hook: str) -> float:
+    """
+    Get the sampling rate for a hook's non-error events.
+
+    Args:
+        hook: Hook name
+
+    Returns:
+        Fraction of events to keep (0.0 to 1.0)
+    """
+    global _sample_rates
+    if _sample_rates is None:
+        _sample_rates = {}
+        for part in os.getenv("CLAUDE_HOOK_EVENT_SAMPLE", "").split(","):
+            name, _, rate = part.strip().rpartition("=")
+            try:
+                _sample_rates[name or "*"] = min(1.0, max(0.0, float(rate)))
+            except ValueError:
+                continue
+    return _sample_rates.get(hook, _sample_rates.get("*", 1.0))
+
+
+def make_event(hook: str, outcome: str, data: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None, **fields: Any) -> Optional[Dict[str, Any]]:
+    """
+    Build one event record, applying sampling.
+
+    Args:
+        hook: Hook or component name (e.g., 'notification', 'speech')
+        outcome: What happened (e.g., 'handled', 'error', 'dropped')
+        data: Hook input payload to summarize
+        error: Error description, if any
+        **fields: Extra fields such as message, duration_ms or timings
+
+    Returns:
+        Record dictionary, or None if the event was sampled out
+    """
+    rate = 1.0 if error else get_sample_rate(hook)
+    if rate < 1.0 and int.from_bytes(os.urandom(2), "big") >= rate * 65536:
+        return None
+
+    record: Dict[str, Any] = {"hook": hook, "outcome": outcome}
+    if isinstance(data, dict):
+        for key in ("session_id", "hook_event_name"):
+            if data.get(key) is not None:
+                record[key] = data[key]
+        summary = summarize_input(data)
+        if summary:
+            record["input"] = summary
+        if full_logging():
+            record["payload"] = data
+    if error:
+        record["error"] = error
+    record.update(fields)
+    if rate < 1.0:
+        record["sample_rate"] = rate
+    return record
+
+
+def emit_event(hook: str, outcome: str, data: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None, **fields: Any) -> None:
+    """
+    Build an event record and hand it to the default hook logger.
+
+    Args:
+        hook: Hook or component name
+        outcome: What happened
+        data: Hook input payload to summarize
+        error: Error description, if any
+        **fields: Extra fields
+    """
+    record = make_event(hook, outcome, data, error, **fields)
+    if record is not None:
+        from lib.hook_logger import default_logger
+        default_logger.write_record(EVENTS_FILE, record)
+
+
+def record_error(hook: str, error: BaseException, data: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Record a failed invocation unless the pipeline has already recorded it.
+
+    Args:
+        hook: Hook name
+        error: The exception
+        data: Hook input payload, if it was read
+    """
+    if getattr(error, "hook_event_recorded", False):
+        return
+    emit_event(hook, "error", data, error=str(error), error_type=type(error).__name__)
+    try:
+        error.hook_event_recorded = True
+    except AttributeError:
+        pass
+
+
+class _Span:
+    """Adds the elapsed nanoseconds of a with-block to a timings dict."""
+
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings: Dict[str, int], name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter_ns() - self.start
+        self.timings[self.name] = self.timings.get(self.name, 0) + elapsed
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(stage: str):
+    """
+    Time a stage of the current invocation.
+
+    Usage:
+        with span("synthesize"):
+            audio = fetch(...)
+
+    Repeated spans with the same name add up. Outside an invocation this
+    returns a shared no-op context manager.
+
+    Args:
+        stage: Stage name
+
+    Returns:
+        Context manager
+    """
+    invocation = _local.current
+    if invocation is None:
+        return _NULL_SPAN
+    return _Span(invocation.stage_ns, stage)
+
+
+class SpanCapture:
+    """
+    Collects the spans, tags and errors of work done on another thread.
+
+    Usage (the caller merges only the work whose result it keeps):
+        capture = SpanCapture()
+        # worker thread
+        with capture:
+            audio = synthesize(...)
+        # invocation thread, once the worker is done
+        capture.merge()
+    """
+
+    __slots__ = ("stage_ns", "fields", "errors", "_previous")
+
+    def __init__(self):
+        self.stage_ns: Dict[str, int] = {}
+        self.fields: Dict[str, Any] = {}
+        self.errors: List[str] = []
+        self._previous = None
+
+    def fail(self, error: str) -> None:
+        """Keep an error for the invocation (see HookInvocation.fail)."""
+        self.errors.append(error)
+
+    def __enter__(self) -> "SpanCapture":
+        self._previous = _local.current
+        _local.current = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _local.current = self._previous
+        return False
+
+    def merge(self) -> None:
+        """Add what was collected to the invocation active on this thread."""
+        invocation = _local.current
+        if invocation is None:
+            return
+        for stage, ns in self.stage_ns.items():
+            invocation.stage_ns[stage] = invocation.stage_ns.get(stage, 0) + ns
+        invocation.fields.update(self.fields)
+        for error in self.errors:
+            invocation.fail(error)
+
+
+def current_invocation() -> Optional["HookInvocation"]:
+    """The HookInvocation active on this thread, if any."""
+    return _local.current
+
+
+def tag(**fields: Any) -> None:
+    """Attach fields (e.g., backend='openai', cache='hit') to the current invocation."""
+    invocation = _local.current
+    if invocation is not None:
+        invocation.fields.update(fields)
+
+
+class HookInvocation:
+    """
+    Context manager that records one hook invocation as a single event.
+
+    Usage:
+        with HookInvocation("notification", data) as event:
+            with span("generate"):
+                message = generate(...)
+            event.update(message=message)
+    """
+
+    def __init__(self, hook: str, data: Optional[Dict[str, Any]],
+                 timings: Optional[Dict[str, float]] = None):
+        """
+        Start timing an invocation.
+
+        Args:
+            hook: Hook name
+            data: Hook input payload
+            timings: Stage timings in milliseconds measured before the
+                invocation started (e.g., stdin parsing in the hook process)
+        """
+        self.hook = hook
+        self.data = data
+        self.fields: Dict[str, Any] = {}
+        self.stage_ns: Dict[str, int] = {
+            stage: int(ms * 1_000_000) for stage, ms in (timings or {}).items()
+            if isinstance(ms, (int, float))
+        }
+        self.error: Optional[str] = None
+        self._previous = None
+        self._started = time.perf_counter_ns()
+
+    def update(self, **fields: Any) -> None:
+        """Attach extra fields (e.g., the spoken message) to the record."""
+        self.fields.update(fields)
+
+    def fail(self, error: str) -> None:
+        """
+        Mark the invocation as failed without raising.
+
+        The first error becomes the record's error; later ones are listed
+        in its 'errors' field.
+        """
+        if self.error is None:
+            self.error = error
+        else:
+            self.fields.setdefault("errors", []).append(error)
+
+    def __enter__(self) -> "HookInvocation":
+        self._previous = _local.current
+        _local.current = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _local.current = self._previous
+        duration = (time.perf_counter_ns() - self._started) / 1_000_000
+        fields = dict(self.fields, duration_ms=round(duration, 3))
+        if self.stage_ns:
+            fields["timings"] = {stage: round(ns / 1_000_000, 3) for stage, ns in self.stage_ns.items()}
+
+        try:
+            if exc is not None:
+                emit_event(self.hook, "error", self.data, error=str(exc),
+                           error_type=exc_type.__name__, **fields)
+                exc.hook_event_recorded = True
+            elif self.error:
+                emit_event(self.hook, "error", self.data, error=self.error, **fields)
+            else:
+                emit_event(self.hook, "handled", self.data, **fields)
+        except Exception:
+            pass
+        return False
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Shared event handling for Claude Code hooks.
+
+The same handlers run in-process from the hook scripts and inside the
+long-lived hook daemon (see lib/hook_daemon.py). Speech is handed to the
+background queue in lib/speech_queue.py unless CLAUDE_HOOKS_SPEECH=sync.
+Each invocation is recorded as one event by lib.hook_events, and brings the
+session's activity checkpoint (lib/session_activity.py) up to date.
+"""
+
+import os
+from typing import Dict, Any, Callable, Optional
+
+from lib.message_generator import (
+    classify_notification,
+    generate_enhanced_notification_message,
+    generate_completion_message,
+)
+from lib.hook_events import HookInvocation, span
+
+
+def speak_message(message: str, kind: str = "attention",
+                  session_id: Optional[str] = None) -> None:
+    """
+    Hand a message off for speech.
+
+    Args:
+        message: Text to speak
+        kind: Message kind, used to coalesce bursts
+        session_id: Claude session the message belongs to
+    """
+    if os.getenv("CLAUDE_HOOKS_SPEECH", "detached") == "sync":
+        from lib.tts_manager import speak_text
+        speak_text(message)
+        return
+
+    from lib.speech_queue import enqueue_speech
+    enqueue_speech(message, kind=kind, session_id=session_id)
+
+
+def handle_notification(data: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> None:
+    """
+    Speak the generated message for a Notification event.
+
+    Args:
+        data: Hook input payload
+        timings: Stage timings already measured by the hook process
+    """
+    with HookInvocation("notification", data, timings) as event:
+        with span("generate"):
+            message = generate_enhanced_notification_message(data)
+            kind = classify_notification(data.get("message", ""))
+        with span("enqueue"):
+            speak_message(message, kind, data.get("session_id"))
+        event.update(message=message, kind=kind)
+        # After speech is queued, so Stop only has the remaining tail to read
+        with span("activity"):
+            from lib.session_activity import record_activity
+            record_activity(data.get("transcript_path"))
+
+
+def handle_stop(data: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> None:
+    """
+    Announce completion for a Stop event.
+
+    Args:
+        data: Hook input payload
+        timings: Stage timings already measured by the hook process
+    """
+    with HookInvocation("stop", data, timings) as event:
+        with span("activity"):
+            from lib.session_activity import record_activity, summarize
+            activity = record_activity(data.get("transcript_path"), finish_turn=True)
+        if activity:
+            event.update(turn=summarize(activity))
+        with span("generate"):
+            message = generate_completion_message(data, activity)
+        with span("enqueue"):
+            speak_message(message, "completion", data.get("session_id"))
+        event.update(message=message, kind="completion")
+
+
+HOOK_HANDLERS: Dict[str, Callable[..., None]] = {
+    "notification": handle_notification,
+    "stop": handle_stop,
+}
+
+
+def handle_hook_event(hook_name: str, data: Dict[str, Any],
+                      timings: Optional[Dict[str, float]] = None) -> None:
+    """
+    Dispatch a hook payload to its handler.
+
+    Args:
+        hook_name: Name of the hook (e.g., 'notification', 'stop')
+        data: Hook input payload
+        timings: Stage timings already measured before dispatch
+
+    Raises:
+        KeyError: If no handler is registered for hook_name
+    """
+    HOOK_HANDLERS[hook_name](data, timings)
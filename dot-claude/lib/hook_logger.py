@@ -2,100 +2,242 @@
 Hook logging utilities for Claude Code hooks.
 
 Provides centralized logging functionality for hook input/output data.
+
+Records are buffered in memory and flushed when the buffer grows past
+buffer_bytes, when the oldest buffered record is older than flush_interval,
+and at interpreter exit. Each flush appends to each log file with a single
+O_APPEND write under an advisory lock, so concurrent hook processes never
+interleave records. A log file is rotated when it would grow past max_bytes
+or its segment is older than max_age; rotated segments are gzip-compressed
+and pruned to the newest `keep` segments within `retention`.
+
+Every record gets a logged_at timestamp; lib/log_index.py relies on it.
+The log_hook_* helpers build their records with lib.hook_events, so all
+hook activity lands in one structured log, hook_events.jsonl. Records are
+encoded by lib/log_encoder.py, which clips long strings and caps each record
+at a fixed size however large the tool inputs in the payload are.
 """
 
-import json
+import atexit
+import fcntl
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+from lib.hook_events import EVENTS_FILE, make_event
+from lib.log_encoder import encode_record
+
+
+ROTATED_SUFFIX = ".jsonl.gz"
 
 
 class HookLogger:
     """Centralized logging for Claude Code hooks."""
-    
-    def __init__(self, log_dir: str = "~/.claude/.hook-logs", enabled: bool = True):
+
+    def __init__(self, log_dir: str = "~/.claude/.hook-logs", enabled: bool = True,
+                 buffer_bytes: int = 64 * 1024, flush_interval: float = 2.0,
+                 max_bytes: int = 8 * 1024 * 1024, max_age: float = 7 * 86400,
+                 keep: int = 5, retention: float = 30 * 86400):
         """
         Initialize the hook logger.
-        
+
         Args:
             log_dir: Directory for logging files (supports ~ expansion)
             enabled: Whether logging is enabled
+            buffer_bytes: Buffered bytes that trigger a flush
+            flush_interval: Seconds a record may stay buffered before the next
+                log call flushes it
+            max_bytes: Size at which a log file is rotated
+            max_age: Seconds after which a log file is rotated
+            keep: Number of rotated segments kept per log file
+            retention: Seconds after which rotated segments are deleted
         """
         self.log_dir = Path(log_dir).expanduser()
         self.enabled = enabled
-    
-    def log_hook_input(self, hook_name: str, data: Dict[str, Any]) -> None:
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.retention = retention
+
+        self._buffers: Dict[str, List[bytes]] = {}
+        self._buffered = 0
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self._dir_ready = False
+        atexit.register(self.flush)
+
+    def write_record(self, file_name: str, record: Dict[str, Any]) -> None:
         """
-        Log hook input data to a JSONL file.
-        
+        Buffer one record for a log file, flushing if the buffer is full or old.
+
         Args:
-            hook_name: Name of the hook (e.g., 'notification', 'stop')
-            data: Input data to log
+            file_name: Log file name inside log_dir
+            record: JSON-serializable record
         """
         if not self.enabled:
             return
-            
+
         try:
-            # Create log directory if it doesn't exist
-            self.log_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Write to hook-specific log file
-            log_file = self.log_dir / f"{hook_name}.jsonl"
-            with open(log_file, "a") as f:
-                json.dump(data, f)
-                f.write("\n")
+            line = encode_record({"logged_at": round(time.time(), 3), **record})
         except Exception:
-            # Silently ignore logging errors to avoid breaking hooks
+            return
+
+        with self._lock:
+            self._buffers.setdefault(file_name, []).append(line)
+            self._buffered += len(line)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = (self._buffered >= self.buffer_bytes
+                   or time.monotonic() - self._oldest >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered records, one append per log file."""
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+            self._buffered = 0
+            self._oldest = None
+        if not buffers:
+            return
+
+        try:
+            if not self._dir_ready:
+                self.log_dir.mkdir(parents=True, exist_ok=True)
+                self._dir_ready = True
+        except Exception:
+            return
+
+        for file_name, lines in buffers.items():
+            try:
+                self._write(self.log_dir / file_name, b"".join(lines))
+            except Exception:
+                # Silently ignore logging errors to avoid breaking hooks
+                pass
+
+    def _write(self, path: Path, payload: bytes) -> None:
+        """Append payload to path under an exclusive lock, rotating first if due."""
+        while True:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                # Another writer may have rotated the file while we waited
+                try:
+                    if os.stat(path).st_ino != os.fstat(fd).st_ino:
+                        continue
+                except FileNotFoundError:
+                    continue
+
+                rotated = None
+                if self._rotation_due(path, os.fstat(fd).st_size, len(payload)):
+                    rotated = self._rotate(path)
+                    if rotated:
+                        # Keep holding the old lock until the fresh file is ours
+                        new_fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                        fcntl.flock(new_fd, fcntl.LOCK_EX)
+                        os.close(fd)
+                        fd = new_fd
+
+                os.write(fd, payload)
+            finally:
+                os.close(fd)
+            break
+
+        if rotated:
+            self._compress(rotated)
+            self._prune(path)
+
+    def _marker(self, path: Path) -> Path:
+        """Marker file whose mtime records when the current segment started."""
+        return path.with_name(f".{path.name}.start")
+
+    def _rotation_due(self, path: Path, size: int, incoming: int) -> bool:
+        if size == 0:
+            self._marker(path).touch()
+            return False
+        if size + incoming > self.max_bytes:
+            return True
+        try:
+            started = self._marker(path).stat().st_mtime
+        except FileNotFoundError:
+            self._marker(path).touch()
+            return False
+        return time.time() - started > self.max_age
+
+    def _rotate(self, path: Path) -> Optional[Path]:
+        """Move the live log aside; called with the live file locked."""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        target = path.with_name(f"{path.stem}.{stamp}-{os.getpid()}.jsonl")
+        try:
+            os.rename(path, target)
+        except OSError:
+            return None
+        self._marker(path).touch()
+        return target
+
+    def _compress(self, path: Path) -> None:
+        """Gzip a rotated segment next to itself and remove the original."""
+        import gzip
+        import shutil
+
+        try:
+            tmp_path = path.with_name(f".{path.name}.gz.tmp")
+            with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, path.with_name(path.stem + ROTATED_SUFFIX))
+            os.unlink(path)
+        except OSError:
             pass
-    
+
+    def _prune(self, path: Path) -> None:
+        """Apply the retention policy to rotated segments of one log file."""
+        segments = sorted(path.parent.glob(f"{path.stem}.[0-9]*{ROTATED_SUFFIX}"), reverse=True)
+        cutoff = time.time() - self.retention
+        for index, segment in enumerate(segments):
+            try:
+                if index >= self.keep or segment.stat().st_mtime < cutoff:
+                    segment.unlink()
+            except OSError:
+                pass
+
+    def log_hook_input(self, hook_name: str, data: Dict[str, Any]) -> None:
+        """
+        Log a summary of hook input data as an event.
+
+        Args:
+            hook_name: Name of the hook (e.g., 'notification', 'stop')
+            data: Input data to log
+        """
+        self._emit(make_event(hook_name, "input", data))
+
     def log_hook_output(self, hook_name: str, response: Dict[str, Any]) -> None:
         """
-        Log hook output/response data.
-        
+        Log hook output/response data as an event.
+
         Args:
             hook_name: Name of the hook
             response: Response data to log
         """
-        if not self.enabled:
-            return
-            
-        try:
-            self.log_dir.mkdir(parents=True, exist_ok=True)
-            
-            log_file = self.log_dir / f"{hook_name}_responses.jsonl"
-            with open(log_file, "a") as f:
-                json.dump(response, f)
-                f.write("\n")
-        except Exception:
-            pass
-    
+        self._emit(make_event(hook_name, "output", **response))
+
     def log_hook_error(self, hook_name: str, error: str, data: Optional[Dict[str, Any]] = None) -> None:
         """
         Log hook errors with context.
-        
+
         Args:
             hook_name: Name of the hook
             error: Error message or description
             data: Optional context data
         """
-        if not self.enabled:
-            return
-            
-        try:
-            self.log_dir.mkdir(parents=True, exist_ok=True)
-            
-            error_entry = {
-                "hook": hook_name,
-                "error": error,
-                "context": data
-            }
-            
-            log_file = self.log_dir / "hook_errors.jsonl"
-            with open(log_file, "a") as f:
-                json.dump(error_entry, f)
-                f.write("\n")
-        except Exception:
-            pass
+        self._emit(make_event(hook_name, "error", data, error=error))
+
+    def _emit(self, record: Optional[Dict[str, Any]]) -> None:
+        if record is not None:
+            self.write_record(EVENTS_FILE, record)
 
 
 # Global logger instance with default configuration
@@ -114,4 +256,9 @@ def log_hook_output(hook_name: str, response: Dict[str, Any]) -> None:
 
 def log_hook_error(hook_name: str, error: str, data: Optional[Dict[str, Any]] = None) -> None:
     """Convenience function for logging hook errors."""
-    default_logger.log_hook_error(hook_name, error, data)
\ No newline at end of file
+    default_logger.log_hook_error(hook_name, error, data)
+
+
+def flush_logs() -> None:
+    """Write any buffered records of the default logger."""
+    default_logger.flush()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Size-bounded JSON encoding for hook log records.
+
+Hook payloads can carry whole files (Write content, Edit old_string /
+new_string, long Bash commands), so a record is bounded before it is
+written:
+
+- strings longer than max_string characters are replaced by a prefix, their
+  length and a content hash ("<prefix>… [48213 chars sha1:3f2a9c1d0b7e]"),
+  so identical payloads can still be matched up across records
+- the record is serialized once, compactly; if it still exceeds max_bytes
+  its largest fields are dropped (and listed under 'dropped') until it fits
+
+CLAUDE_LOG_MAX_STRING and CLAUDE_LOG_MAX_RECORD_BYTES override the limits.
+With CLAUDE_HOOK_LOG_FULL=1 (debugging only) records keep the full hook
+payload and are written without limits.
+"""
+
+import json
+import os
+from typing import Dict, Any, Optional
+
+
+DEFAULT_MAX_STRING = 512
+DEFAULT_MAX_RECORD_BYTES = 8192
+PREFIX_CHARS = 128
+# Fields never dropped to meet the byte cap
+ESSENTIAL_FIELDS = ("logged_at", "hook", "outcome", "session_id", "hook_event_name")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def full_logging() -> bool:
+    """Whether full, unbounded payloads should be logged (CLAUDE_HOOK_LOG_FULL=1)."""
+    return os.getenv("CLAUDE_HOOK_LOG_FULL") == "1"
+
+
+def clip_string(text: str, max_string: int = DEFAULT_MAX_STRING) -> str:
+    """
+    Replace an overlong string with its prefix, length and hash.
+
+    Args:
+        text: String to bound
+        max_string: Longest string kept as is
+
+    Returns:
+        The string, or a short stand-in
+    """
+    if len(text) <= max_string:
+        return text
+    import hashlib
+    digest = hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()[:12]
+    return f"{text[:min(PREFIX_CHARS, max_string)]}… [{len(text)} chars sha1:{digest}]"
+
+
+def clip(value: Any, max_string: int = DEFAULT_MAX_STRING) -> Any:
+    """
+    Bound every string in a JSON-like value.
+
+    Containers are only copied when something inside them changed.
+
+    Args:
+        value: Value to bound
+        max_string: Longest string kept as is
+
+    Returns:
+        The value with long strings replaced
+    """
+    if isinstance(value, str):
+        return clip_string(value, max_string) if len(value) > max_string else value
+    if isinstance(value, dict):
+        clipped = {key: clip(item, max_string) for key, item in value.items()}
+        return value if all(clipped[key] is item for key, item in value.items()) else clipped
+    if isinstance(value, (list, tuple)):
+        clipped = [clip(item, max_string) for item in value]
+        return value if all(new is old for new, old in zip(clipped, value)) else clipped
+    return value
+
+
+def _dumps(record: Dict[str, Any]) -> bytes:
+    # Lone surrogates (e.g., from a truncated emoji in a payload) can't be
+    # encoded as UTF-8; backslashreplace writes them as JSON \uXXXX escapes
+    text = json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=str)
+    return text.encode("utf-8", "backslashreplace")
+
+
+def encode_record(record: Dict[str, Any], max_string: Optional[int] = None,
+                  max_bytes: Optional[int] = None) -> bytes:
+    """
+    Serialize a log record as one bounded, compact JSON line.
+
+    Args:
+        record: Record to encode
+        max_string: Longest string kept as is (defaults to
+            CLAUDE_LOG_MAX_STRING or 512; 0 disables clipping)
+        max_bytes: Byte cap for the line (defaults to
+            CLAUDE_LOG_MAX_RECORD_BYTES or 8192; 0 disables the cap)
+
+    Returns:
+        UTF-8 JSON followed by a newline
+    """
+    if full_logging():
+        return _dumps(record) + b"\n"
+    if max_string is None:
+        max_string = _env_int("CLAUDE_LOG_MAX_STRING", DEFAULT_MAX_STRING)
+    if max_bytes is None:
+        max_bytes = _env_int("CLAUDE_LOG_MAX_RECORD_BYTES", DEFAULT_MAX_RECORD_BYTES)
+
+    if max_string > 0:
+        record = clip(record, max_string)
+    line = _dumps(record)
+    if max_bytes <= 0 or len(line) < max_bytes:
+        return line + b"\n"
+
+    # Rare: many medium-sized fields. Drop the largest until it fits.
+    sizes = sorted(((len(_dumps({key: value})), key) for key, value in record.items()
+                    if key not in ESSENTIAL_FIELDS), reverse=True)
+    record = dict(record)
+    dropped = []
+    for _, key in sizes:
+        del record[key]
+        dropped.append(key)
+        line = _dumps({**record, "dropped": dropped})
+        if len(line) < max_bytes:
+            return line + b"\n"
+    # Even the essential fields are too big; keep what identifies the record
+    essentials = {key: clip(record[key], 64) for key in ESSENTIAL_FIELDS if key in record}
+    return _dumps({**essentials, "dropped": dropped}) + b"\n"
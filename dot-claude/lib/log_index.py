@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Incremental SQLite index over Claude Code hook logs.
+
+Ingests the JSONL logs in ~/.claude/.hook-logs (live files and gzip-rotated
+segments, chiefly hook_events.jsonl) plus older per-hook logs and the legacy
+/tmp/hook_error.txt into one table of events indexed by session, hook event,
+time and error status.
+
+Ingestion is incremental. Each log is identified by its name plus a hash of
+its first line, which survives rotation: when notification.jsonl is rotated
+into notification.<stamp>.jsonl.gz, the segment is recognised as the same
+log and resumes at the recorded byte offset. Only complete lines are
+consumed, so a record being written is picked up by the next run. Files
+whose size and mtime are unchanged are not opened at all.
+"""
+
+import gzip
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+
+DEFAULT_LOG_DIR = "~/.claude/.hook-logs"
+DEFAULT_INDEX_PATH = "~/.claude/.hook-logs/index.sqlite3"
+LEGACY_ERROR_FILE = "/tmp/hook_error.txt"
+LEGACY_SEPARATOR = b"-" * 50 + b"\n"
+ROTATED_PATTERN = re.compile(r"^(?P<log>.+)\.\d{8}-\d{6}-\d+\.jsonl\.gz$")
+EVENTS_LOG = "hook_events"
+# Hooks whose records are invocations; the speech worker, circuit breakers
+# and log_error calls outside an invocation log to the same file
+HOOK_NAMES = ("notification", "stop")
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    identity TEXT PRIMARY KEY,
+    log TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    log TEXT NOT NULL,
+    ts REAL,
+    session_id TEXT,
+    hook TEXT,
+    hook_event_name TEXT,
+    outcome TEXT,
+    is_error INTEGER NOT NULL DEFAULT 0,
+    duration_ms REAL,
+    message TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_session ON events (session_id, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_hook ON events (hook_event_name, ts);
+CREATE INDEX IF NOT EXISTS events_error ON events (is_error, ts);
+CREATE INDEX IF NOT EXISTS events_duration ON events (ts, duration_ms);
+"""
+
+
+def log_name(path: Path) -> Optional[str]:
+    """
+    Get the log a file belongs to (e.g. 'notification', 'stop_responses').
+
+    Args:
+        path: Live or rotated log file
+
+    Returns:
+        Log name, or None if the file is not a hook log
+    """
+    match = ROTATED_PATTERN.match(path.name)
+    if match:
+        return match.group("log")
+    if path.suffix == ".jsonl":
+        return path.stem
+    return None
+
+
+def _open(path: Path):
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def _first_line_hash(path: Path) -> Optional[str]:
+    with _open(path) as f:
+        line = f.readline()
+    if not line.endswith(b"\n"):
+        return None
+    return hashlib.sha1(line).hexdigest()[:16]
+
+
+def event_row(log: str, record: Dict[str, Any], fallback_ts: float) -> Tuple:
+    """
+    Flatten one JSONL record into an events row.
+
+    Handles hook_events.jsonl records (lib.hook_events) as well as the
+    per-hook input, response and error logs written before it existed.
+
+    Args:
+        log: Log the record came from
+        record: Decoded record
+        fallback_ts: Timestamp for records written before logged_at existed
+
+    Returns:
+        Row tuple matching the events columns after id
+    """
+    if log == EVENTS_LOG:
+        context = record
+        hook = record.get("hook")
+        outcome = record.get("outcome")
+        is_error = outcome == "error"
+    elif log == "hook_errors":
+        context = record.get("context") if isinstance(record.get("context"), dict) else {}
+        hook = record.get("hook")
+        outcome = "error"
+        is_error = True
+    else:
+        context = record
+        hook = log.replace("_responses", "")
+        outcome = "output" if log.endswith("_responses") else "input"
+        is_error = False
+
+    message = record.get("error") if is_error else record.get("message")
+    duration = record.get("duration_ms")
+
+    return (
+        log,
+        record.get("logged_at") or fallback_ts,
+        context.get("session_id"),
+        hook,
+        context.get("hook_event_name"),
+        outcome,
+        1 if is_error else 0,
+        duration if isinstance(duration, (int, float)) else None,
+        message if isinstance(message, str) else None,
+        json.dumps(record, separators=(",", ":")),
+    )
+
+
+def _legacy_row(block: bytes, fallback_ts: float) -> Tuple:
+    """Turn one /tmp/hook_error.txt block into an events row."""
+    text = block.decode("utf-8", "replace")
+    fields = {}
+    data_lines: List[str] = []
+    for line in text.splitlines():
+        if data_lines or line.startswith("Hook data: "):
+            data_lines.append(line[len("Hook data: "):] if not data_lines else line)
+            if line == "}":
+                try:
+                    fields["data"] = json.loads("\n".join(data_lines))
+                except ValueError:
+                    pass
+                data_lines = []
+            continue
+        key, _, value = line.partition(": ")
+        fields[key] = value
+
+    data = fields.get("data") if isinstance(fields.get("data"), dict) else {}
+    return (
+        "hook_error.txt",
+        fallback_ts,
+        fields.get("Session ID") or data.get("session_id"),
+        None,
+        data.get("hook_event_name"),
+        "error",
+        1,
+        None,
+        fields.get("Hook error"),
+        json.dumps({"text": text}, separators=(",", ":")),
+    )
+
+
+class LogIndex:
+    """SQLite index of hook log events."""
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH, log_dir: str = DEFAULT_LOG_DIR,
+                 legacy_error_file: Optional[str] = LEGACY_ERROR_FILE):
+        """
+        Open (creating if needed) the index.
+
+        Args:
+            index_path: SQLite database path
+            log_dir: Directory of hook JSONL logs
+            legacy_error_file: Plain-text error file written by lib.error_handler
+        """
+        self.log_dir = Path(log_dir).expanduser()
+        self.legacy_error_file = Path(legacy_error_file) if legacy_error_file else None
+        path = Path(index_path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path), timeout=10)
+        # The index can always be rebuilt from the logs, so an old schema is
+        # simply dropped
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.db.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS events;")
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _log_files(self) -> Iterator[Tuple[str, Path]]:
+        if self.log_dir.is_dir():
+            # Rotated segments first, so a log's history is ingested in order
+            paths = sorted(self.log_dir.iterdir(), key=lambda p: (p.suffix != ".gz", p.name))
+            for path in paths:
+                name = log_name(path)
+                if name:
+                    yield name, path
+        if self.legacy_error_file and self.legacy_error_file.is_file():
+            yield "hook_error.txt", self.legacy_error_file
+
+    def ingest(self) -> Dict[str, int]:
+        """
+        Ingest everything appended since the last run.
+
+        Returns:
+            Dictionary with the number of files read and events added
+        """
+        stats = {"files": 0, "events": 0}
+        for log, path in self._log_files():
+            try:
+                added = self._ingest_file(log, path)
+            except (OSError, EOFError, sqlite3.Error):
+                continue
+            if added is not None:
+                stats["files"] += 1
+                stats["events"] += added
+        return stats
+
+    def _ingest_file(self, log: str, path: Path) -> Optional[int]:
+        """Ingest one file; returns events added, or None if it was skipped."""
+        st = path.stat()
+        known = self.db.execute(
+            "SELECT identity, size, mtime FROM files WHERE path = ? ORDER BY rowid DESC LIMIT 1",
+            (str(path),)).fetchone()
+        if known and known[1] == st.st_size and known[2] == st.st_mtime:
+            return None
+
+        first = _first_line_hash(path)
+        if first is None:
+            return None
+        identity = f"{log}:{first}"
+        row = self.db.execute("SELECT offset FROM files WHERE identity = ?", (identity,)).fetchone()
+        offset = row[0] if row else 0
+
+        legacy = log == "hook_error.txt"
+        with _open(path) as f:
+            f.seek(offset)
+            chunk = f.read()
+
+        # Only consume complete records
+        end = chunk.rfind(LEGACY_SEPARATOR if legacy else b"\n")
+        if end < 0:
+            consumed, rows = 0, []
+        else:
+            consumed = end + (len(LEGACY_SEPARATOR) if legacy else 1)
+            rows = (self._legacy_rows(chunk[:consumed], st.st_mtime) if legacy
+                    else self._jsonl_rows(log, chunk[:consumed], st.st_mtime))
+
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO events (log, ts, session_id, hook, hook_event_name, outcome, is_error,"
+                " duration_ms, message, raw) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.db.execute(
+                "INSERT OR REPLACE INTO files (identity, log, path, size, mtime, offset)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (identity, log, str(path), st.st_size, st.st_mtime, offset + consumed))
+        return len(rows)
+
+    def _jsonl_rows(self, log: str, data: bytes, fallback_ts: float) -> List[Tuple]:
+        rows = []
+        for line in data.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                rows.append(event_row(log, record, fallback_ts))
+        return rows
+
+    def _legacy_rows(self, data: bytes, fallback_ts: float) -> List[Tuple]:
+        return [_legacy_row(block, fallback_ts)
+                for block in data.split(LEGACY_SEPARATOR) if block.strip()]
+
+    def session_events(self, session_id: str, limit: int = 200) -> List[Tuple]:
+        """
+        Get events for one session, oldest first.
+
+        Args:
+            session_id: Claude session id (a unique prefix is enough)
+            limit: Maximum number of events
+
+        Returns:
+            Rows of (ts, hook, hook_event_name, outcome, is_error, duration_ms, message)
+        """
+        return self.db.execute(
+            "SELECT ts, hook, hook_event_name, outcome, is_error, duration_ms, message FROM events"
+            " WHERE session_id >= ? AND session_id < ? ORDER BY ts LIMIT ?",
+            (session_id, session_id + "￿", limit)).fetchall()
+
+    def error_rate(self, since: float, bucket: int = 3600) -> List[Tuple]:
+        """
+        Get hook invocation and error counts per time bucket.
+
+        Only records of the hooks in HOOK_NAMES count, so speech, circuit
+        and other component events don't skew the rate.
+
+        Args:
+            since: Start timestamp
+            bucket: Bucket width in seconds
+
+        Returns:
+            Rows of (bucket start, hook invocations, errors)
+        """
+        hooks = ", ".join("?" for _ in HOOK_NAMES)
+        return self.db.execute(
+            "SELECT CAST(ts / ? AS INTEGER) * ? AS start,"
+            " SUM(outcome IN ('handled', 'input') OR (log = ? AND is_error)), SUM(is_error) FROM events"
+            f" WHERE ts >= ? AND hook IN ({hooks}) GROUP BY start ORDER BY start",
+            (bucket, bucket, EVENTS_LOG, since, *HOOK_NAMES)).fetchall()
+
+    def slowest(self, since: float, limit: int = 20) -> List[Tuple]:
+        """
+        Get the slowest hook invocations since a timestamp.
+
+        Args:
+            since: Start timestamp
+            limit: Maximum number of rows
+
+        Returns:
+            Rows of (ts, hook, session_id, duration_ms, message)
+        """
+        return self.db.execute(
+            "SELECT ts, hook, session_id, duration_ms, message FROM events"
+            " WHERE ts >= ? AND duration_ms IS NOT NULL ORDER BY duration_ms DESC LIMIT ?",
+            (since, limit)).fetchall()
+
+    def iter_events(self, since: float, hook: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over structured event records (hook_events.jsonl) since a time.
+
+        Args:
+            since: Start timestamp
+            hook: Only events of this hook
+
+        Yields:
+            Decoded event records
+        """
+        query = "SELECT raw FROM events WHERE log = ? AND ts >= ?"
+        params: list = [EVENTS_LOG, since]
+        if hook:
+            query += " AND hook = ?"
+            params.append(hook)
+        for (raw,) in self.db.execute(query + " ORDER BY ts", params):
+            yield json.loads(raw)
+
+
+def start_of_today() -> float:
+    """Local midnight as a timestamp."""
+    now = time.localtime()
+    return time.mktime((now.tm_year, now.tm_mon, now.tm_mday, 0, 0, 0, 0, 0, -1))
@@ -1,30 +1,62 @@
 #!/usr/bin/env python3
 """
 Simplified message generation utilities for Claude Code hooks.
+
+Classification keywords and tool descriptions come from the rule config in
+lib/message_rules.json (see lib/message_rules.py).
+
+Permission notifications name the pending tool use when it can be found in
+the transcript within CLAUDE_NOTIFICATION_DEADLINE_MS (default 5 ms); the
+lookup outcome is tagged on the hook event as context=hit|miss|timeout.
+
+Completion messages summarize the finished turn from the session activity
+checkpoint (lib/session_activity.py) when one is given.
 """
 
-from typing import Dict, Any
-
-
-# Tool descriptions for generating notifications
-TOOL_DESCRIPTIONS = {
-    "Bash": "run a command",
-    "Write": "create a file", 
-    "Edit": "edit a file",
-    "MultiEdit": "edit a file",
-    "Read": "read a file",
-    "WebFetch": "fetch a URL",
-    "Glob": "search for files",
-    "Grep": "search file contents",
-    "Task": "perform a task",
-    "LS": "list directory contents",
-    "NotebookRead": "read a notebook",
-    "NotebookEdit": "edit a notebook",
-    "TodoWrite": "update tasks",
-    "WebSearch": "search the web"
+import os
+from typing import Dict, Any, List, Optional
+
+from lib.hook_events import span, tag
+from lib.message_rules import get_rules
+
+
+DEFAULT_CONTEXT_DEADLINE_MS = 5.0
+# Transcript lines searched for the pending tool use
+CONTEXT_LOOKBACK = 10
+
+
+# Spoken message for each notification kind (permission is tool-specific)
+NOTIFICATION_MESSAGES = {
+    "permission": "Claude needs permission",
+    "error": "Claude encountered an error",
+    "waiting": "Claude is waiting for input",
+    "approval": "Claude needs your approval",
+    "attention": "Claude needs your attention",
 }
 
 
+# Summary spoken when several utterances of one kind arrive in a burst
+SUMMARY_MESSAGES = {
+    "permission": "Claude needs {count} permissions",
+    "approval": "Claude needs {count} approvals",
+    "error": "Claude encountered {count} errors",
+    "completion": "Claude finished {count} tasks",
+}
+
+
+def classify_notification(base_message: str) -> str:
+    """
+    Classify a notification by its base message.
+    
+    Args:
+        base_message: The 'message' field of the hook payload
+        
+    Returns:
+        One of the NOTIFICATION_MESSAGES kinds (or a kind added in the rules)
+    """
+    return get_rules().classify(base_message)
+
+
 def generate_notification_message(data: Dict[str, Any]) -> str:
     """
     Generate a simple notification message.
@@ -36,53 +68,191 @@ def generate_notification_message(data: Dict[str, Any]) -> str:
         Generated notification message
     """
     base_message = data.get("message", "")
+    kind = classify_notification(base_message)
     
     # Handle permission requests
-    if "permission" in base_message.lower():
+    if kind == "permission":
         return _generate_permission_message(base_message)
     
     # Generic notifications for everything else
-    if "error" in base_message.lower() or "failed" in base_message.lower():
-        return "Claude encountered an error"
-    elif "waiting" in base_message.lower():
-        return "Claude is waiting for input"
-    elif "approval" in base_message.lower() or "confirm" in base_message.lower():
-        return "Claude needs your approval"
-    else:
-        return "Claude needs your attention"
+    return (get_rules().message_for(kind)
+            or NOTIFICATION_MESSAGES.get(kind, NOTIFICATION_MESSAGES["attention"]))
 
 
 def _generate_permission_message(base_message: str) -> str:
-    """Generate a permission message using static tool descriptions."""
-    # Extract tool name from the permission message
+    """Generate a permission message using the configured tool descriptions."""
     # Messages look like: "Claude needs your permission to use Write"
-    if "permission to use" in base_message:
-        requested_tool = base_message.split("permission to use")[-1].strip()
-        
-        # Use static tool descriptions
-        if requested_tool in TOOL_DESCRIPTIONS:
-            description = TOOL_DESCRIPTIONS[requested_tool]
+    rules = get_rules()
+    requested_tool = rules.permission_tool(base_message)
+    if requested_tool:
+        description = rules.describe(requested_tool)
+        if description:
             return f"Claude wants to {description}"
     
-    return "Claude needs permission"
+    return NOTIFICATION_MESSAGES["permission"]
+
+
+# Parts of a completion summary, in the order they are spoken
+ACTIVITY_PHRASES = [
+    ("edited", "edited {count} file", "edited {count} files"),
+    ("read", "read {count} file", "read {count} files"),
+    ("commands", "ran {count} command", "ran {count} commands"),
+    ("failures", "{count} failure", "{count} failures"),
+]
+
+
+def describe_activity(summary: Dict[str, int]) -> Optional[str]:
+    """
+    Turn activity figures into a spoken phrase.
+
+    Args:
+        summary: Figures from lib.session_activity.summarize()
+
+    Returns:
+        Phrase such as 'edited 4 files, ran 12 commands, 1 failure', or
+        None if nothing was done
+    """
+    parts = [(one if summary.get(key) == 1 else many).format(count=summary[key])
+             for key, one, many in ACTIVITY_PHRASES if summary.get(key)]
+    return ", ".join(parts) or None
 
 
-def generate_completion_message(data: Dict[str, Any]) -> str:
+def generate_completion_message(data: Dict[str, Any],
+                                activity: Optional[Dict[str, Any]] = None) -> str:
     """
     Generate a completion message for stop hooks.
     
+    Args:
+        data: Hook data
+        activity: Counters of the finished turn, if they are known
+        
     Returns:
         Completion message
     """
+    if activity:
+        from lib.session_activity import summarize
+        description = describe_activity(summarize(activity))
+        if description:
+            return f"Claude finished: {description}"
     return "Claude finished its task"
 
 
-# Keep these functions for backward compatibility
-def generate_enhanced_notification_message(data: Dict[str, Any]) -> str:
-    """Simplified version of enhanced notification."""
+def generate_summary_message(kind: str, count: int) -> str:
+    """
+    Generate one message standing in for a burst of same-kind messages.
+    
+    Args:
+        kind: Message kind (e.g., 'permission', 'completion')
+        count: Number of messages in the burst
+        
+    Returns:
+        Summary message
+    """
+    template = SUMMARY_MESSAGES.get(kind)
+    if template:
+        return template.format(count=count)
+    return NOTIFICATION_MESSAGES.get(kind, NOTIFICATION_MESSAGES["attention"])
+
+
+def get_static_messages() -> List[str]:
+    """
+    List every phrase the generators in this module can produce.
+
+    Used to prewarm the TTS cache so repeat notifications skip synthesis.
+
+    Returns:
+        Distinct messages in a stable order
+    """
+    messages = list(NOTIFICATION_MESSAGES.values())
+    messages.append(generate_completion_message({}))
+    messages.extend(f"Claude wants to {description}"
+                    for description in get_rules().tool_descriptions().values())
+    # Typical burst sizes for coalesced summaries
+    messages.extend(generate_summary_message(kind, count)
+                    for kind in SUMMARY_MESSAGES for count in range(2, 6))
+    return list(dict.fromkeys(messages))
+
+
+def get_context_deadline_ms() -> float:
+    """
+    Get the time budget for transcript lookups in notifications.
+
+    Returns:
+        Milliseconds from CLAUDE_NOTIFICATION_DEADLINE_MS (0 disables lookups)
+    """
+    try:
+        return max(0.0, float(os.getenv("CLAUDE_NOTIFICATION_DEADLINE_MS", DEFAULT_CONTEXT_DEADLINE_MS)))
+    except ValueError:
+        return DEFAULT_CONTEXT_DEADLINE_MS
+
+
+def generate_enhanced_notification_message(data: Dict[str, Any],
+                                           deadline_ms: Optional[float] = None) -> str:
+    """
+    Generate a notification message, naming the pending tool use if possible.
+    
+    For permission requests the pending tool use is looked up in the
+    transcript (e.g., "Claude wants to edit settings.py"). If the lookup
+    does not finish within the deadline, the generic message is used.
+    
+    Args:
+        data: Hook data containing message, transcript_path, etc.
+        deadline_ms: Lookup budget (defaults to get_context_deadline_ms())
+        
+    Returns:
+        Generated notification message
+    """
+    base_message = data.get("message", "")
+    transcript_path = data.get("transcript_path")
+    if transcript_path and classify_notification(base_message) == "permission":
+        budget = get_context_deadline_ms() if deadline_ms is None else deadline_ms
+        if budget > 0:
+            message = _generate_context_message(base_message, transcript_path, budget)
+            if message:
+                return message
+
     return generate_notification_message(data)
 
 
+def _generate_context_message(base_message: str, transcript_path: str,
+                              budget_ms: float) -> Optional[str]:
+    """Describe the pending tool use in the transcript, or None if not found in time."""
+    # Module loading is a one-off per process; the budget covers the lookup
+    from lib.deadline import Deadline, DeadlineExceeded
+    from lib.tool_context_extractor import find_recent_tool_use, generate_specific_message_for_tool
+    import lib.transcript_index  # noqa: F401
+
+    deadline = Deadline(budget_ms)
+    requested_tool = get_rules().permission_tool(base_message)
+    with span("context"):
+        try:
+            tool_use = find_recent_tool_use(
+                transcript_path,
+                tool_names=[requested_tool] if requested_tool else None,
+                max_messages=CONTEXT_LOOKBACK,
+                exclude_internal=not requested_tool,
+                deadline=deadline,
+            )
+        except DeadlineExceeded:
+            tag(context="timeout")
+            return None
+        except Exception:
+            tag(context="miss")
+            return None
+
+    if not tool_use:
+        tag(context="miss")
+        return None
+    tag(context="hit")
+    tool_input = tool_use.get("input")
+    return generate_specific_message_for_tool(tool_use["name"],
+                                              tool_input if isinstance(tool_input, dict) else {},
+                                              base_message)
+
+
+# Keep these functions for backward compatibility
+
+
 def generate_bash_notification_message(data: Dict[str, Any]) -> str:
     """Simplified version of bash notification."""
     return generate_notification_message(data)
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Data-driven message rules for Claude Code hooks.
+
+Notification classification and tool-specific wording come from a JSON
+config (lib/message_rules.json, or the file named by CLAUDE_MESSAGE_RULES)
+instead of if/elif chains:
+
+- notification_rules: ordered keyword or regex rules mapping a notification
+  to a kind; the earliest matching rule wins. All keywords are compiled into
+  one trie-shaped regex, so classifying a message is a single scan whose cost
+  does not grow with the number of keywords. The scan is a lookahead, so
+  overlapping keywords are all seen, and each hit also checks the keywords
+  that are prefixes of the longest one at that position.
+- tool_pattern: regex with a 'tool' group that finds the tool in a
+  permission request.
+- tools: per-tool description (for permission prompts), message templates,
+  context detail lines and an internal flag. Templates are tried in order;
+  the first whose fields are all present wins. Fields are the tool input
+  plus derived values: filename, main_cmd, description_lc, name, tool,
+  server and tool_words.
+- mcp: templates for MCP tools (mcp__<server>__<tool>) without an entry.
+- default: templates for any other tool.
+
+The compiled tables are cached on disk keyed by the config's path, mtime and
+size, so hook processes skip parsing and validating the config. A
+CLAUDE_MESSAGE_RULES file that can't be loaded is logged and the bundled
+rules are used instead.
+"""
+
+import json
+import marshal
+import os
+import re
+from pathlib import Path
+from string import Formatter
+from typing import Dict, Any, List, Optional, Tuple
+
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "message_rules.json"
+DEFAULT_CACHE_PATH = "~/.claude/.message-rules.cache"
+CACHE_VERSION = 2
+
+_rules = None
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Build a regex matching any of the words, factored as a prefix trie.
+
+    Args:
+        words: Lowercase literal keywords
+
+    Returns:
+        Regex source (without flags)
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if optional else body
+
+    return emit(trie)
+
+
+def _template_fields(template: str) -> List[str]:
+    """Names of the fields a template uses (e.g., ['filename'])."""
+    return [field.split(".")[0].split("[")[0]
+            for _, field, _, _ in Formatter().parse(template) if field]
+
+
+def _compile_templates(templates: List[str]) -> List[Tuple[str, List[str]]]:
+    return [(template, _template_fields(template)) for template in templates]
+
+
+def compile_rules(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a rules config into plain, marshal-friendly lookup tables.
+
+    Args:
+        config: Decoded rules config
+
+    Returns:
+        Tables consumed by MessageRules
+
+    Raises:
+        ValueError: If the config is malformed
+    """
+    keyword_rules: Dict[str, int] = {}
+    regex_rules: List[Tuple[int, str]] = []
+    kinds: List[str] = []
+    messages: Dict[str, str] = {}
+
+    for index, rule in enumerate(config.get("notification_rules", [])):
+        if "kind" not in rule:
+            raise ValueError(f"notification rule {index} has no kind")
+        kinds.append(rule["kind"])
+        if rule.get("message"):
+            messages[rule["kind"]] = rule["message"]
+        for keyword in rule.get("keywords", []):
+            # An earlier rule keeps a keyword that appears twice
+            keyword_rules.setdefault(keyword.lower(), index)
+        if rule.get("regex"):
+            re.compile(rule["regex"])
+            regex_rules.append((index, rule["regex"]))
+
+    # Lookaheads match at every position, so overlapping hits aren't skipped.
+    # Regex alternatives are in rule order: the first to match at a position
+    # is the earliest rule matching there.
+    keywords = f"(?=({_trie_pattern(sorted(keyword_rules))}))" if keyword_rules else ""
+    regexes = "|".join(f"(?=(?P<r{index}>{pattern}))" for index, pattern in regex_rules)
+
+    tools = {}
+    for name, entry in config.get("tools", {}).items():
+        tools[name] = {
+            "description": entry.get("description", f"use {name}"),
+            "templates": _compile_templates(entry.get("templates", [])),
+            "details": _compile_templates(entry.get("details", [])),
+            "internal": bool(entry.get("internal", False)),
+        }
+
+    mcp = config.get("mcp", {})
+    default = config.get("default", {})
+    tool_pattern = config.get("tool_pattern", r"permission to use\s+(?P<tool>\S+)")
+    if "tool" not in re.compile(tool_pattern).groupindex:
+        raise ValueError("tool_pattern needs a (?P<tool>...) group")
+
+    return {
+        "version": CACHE_VERSION,
+        "keywords": keywords,
+        "regexes": regexes,
+        "keyword_rules": keyword_rules,
+        "kinds": kinds,
+        "messages": messages,
+        "tool_pattern": tool_pattern,
+        "tools": tools,
+        "mcp": {
+            "description": mcp.get("description", "use {tool_words} from {server}"),
+            "templates": _compile_templates(mcp.get("templates", [])),
+            "details": _compile_templates(mcp.get("details", [])),
+            "internal": bool(mcp.get("internal", False)),
+        },
+        "default": {
+            "templates": _compile_templates(default.get("templates", ["use {name}"])),
+            "details": _compile_templates(default.get("details", ["Tool: {name}"])),
+        },
+    }
+
+
+def split_tool_name(name: str) -> Tuple[Optional[str], str]:
+    """
+    Split an MCP tool name (mcp__<server>__<tool>) into server and tool.
+
+    Args:
+        name: Tool name
+
+    Returns:
+        Tuple of (server or None for non-MCP tools, tool)
+    """
+    parts = name.split("__")
+    if len(parts) >= 3 and parts[0] == "mcp":
+        return parts[1], "__".join(parts[2:])
+    return None, name
+
+
+class MessageRules:
+    """Compiled classification rules and tool templates."""
+
+    def __init__(self, tables: Dict[str, Any]):
+        """
+        Initialize from compiled tables (see compile_rules).
+
+        Args:
+            tables: Compiled rule tables
+        """
+        self.tables = tables
+        self.keywords = re.compile(tables["keywords"], re.IGNORECASE) if tables["keywords"] else None
+        self.regexes = re.compile(tables["regexes"], re.IGNORECASE) if tables["regexes"] else None
+        self.tool_pattern = re.compile(tables["tool_pattern"])
+        self.keyword_rules = tables["keyword_rules"]
+        self.kinds = tables["kinds"]
+        self.messages = tables["messages"]
+        self.tools = tables["tools"]
+
+    def classify(self, text: str, default: str = "attention") -> str:
+        """
+        Classify a notification message.
+
+        Args:
+            text: Notification text
+            default: Kind when no rule matches
+
+        Returns:
+            Kind of the earliest matching rule
+        """
+        if not text:
+            return default
+
+        best = None
+        if self.keywords:
+            for match in self.keywords.finditer(text):
+                # The trie matches the longest keyword starting here; shorter
+                # keywords that are its prefixes start here too
+                word = match.group(1).lower()
+                for end in range(1, len(word) + 1):
+                    index = self.keyword_rules.get(word[:end])
+                    if index is not None and (best is None or index < best):
+                        best = index
+                if best == 0:
+                    return self.kinds[0]
+        if self.regexes:
+            for match in self.regexes.finditer(text):
+                index = int(match.lastgroup[1:])
+                if best is None or index < best:
+                    best = index
+                    if best == 0:
+                        break
+        return self.kinds[best] if best is not None else default
+
+    def message_for(self, kind: str) -> Optional[str]:
+        """Get a config-provided message for a kind, if any."""
+        return self.messages.get(kind)
+
+    def permission_tool(self, text: str) -> Optional[str]:
+        """
+        Find the tool named in a permission request.
+
+        Args:
+            text: Notification text
+
+        Returns:
+            Tool name or None
+        """
+        match = self.tool_pattern.search(text)
+        return match.group("tool") if match else None
+
+    def _entry(self, name: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Get the table entry and base fields for a tool name."""
+        server, tool = split_tool_name(name)
+        fields = {"name": name, "tool": tool, "tool_words": tool.replace("_", " ")}
+        if server:
+            fields["server"] = server
+        if name in self.tools:
+            return self.tools[name], fields
+        if server:
+            return self.tables["mcp"], fields
+        return {}, fields
+
+    def is_known_tool(self, name: str) -> bool:
+        """Whether a tool has an entry or is an MCP tool."""
+        return name in self.tools or split_tool_name(name)[0] is not None
+
+    def describe(self, name: str) -> Optional[str]:
+        """
+        Get the short description of a tool, used in permission prompts.
+
+        Args:
+            name: Tool name
+
+        Returns:
+            Description such as 'edit a file', or None for unknown tools
+        """
+        entry, fields = self._entry(name)
+        if "description" not in entry:
+            return None
+        return _render([(entry["description"], _template_fields(entry["description"]))], fields)
+
+    def is_internal(self, name: str) -> bool:
+        """Whether a tool is housekeeping rather than user-facing work."""
+        entry, _ = self._entry(name)
+        return entry.get("internal", False)
+
+    def render_message(self, name: str, tool_input: Dict[str, Any]) -> str:
+        """
+        Render the action phrase for a tool use (e.g., 'edit settings.py').
+
+        Args:
+            name: Tool name
+            tool_input: Tool input dictionary
+
+        Returns:
+            Phrase to follow "Claude wants to"
+        """
+        entry, fields = self._entry(name)
+        fields.update(_input_fields(tool_input))
+        return (_render(entry.get("templates", []), fields)
+                or _render(self.tables["default"]["templates"], fields)
+                or f"use {name}")
+
+    def render_details(self, name: str, tool_input: Dict[str, Any]) -> List[str]:
+        """
+        Render context detail lines for a tool use.
+
+        Args:
+            name: Tool name
+            tool_input: Tool input dictionary
+
+        Returns:
+            Every detail line whose fields are all present
+        """
+        entry, fields = self._entry(name)
+        fields.update(_input_fields(tool_input))
+        templates = entry.get("details") or self.tables["default"]["details"]
+        return [template.format_map(fields) for template, names in templates
+                if all(fields.get(field) for field in names)]
+
+    def tool_descriptions(self) -> Dict[str, str]:
+        """Descriptions of every configured tool."""
+        return {name: entry["description"] for name, entry in self.tools.items()}
+
+
+def _input_fields(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Template fields from a tool input, plus derived conveniences."""
+    fields = {key: value for key, value in tool_input.items() if isinstance(value, (str, int, float))}
+    if isinstance(fields.get("file_path"), str) and fields["file_path"]:
+        fields["filename"] = os.path.basename(fields["file_path"])
+    if isinstance(fields.get("command"), str) and fields["command"].split():
+        fields["main_cmd"] = fields["command"].split()[0]
+    description = fields.get("description")
+    if isinstance(description, str) and description:
+        fields["description_lc"] = description[0].lower() + description[1:]
+    return fields
+
+
+def _render(templates: List[Tuple[str, List[str]]], fields: Dict[str, Any]) -> Optional[str]:
+    """Render the first template whose fields are all present and non-empty."""
+    for template, names in templates:
+        if all(fields.get(field) for field in names):
+            return template.format_map(fields)
+    return None
+
+
+def get_rules_path() -> Path:
+    """Path of the active rules config."""
+    return Path(os.getenv("CLAUDE_MESSAGE_RULES") or DEFAULT_RULES_PATH).expanduser()
+
+
+def load_rules(path: Optional[Path] = None, cache_path: str = DEFAULT_CACHE_PATH) -> MessageRules:
+    """
+    Load rules, using the on-disk compiled cache when it is current.
+
+    Args:
+        path: Rules config (defaults to get_rules_path())
+        cache_path: Compiled cache file
+
+    Returns:
+        Compiled rules
+    """
+    path = path or get_rules_path()
+    st = path.stat()
+    key = (str(path), st.st_mtime_ns, st.st_size, CACHE_VERSION)
+    cache = Path(cache_path).expanduser()
+
+    try:
+        cached = marshal.loads(cache.read_bytes())
+        if cached.get("key") == key:
+            return MessageRules(cached["tables"])
+    except (OSError, ValueError, EOFError, TypeError, AttributeError):
+        pass
+
+    tables = compile_rules(json.loads(path.read_text()))
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache.with_name(f".{cache.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(marshal.dumps({"key": key, "tables": tables}))
+        os.replace(tmp_path, cache)
+    except (OSError, ValueError):
+        pass
+    return MessageRules(tables)
+
+
+def get_rules() -> MessageRules:
+    """
+    Get the process-wide rules, reloading if the config changed.
+
+    A CLAUDE_MESSAGE_RULES file that is missing or invalid is logged once
+    per change, and the bundled rules are used until it is fixed.
+
+    Returns:
+        Compiled rules
+    """
+    global _rules
+    path = get_rules_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    if _rules is None or _rules[0] != (path, mtime):
+        try:
+            rules = load_rules(path)
+        except Exception as e:
+            if path == DEFAULT_RULES_PATH:
+                raise
+            from lib.error_handler import log_error
+            log_error(f"Could not load message rules from {path}: {e}")
+            rules = load_rules(DEFAULT_RULES_PATH)
+        _rules = ((path, mtime), rules)
+    return _rules[1]
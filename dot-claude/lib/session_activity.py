@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained activity summary for Claude Code sessions.
+
+Each transcript gets a JSON checkpoint under ~/.claude/.session-activity
+holding the byte offset read so far and running counters: tool uses by
+tool, distinct files touched (per extract_file_context), commands run (by
+main command, per extract_command_context) and failed tool results. Every
+hook call reads only the lines appended since the offset, so the cost of a
+Stop summary is proportional to the new activity rather than the session
+length. The distinct files are kept up to MAX_FILES per set of counters;
+beyond that the least recently touched ones are reduced to edited/read
+counts, so the checkpoint stays small in very long sessions.
+
+Counters are kept for the whole session and for the current turn; the Stop
+hook takes the turn's counters ("edited 4 files, ran 12 commands, 1
+failure") and starts a new turn. Updates take a lib.deadline.Deadline; when
+it expires the progress so far is saved and DeadlineExceeded is raised.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+from lib.deadline import Deadline, DeadlineExceeded
+from lib.hook_events import tag
+from lib.tool_context_extractor import extract_command_context, extract_file_context
+from lib.transcript_records import TOOL_BLOCKS, RecordScan, TranscriptEntry
+
+
+DEFAULT_CHECKPOINT_DIR = "~/.claude/.session-activity"
+CHECKPOINT_VERSION = 1
+DEFAULT_ACTIVITY_DEADLINE_MS = 50.0
+# Files kept per set of counters; older ones are folded into 'dropped'
+MAX_FILES = 200
+
+# Tools whose file_path counts as an edited file
+EDIT_TOOLS = frozenset(("Edit", "MultiEdit", "Write", "NotebookEdit"))
+
+
+def empty_activity() -> Dict[str, Any]:
+    """Counters with nothing recorded."""
+    return {"tools": {}, "files": {}, "commands": {}, "failures": 0}
+
+
+def add_entry(activity: Dict[str, Any], record: TranscriptEntry) -> None:
+    """
+    Count the tool uses and failed tool results of one transcript entry.
+
+    Args:
+        activity: Counters to update in place
+        record: Transcript record
+    """
+    activity["failures"] += record.errors
+    for tool in record.tool_uses:
+        name = tool.name
+        if not name:
+            continue
+        tool_input = tool.input if isinstance(tool.input, dict) else {}
+        activity["tools"][name] = activity["tools"].get(name, 0) + 1
+
+        file_path, _ = extract_file_context(tool_input)
+        if file_path:
+            # Re-inserted so the map stays in least recently touched order
+            tools = activity["files"].pop(file_path, [])
+            activity["files"][file_path] = tools
+            if name not in tools:
+                tools.append(name)
+
+        if name == "Bash":
+            main_cmd = extract_command_context(tool_input)["main_cmd"]
+            if main_cmd:
+                activity["commands"][main_cmd] = activity["commands"].get(main_cmd, 0) + 1
+
+
+def cap_files(activity: Dict[str, Any], max_files: Optional[int] = None) -> None:
+    """
+    Forget the least recently touched files beyond max_files.
+
+    Whether each forgotten file was edited or only read is kept in the
+    'dropped' counts, so summarize() still includes it; a forgotten file
+    that is touched again is counted twice.
+
+    Args:
+        activity: Counters to update in place
+        max_files: Files to keep (defaults to MAX_FILES)
+    """
+    files = activity["files"]
+    excess = len(files) - (MAX_FILES if max_files is None else max_files)
+    if excess <= 0:
+        return
+    dropped = activity.setdefault("dropped", {"edited": 0, "read": 0})
+    for path in list(islice(files, excess)):
+        tools = files.pop(path)
+        if EDIT_TOOLS.intersection(tools):
+            dropped["edited"] += 1
+        elif "Read" in tools:
+            dropped["read"] += 1
+
+
+def summarize(activity: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Reduce counters to the figures spoken at Stop.
+
+    Args:
+        activity: Session or turn counters
+
+    Returns:
+        Dictionary with 'edited' and 'read' (distinct files), 'commands'
+        and 'failures'
+    """
+    files = activity.get("files", {})
+    dropped = activity.get("dropped", {})
+    edited = sum(1 for tools in files.values() if EDIT_TOOLS.intersection(tools)) + dropped.get("edited", 0)
+    read = sum(1 for tools in files.values() if "Read" in tools) + dropped.get("read", 0)
+    return {
+        "edited": edited,
+        "read": read if not edited else 0,
+        "commands": sum(activity.get("commands", {}).values()),
+        "failures": activity.get("failures", 0),
+    }
+
+
+class ActivityCheckpoint:
+    """Running activity counters for one transcript."""
+
+    def __init__(self, transcript_path: str, checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR):
+        """
+        Initialize the checkpoint for a transcript.
+
+        Args:
+            transcript_path: Path to the JSONL transcript file
+            checkpoint_dir: Directory holding checkpoints (supports ~ expansion)
+        """
+        self.transcript_path = os.path.realpath(transcript_path)
+        digest = hashlib.sha1(self.transcript_path.encode()).hexdigest()[:20]
+        self.checkpoint_path = Path(checkpoint_dir).expanduser() / f"{digest}.json"
+
+    @staticmethod
+    def _fresh(inode: int) -> Dict[str, Any]:
+        return {"version": CHECKPOINT_VERSION, "inode": inode, "offset": 0, "turn_starts_at": 0,
+                "session": empty_activity(), "turn": empty_activity()}
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict[str, Any]]:
+        """
+        Hold the checkpoint lock and yield its state.
+
+        Changes to the yielded dictionary are written back on exit, also
+        when the block raises DeadlineExceeded.
+        """
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.checkpoint_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = b""
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                raw += chunk
+            try:
+                state = json.loads(raw) if raw.strip() else {}
+            except ValueError:
+                state = {}
+            before = json.dumps(state, sort_keys=True)
+
+            try:
+                yield state
+            finally:
+                if json.dumps(state, sort_keys=True) != before:
+                    # Unsorted, to keep the files maps in recency order
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    os.ftruncate(fd, 0)
+                    os.write(fd, json.dumps(state).encode())
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _advance(self, state: Dict[str, Any], deadline: Optional[Deadline] = None) -> None:
+        """
+        Count the lines appended since the saved offset.
+
+        Must be called with the lock held. Raises DeadlineExceeded, after
+        recording its progress in state, if the deadline passes first.
+        """
+        st = os.stat(self.transcript_path)
+        if (state.get("version") != CHECKPOINT_VERSION or state.get("inode") != st.st_ino
+                or state.get("offset", 0) > st.st_size):
+            # New, rotated or truncated transcript
+            state.clear()
+            state.update(self._fresh(st.st_ino))
+
+        offset = state["offset"]
+        if offset >= st.st_size:
+            return
+
+        # Only lines with tool blocks change the counters
+        scan = RecordScan(self.transcript_path, blocks=TOOL_BLOCKS, start=offset, deadline=deadline)
+        try:
+            for record in scan:
+                add_entry(state["session"], record)
+                if record.offset >= state["turn_starts_at"]:
+                    add_entry(state["turn"], record)
+        finally:
+            state["offset"] = scan.offset
+            cap_files(state["session"])
+            cap_files(state["turn"])
+
+    def update(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Bring the counters up to date with the transcript.
+
+        Args:
+            deadline: Optional deadline for reading the new lines
+
+        Returns:
+            Checkpoint state with 'session' and 'turn' counters
+
+        Raises:
+            DeadlineExceeded: If the deadline passed first
+        """
+        with self._locked() as state:
+            self._advance(state, deadline)
+            return json.loads(json.dumps(state))
+
+    def finish_turn(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Bring the counters up to date, then start a new turn.
+
+        The new turn starts at the current end of the transcript even if
+        the deadline expires, so lines of the finished turn that are read
+        later only count towards the session.
+
+        Args:
+            deadline: Optional deadline for reading the new lines
+
+        Returns:
+            Counters of the finished turn
+
+        Raises:
+            DeadlineExceeded: If the deadline passed first
+        """
+        with self._locked() as state:
+            try:
+                self._advance(state, deadline)
+            finally:
+                if "turn" in state:
+                    turn = state["turn"]
+                    state["turn"] = empty_activity()
+                    try:
+                        state["turn_starts_at"] = max(state["offset"], os.path.getsize(self.transcript_path))
+                    except OSError:
+                        state["turn_starts_at"] = state["offset"]
+            return turn
+
+
+def get_activity_deadline_ms() -> float:
+    """
+    Get the time budget for activity updates in hooks.
+
+    Returns:
+        Milliseconds from CLAUDE_ACTIVITY_DEADLINE_MS (0 disables tracking)
+    """
+    try:
+        return max(0.0, float(os.getenv("CLAUDE_ACTIVITY_DEADLINE_MS", DEFAULT_ACTIVITY_DEADLINE_MS)))
+    except ValueError:
+        return DEFAULT_ACTIVITY_DEADLINE_MS
+
+
+def record_activity(transcript_path: Optional[str], finish_turn: bool = False,
+                    deadline_ms: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Update a transcript's checkpoint from a hook; never raises.
+
+    The outcome is tagged on the hook event as activity=updated|timeout|error.
+
+    Args:
+        transcript_path: Transcript from the hook payload
+        finish_turn: End the current turn (for Stop)
+        deadline_ms: Budget (defaults to get_activity_deadline_ms())
+
+    Returns:
+        The finished turn's counters when finish_turn is set and the update
+        completed in time, else None
+    """
+    budget = get_activity_deadline_ms() if deadline_ms is None else deadline_ms
+    if not transcript_path or budget <= 0:
+        return None
+
+    checkpoint = ActivityCheckpoint(transcript_path)
+    deadline = Deadline(budget)
+    try:
+        if finish_turn:
+            turn = checkpoint.finish_turn(deadline)
+        else:
+            checkpoint.update(deadline)
+            turn = None
+    except DeadlineExceeded:
+        tag(activity="timeout")
+        return None
+    except Exception:
+        tag(activity="error")
+        return None
+    tag(activity="updated")
+    return turn
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Coalescing of queued speech for Claude Code hooks.
+
+Applied by the speech queue worker to each batch of queued utterances, which
+may come from many hook processes and sessions:
+
+- utterances past their queue deadline (TTL) are dropped as stale
+- an utterance identical to one spoken within the dedupe window is dropped
+- identical utterances within the batch are spoken once
+- bursts of the same kind (e.g. several permission prompts) are merged into
+  one summary such as "Claude needs 3 permissions"
+
+The recently-spoken history is kept in a small state file in the spool
+directory so it survives detached workers coming and going.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from lib.message_generator import SUMMARY_MESSAGES, generate_summary_message
+
+
+DEFAULT_DEDUPE_WINDOW = 10.0
+RECENT_FILE = "recent.json"
+
+
+def load_recent(spool: Path, window: float = DEFAULT_DEDUPE_WINDOW) -> Dict[str, float]:
+    """
+    Load recently spoken texts, pruned to the dedupe window.
+
+    Args:
+        spool: Spool directory
+        window: Seconds a spoken text stays in the history
+
+    Returns:
+        Mapping of text to the time it was last spoken
+    """
+    try:
+        recent = json.loads((spool / RECENT_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+    cutoff = time.time() - window
+    return {text: at for text, at in recent.items() if at >= cutoff}
+
+
+def save_recent(spool: Path, recent: Dict[str, float]) -> None:
+    """Persist the recently spoken history atomically."""
+    try:
+        tmp_path = spool / f".{RECENT_FILE}.{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps(recent))
+        os.replace(tmp_path, spool / RECENT_FILE)
+    except OSError:
+        pass
+
+
+def coalesce(items: List[Dict[str, Any]], recent: Dict[str, float],
+             now: float = None, dedupe_window: float = DEFAULT_DEDUPE_WINDOW
+             ) -> Tuple[List[Dict[str, Any]], List[Tuple[str, Dict[str, Any]]]]:
+    """
+    Reduce a batch of queued utterances to what is still worth saying.
+
+    Args:
+        items: Queued utterance dictionaries in enqueue order
+        recent: Recently spoken texts (see load_recent)
+        now: Current time (defaults to time.time())
+        dedupe_window: Seconds within which an identical text is not repeated
+
+    Returns:
+        Tuple of (utterances to speak in order, list of (reason, item) drops)
+    """
+    now = time.time() if now is None else now
+    dropped = []
+    fresh = []
+    seen = set()
+
+    for item in items:
+        text = item.get("text", "")
+        if now > item.get("deadline", float("inf")):
+            dropped.append(("stale", item))
+        elif now - recent.get(text, float("-inf")) < dedupe_window:
+            dropped.append(("recently spoken", item))
+        elif text in seen:
+            dropped.append(("duplicate", item))
+        else:
+            seen.add(text)
+            fresh.append(item)
+
+    # Merge bursts of a summarizable kind into a single utterance, spoken
+    # where the first member of the burst was queued
+    by_kind: Dict[str, List[Dict[str, Any]]] = {}
+    for item in fresh:
+        kind = item.get("kind")
+        if kind in SUMMARY_MESSAGES:
+            by_kind.setdefault(kind, []).append(item)
+
+    result = []
+    merged = set()
+    for item in fresh:
+        kind = item.get("kind")
+        group = by_kind.get(kind, [])
+        if len(group) < 2:
+            result.append(item)
+            continue
+        if kind in merged:
+            dropped.append(("merged", item))
+            continue
+
+        merged.add(kind)
+        summary = dict(group[0])
+        # Members may themselves be summaries from an earlier pass
+        count = sum(member.get("merged", 1) for member in group)
+        summary["text"] = generate_summary_message(kind, count)
+        summary["deadline"] = max(member.get("deadline", now) for member in group)
+        summary["merged"] = count
+        result.append(summary)
+        dropped.append(("merged", item))
+
+    return result, dropped
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Pipelined speech for long or live text (`speak.py --stream`).
+
+Text is split into sentences (and at line ends) as it arrives. Each chunk
+is synthesized on a thread pool up to `ahead` chunks in front of playback,
+and chunks are played strictly in order. When playback falls behind,
+reading more input blocks until a slot frees up, so a fast producer piping
+into speech is slowed down instead of queueing unbounded audio.
+"""
+
+import queue
+import re
+import threading
+import time
+from typing import Callable, Dict, Any, Iterable, Iterator, Optional
+
+from lib.tts_manager import PreparedAudio
+
+
+DEFAULT_AHEAD = 3
+# Longer sentences are cut at a word boundary so synthesis starts sooner
+MAX_CHUNK_CHARS = 300
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def iter_chunks(lines: Iterable[str], max_chars: int = MAX_CHUNK_CHARS) -> Iterator[str]:
+    """
+    Split text into speakable chunks as it arrives.
+
+    Args:
+        lines: Text, typically one line at a time from stdin
+        max_chars: Longest chunk before it is cut at a space
+
+    Yields:
+        Sentences, or whole lines that have no sentence punctuation
+    """
+    for line in lines:
+        for sentence in SENTENCE_END.split(line.strip()):
+            sentence = sentence.strip()
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                yield sentence[:cut]
+                sentence = sentence[cut:].strip()
+            if sentence:
+                yield sentence
+
+
+class SpeechPipeline:
+    """Synthesize ahead on a thread pool, play in order."""
+
+    def __init__(self, prepare: Callable[[str], Optional[PreparedAudio]], ahead: int = DEFAULT_AHEAD):
+        """
+        Initialize the pipeline.
+
+        Args:
+            prepare: Synthesizes one chunk (e.g., BackendRegistry.prepare)
+            ahead: Chunks that may be synthesizing or waiting while one plays
+        """
+        self.prepare = prepare
+        self.ahead = max(1, ahead)
+
+    def _prepare(self, chunk: str) -> Optional[PreparedAudio]:
+        try:
+            return self.prepare(chunk)
+        except Exception:
+            return None
+
+    def run(self, chunks: Iterable[str]) -> Dict[str, Any]:
+        """
+        Speak every chunk.
+
+        Args:
+            chunks: Text chunks, consumed as they are produced
+
+        Returns:
+            Dictionary with 'chunks', 'spoken' and 'failed' counts,
+            'first_audio_ms' (from the start of the run) and the p50/max
+            'latency_ms' from reading a chunk until it started playing
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Chunks read but not yet playing; a full pipeline stops the reader
+        slots = threading.Semaphore(self.ahead)
+        order: "queue.Queue" = queue.Queue()
+        stopping = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=self.ahead, thread_name_prefix="speak-ahead")
+
+        def feed() -> None:
+            try:
+                for chunk in chunks:
+                    while not slots.acquire(timeout=0.1):
+                        if stopping.is_set():
+                            return
+                    if stopping.is_set():
+                        return
+                    order.put((time.perf_counter(), pool.submit(self._prepare, chunk)))
+            except Exception:
+                pass
+            finally:
+                order.put(None)
+
+        started = time.perf_counter()
+        stats: Dict[str, Any] = {"chunks": 0, "spoken": 0, "failed": 0, "first_audio_ms": None}
+        latencies = []
+        threading.Thread(target=feed, name="speak-reader", daemon=True).start()
+        try:
+            while True:
+                item = order.get()
+                if item is None:
+                    break
+                read_at, future = item
+                prepared = future.result()
+                slots.release()
+                stats["chunks"] += 1
+                if prepared is None:
+                    stats["failed"] += 1
+                    continue
+
+                now = time.perf_counter()
+                latencies.append((now - read_at) * 1000)
+                if stats["first_audio_ms"] is None:
+                    stats["first_audio_ms"] = round((now - started) * 1000, 1)
+                if prepared.play():
+                    stats["spoken"] += 1
+                else:
+                    stats["failed"] += 1
+        finally:
+            stopping.set()
+            # Interrupted: release audio that was synthesized ahead
+            while True:
+                try:
+                    item = order.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None and not item[1].cancel():
+                    item[1].add_done_callback(lambda done: done.result() and done.result().discard())
+            pool.shutdown(wait=False)
+
+        if latencies:
+            latencies.sort()
+            stats["latency_ms"] = {"p50": round(latencies[len(latencies) // 2], 1),
+                                   "max": round(latencies[-1], 1)}
+        return stats
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Detached speech queue for Claude Code hooks.
+
+Hooks drop utterances into a spool directory and return immediately. A single
+background worker (the hook daemon, or a detached process spawned on demand)
+synthesizes and plays them. Pending utterances are coalesced (stale, repeated
+and bursty ones dropped or merged) and ordered by priority and per-session
+fairness by lib/speech_scheduler.py. Failures and drops go to the hook logs.
+
+A worker claims an utterance by renaming its file to *.claimed, and removes
+the file only once the utterance has been spoken or dropped; a worker that
+starts after a crash picks up the claimed files left behind.
+"""
+
+import fcntl
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+
+DEFAULT_SPOOL_DIR = "~/.claude/.speech-queue"
+LOCK_NAME = "worker.lock"
+# Held shared by the running worker, so status checks never touch LOCK_NAME
+ALIVE_NAME = "worker.alive"
+CLAIMED_SUFFIX = ".claimed"
+LIB_ROOT = Path(__file__).resolve().parent.parent
+
+
+def get_spool_dir() -> Path:
+    """
+    Get the spool directory, creating it if needed.
+
+    Returns:
+        Path of the spool directory
+    """
+    spool = Path(DEFAULT_SPOOL_DIR).expanduser()
+    spool.mkdir(parents=True, exist_ok=True)
+    return spool
+
+
+def enqueue_speech(text: str, voice: str = "alloy", prefer_openai: bool = True,
+                   max_wait: float = 30.0, spawn_worker: bool = True,
+                   kind: str = "attention", session_id: Optional[str] = None) -> bool:
+    """
+    Queue an utterance for background playback.
+
+    Args:
+        text: Text to speak
+        voice: Voice to use for OpenAI TTS
+        prefer_openai: Whether to try OpenAI first
+        max_wait: Seconds the utterance may wait in the queue before it is dropped
+        spawn_worker: Whether to start a worker if none is running
+        kind: Message kind used for coalescing (e.g., 'permission', 'completion')
+        session_id: Claude session the utterance belongs to
+
+    Returns:
+        True if the utterance was queued, False otherwise
+    """
+    try:
+        spool = get_spool_dir()
+        now = time.time()
+        item = {
+            "text": text,
+            "voice": voice,
+            "prefer_openai": prefer_openai,
+            "kind": kind,
+            "session_id": session_id,
+            "enqueued_at": now,
+            "deadline": now + max_wait,
+        }
+
+        # Names sort in enqueue order; write then rename so the worker never
+        # sees a partial file
+        name = f"{time.time_ns():020d}-{os.getpid()}.json"
+        tmp_path = spool / f".{name}.tmp"
+        tmp_path.write_text(json.dumps(item))
+        os.replace(tmp_path, spool / name)
+    except Exception:
+        return False
+
+    if spawn_worker:
+        ensure_worker()
+    return True
+
+
+def _try_lock(spool: Path) -> Optional[int]:
+    """Try to take the worker lock without blocking; returns the fd if held."""
+    fd = os.open(spool / LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return fd
+    except OSError:
+        os.close(fd)
+        return None
+
+
+def _release_lock(fd: int) -> None:
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+def _mark_alive(spool: Path) -> int:
+    """Hold the liveness lock shared; returns the fd."""
+    fd = os.open(spool / ALIVE_NAME, os.O_RDWR | os.O_CREAT, 0o600)
+    # Blocks only while a status check holds it for an instant
+    fcntl.flock(fd, fcntl.LOCK_SH)
+    return fd
+
+
+def is_worker_running() -> bool:
+    """
+    Check whether a worker is running.
+
+    Probes the liveness lock rather than the worker lock, so a worker that
+    is starting up at the same moment can't lose its lock to the check.
+
+    Returns:
+        True if a worker is running
+    """
+    fd = os.open(get_spool_dir() / ALIVE_NAME, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return True
+    _release_lock(fd)
+    return False
+
+
+def ensure_worker() -> None:
+    """Spawn a detached worker process unless one is already running."""
+    if is_worker_running():
+        return
+
+    import subprocess
+    subprocess.Popen(
+        [sys.executable, "-m", "lib.speech_queue"],
+        cwd=str(LIB_ROOT),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def pending_items(spool: Optional[Path] = None) -> List[Path]:
+    """
+    List queued utterance files in delivery order.
+
+    Args:
+        spool: Spool directory (defaults to the standard one)
+
+    Returns:
+        Sorted list of queued file paths
+    """
+    spool = spool or get_spool_dir()
+    return sorted(spool.glob("[0-9]*.json"))
+
+
+def claimed_items(spool: Optional[Path] = None) -> List[Path]:
+    """
+    List utterance files claimed by a worker but not yet spoken or dropped.
+
+    Args:
+        spool: Spool directory (defaults to the standard one)
+
+    Returns:
+        Sorted list of claimed file paths
+    """
+    spool = spool or get_spool_dir()
+    return sorted(spool.glob(f"[0-9]*.json{CLAIMED_SUFFIX}"))
+
+
+def _claim(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Claim a queued item by renaming it to *.claimed.
+
+    The item records its claimed file under 'claim'; None if the file
+    vanished or is unreadable.
+    """
+    claimed = path if path.name.endswith(CLAIMED_SUFFIX) else path.with_name(path.name + CLAIMED_SUFFIX)
+    try:
+        if claimed != path:
+            os.rename(path, claimed)
+        item = json.loads(claimed.read_text())
+        item["claim"] = str(claimed)
+        return item
+    except FileNotFoundError:
+        return None
+    except Exception:
+        claimed.unlink(missing_ok=True)
+        return None
+
+
+def _finish(item: Dict[str, Any]) -> None:
+    """Remove a claimed item's file once it has been spoken or dropped."""
+    if item.get("claim"):
+        try:
+            os.unlink(item["claim"])
+        except OSError:
+            pass
+
+
+def deliver(item: Dict[str, Any]) -> None:
+    """
+    Speak one queued item, dropping it if it has waited too long.
+
+    Each delivery is recorded as a 'speech' event with its queue wait,
+    TTS stage timings, backend and cache status.
+
+    Args:
+        item: Queued utterance dictionary
+    """
+    from lib.hook_logger import log_hook_error
+
+    if time.time() > item.get("deadline", float("inf")):
+        waited = time.time() - item.get("enqueued_at", 0)
+        log_hook_error("speech", f"Dropped utterance after {waited:.1f}s in queue", item)
+        return
+
+    from lib.hook_events import HookInvocation
+
+    queued_ms = (time.time() - item.get("enqueued_at", time.time())) * 1000
+    try:
+        with HookInvocation("speech", item, {"queue": queued_ms}) as event:
+            from lib.tts_manager import speak_text
+            event.update(kind=item.get("kind"), message=item["text"])
+            if not speak_text(item["text"], voice=item.get("voice", "alloy"),
+                              prefer_openai=item.get("prefer_openai", True)):
+                event.fail("All TTS backends failed")
+    except Exception:
+        # Already recorded by the invocation
+        pass
+
+
+def _log_drops(dropped: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Write coalescing and scheduling drops to the hook logs."""
+    from lib.hook_logger import log_hook_error, log_hook_output
+
+    for reason, item in dropped:
+        if reason in ("stale", "queue full"):
+            waited = time.time() - item.get("enqueued_at", 0)
+            log_hook_error("speech", f"Dropped utterance ({reason}) after {waited:.1f}s in queue", item)
+        else:
+            log_hook_output("speech", {"coalesced": reason, "text": item.get("text"),
+                                       "session_id": item.get("session_id")})
+
+
+def run_worker(idle_timeout: Optional[float] = 10.0, poll_interval: float = 0.1,
+               gather_delay: float = 0.25) -> None:
+    """
+    Speak queued utterances until the queue has been idle for idle_timeout.
+
+    Only one worker runs at a time; if the lock is already held this returns
+    immediately. Claimed utterances are coalesced and ordered by
+    lib/speech_scheduler.py, and the plan is redone after every utterance so
+    urgent prompts that arrive meanwhile go next.
+
+    Args:
+        idle_timeout: Seconds to wait for new items before exiting (None = forever)
+        poll_interval: Seconds between spool scans while idle
+        gather_delay: Seconds to wait after new items arrive so a burst can
+            be coalesced into one utterance
+    """
+    from lib.speech_coalescer import load_recent, save_recent
+    from lib.speech_scheduler import SpeechScheduler
+    from lib.hook_logger import flush_logs
+    from lib.tts_manager import OPENAI_VOICES
+
+    spool = get_spool_dir()
+    fd = _try_lock(spool)
+    if fd is None:
+        return
+    alive_fd = _mark_alive(spool)
+
+    scheduler = SpeechScheduler(spool)
+    # Left claimed by a worker that crashed or was killed mid-utterance
+    pending: List[Dict[str, Any]] = [item for item in map(_claim, claimed_items(spool)) if item]
+    idle_since = time.monotonic()
+    try:
+        while True:
+            if pending_items(spool):
+                time.sleep(gather_delay)
+                pending.extend(item for item in map(_claim, pending_items(spool)) if item)
+
+            if pending:
+                recent = load_recent(spool)
+                pending, dropped = scheduler.plan(pending, recent)
+                _log_drops(dropped)
+                # A merged summary keeps the file of the burst's first member
+                kept = {item.get("claim") for item in pending}
+                for _, item in dropped:
+                    if item.get("claim") not in kept:
+                        _finish(item)
+
+            if pending:
+                item = scheduler.pick(pending)
+                pending.remove(item)
+                item = scheduler.prepare(item, OPENAI_VOICES)
+                started_at = time.time()
+                scheduler.record(item, started_at)
+                scheduler.save(pending, current=item)
+
+                deliver(item)
+                _finish(item)
+
+                recent[item["text"]] = time.time()
+                save_recent(spool, recent)
+                flush_logs()
+                scheduler.save(pending)
+                idle_since = time.monotonic()
+                continue
+
+            if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                # Release, then re-check so an item queued while we were
+                # exiting isn't stranded without a worker
+                _release_lock(alive_fd)
+                alive_fd = None
+                _release_lock(fd)
+                fd = None
+                if not pending_items(spool):
+                    return
+                fd = _try_lock(spool)
+                if fd is None:
+                    return
+                alive_fd = _mark_alive(spool)
+                continue
+
+            time.sleep(poll_interval)
+    finally:
+        if alive_fd is not None:
+            _release_lock(alive_fd)
+        if fd is not None:
+            _release_lock(fd)
+
+
+if __name__ == "__main__":
+    run_worker()
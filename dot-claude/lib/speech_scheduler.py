@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Priority speech scheduler for Claude Code hooks.
+
+The speech queue worker is the single owner of audio output for every
+session on the machine. This module decides what it says next:
+
+- priority classes: permission/approval before errors, errors before
+  general notifications, notifications before completions
+- per-session fairness: among equal-priority utterances, the session that
+  was served least recently goes first (FIFO within a session)
+- a bounded queue: when more than max_queue utterances are pending, the
+  drop policy ('lowest', 'oldest' or 'newest') decides what is discarded
+- optional per-session voices, so concurrent sessions sound different
+
+Scheduler state (pending snapshot, wait-time history, drop counters) is kept
+in scheduler.json in the spool directory for tools/speech_queue.py.
+"""
+
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from lib.speech_coalescer import coalesce
+
+
+PRIORITY_CLASSES = {
+    "permission": 0,
+    "approval": 0,
+    "error": 1,
+    "waiting": 2,
+    "attention": 2,
+    "completion": 3,
+}
+PRIORITY_NAMES = {0: "urgent", 1: "error", 2: "notice", 3: "completion"}
+DEFAULT_PRIORITY = 2
+
+DROP_POLICIES = ("lowest", "oldest", "newest")
+STATE_FILE = "scheduler.json"
+WAIT_HISTORY = 200
+
+
+def get_priority(item: Dict[str, Any]) -> int:
+    """
+    Get the priority class of a queued utterance (lower is more urgent).
+
+    Args:
+        item: Queued utterance dictionary
+
+    Returns:
+        Priority class
+    """
+    return PRIORITY_CLASSES.get(item.get("kind"), DEFAULT_PRIORITY)
+
+
+def session_voice(session_id: Optional[str], voices: List[str]) -> Optional[str]:
+    """
+    Pick a stable voice for a session.
+
+    Args:
+        session_id: Claude session id
+        voices: Voices to choose from
+
+    Returns:
+        Voice name, or None without a session id
+    """
+    if not session_id or not voices:
+        return None
+    return voices[zlib.crc32(session_id.encode()) % len(voices)]
+
+
+class SpeechScheduler:
+    """Orders, bounds and tracks pending utterances for the speech worker."""
+
+    def __init__(self, spool: Path, max_queue: Optional[int] = None,
+                 drop_policy: Optional[str] = None,
+                 session_voices: Optional[bool] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            spool: Spool directory holding the scheduler state file
+            max_queue: Maximum pending utterances (env CLAUDE_SPEECH_MAX_QUEUE, default 16)
+            drop_policy: What to drop when full (env CLAUDE_SPEECH_DROP_POLICY, default 'lowest')
+            session_voices: Give each session its own voice (env CLAUDE_SPEECH_SESSION_VOICES)
+        """
+        self.state_path = spool / STATE_FILE
+        self.max_queue = max_queue or int(os.getenv("CLAUDE_SPEECH_MAX_QUEUE", "16"))
+        policy = drop_policy or os.getenv("CLAUDE_SPEECH_DROP_POLICY", "lowest")
+        self.drop_policy = policy if policy in DROP_POLICIES else "lowest"
+        if session_voices is None:
+            session_voices = os.getenv("CLAUDE_SPEECH_SESSION_VOICES", "") not in ("", "0")
+        self.session_voices = session_voices
+
+        self.last_served: Dict[str, float] = {}
+        self.waits: Dict[str, List[float]] = {}
+        self.dropped: Dict[str, int] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return
+        self.last_served = state.get("last_served", {})
+        self.waits = state.get("waits", {})
+        self.dropped = state.get("dropped", {})
+
+    def save(self, pending: List[Dict[str, Any]], current: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Persist scheduler state for introspection.
+
+        Args:
+            pending: Utterances waiting to be spoken
+            current: Utterance being spoken right now
+        """
+        def summary(item: Dict[str, Any]) -> Dict[str, Any]:
+            return {key: item.get(key) for key in ("text", "kind", "session_id", "enqueued_at")}
+
+        state = {
+            "pid": os.getpid(),
+            "updated_at": time.time(),
+            "current": summary(current) if current else None,
+            "pending": [summary(item) for item in pending],
+            "last_served": self.last_served,
+            "waits": self.waits,
+            "dropped": self.dropped,
+        }
+        try:
+            tmp_path = self.state_path.with_name(f".{STATE_FILE}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(state))
+            os.replace(tmp_path, self.state_path)
+        except OSError:
+            pass
+
+    def plan(self, pending: List[Dict[str, Any]], recent: Dict[str, float]
+             ) -> Tuple[List[Dict[str, Any]], List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Coalesce pending utterances and enforce the queue bound.
+
+        Args:
+            pending: All pending utterances in enqueue order
+            recent: Recently spoken texts
+
+        Returns:
+            Tuple of (utterances still pending, list of (reason, item) drops)
+        """
+        pending, dropped = coalesce(pending, recent)
+
+        overflow = len(pending) - self.max_queue
+        if overflow > 0:
+            if self.drop_policy == "oldest":
+                victims = pending[:overflow]
+            elif self.drop_policy == "newest":
+                victims = pending[-overflow:]
+            else:
+                # Least urgent first, oldest first within a class
+                ranked = sorted(pending, key=lambda item: (-get_priority(item), item.get("enqueued_at", 0)))
+                victims = ranked[:overflow]
+            victim_ids = {id(item) for item in victims}
+            pending = [item for item in pending if id(item) not in victim_ids]
+            dropped.extend(("queue full", item) for item in victims)
+
+        for reason, _ in dropped:
+            self.dropped[reason] = self.dropped.get(reason, 0) + 1
+
+        return pending, dropped
+
+    def pick(self, pending: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Choose the next utterance to speak.
+
+        Args:
+            pending: Non-empty list of pending utterances in enqueue order
+
+        Returns:
+            The chosen utterance (not removed from the list)
+        """
+        def rank(indexed):
+            position, item = indexed
+            session = item.get("session_id") or ""
+            return (get_priority(item), self.last_served.get(session, 0.0), position)
+
+        return min(enumerate(pending), key=rank)[1]
+
+    def prepare(self, item: Dict[str, Any], voices: List[str]) -> Dict[str, Any]:
+        """
+        Apply per-session voice assignment to an utterance about to be spoken.
+
+        Args:
+            item: Chosen utterance
+            voices: Voices available for assignment
+
+        Returns:
+            The utterance, possibly with a session-specific voice
+        """
+        if self.session_voices:
+            voice = session_voice(item.get("session_id"), voices)
+            if voice:
+                item = {**item, "voice": voice}
+        return item
+
+    def record(self, item: Dict[str, Any], started_at: float) -> None:
+        """
+        Record that an utterance started playing.
+
+        Args:
+            item: Utterance that was spoken
+            started_at: Time playback started
+        """
+        self.last_served[item.get("session_id") or ""] = started_at
+        name = PRIORITY_NAMES[get_priority(item)]
+        history = self.waits.setdefault(name, [])
+        history.append(round(started_at - item.get("enqueued_at", started_at), 3))
+        del history[:-WAIT_HISTORY]
+
+        # Forget sessions that have been quiet for a day
+        cutoff = started_at - 86400
+        self.last_served = {s: at for s, at in self.last_served.items() if at >= cutoff}
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def queue_status(spool: Path, now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Summarize the speech queue for introspection.
+
+    Combines utterances still in the spool (not yet claimed by a worker)
+    with the worker's pending snapshot from the scheduler state file.
+
+    Args:
+        spool: Spool directory
+        now: Current time (defaults to time.time())
+
+    Returns:
+        Dictionary with depth by priority and session, oldest wait, recent
+        wait percentiles per priority class and drop counters
+    """
+    now = time.time() if now is None else now
+    try:
+        state = json.loads((spool / STATE_FILE).read_text())
+    except (OSError, ValueError):
+        state = {}
+
+    pending = list(state.get("pending", []))
+    for path in sorted(spool.glob("[0-9]*.json")):
+        try:
+            pending.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+
+    by_priority: Dict[str, int] = {}
+    by_session: Dict[str, int] = {}
+    for item in pending:
+        name = PRIORITY_NAMES[get_priority(item)]
+        by_priority[name] = by_priority.get(name, 0) + 1
+        session = item.get("session_id") or "-"
+        by_session[session] = by_session.get(session, 0) + 1
+
+    oldest = min((item.get("enqueued_at", now) for item in pending), default=None)
+    waits = {
+        name: {"count": len(values), "p50": _percentile(values, 0.5), "p95": _percentile(values, 0.95)}
+        for name, values in state.get("waits", {}).items()
+    }
+
+    return {
+        "depth": len(pending),
+        "by_priority": by_priority,
+        "by_session": by_session,
+        "oldest_wait": round(now - oldest, 3) if oldest is not None else None,
+        "current": state.get("current"),
+        "waits": waits,
+        "dropped": state.get("dropped", {}),
+    }
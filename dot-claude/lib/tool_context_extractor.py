@@ -1,22 +1,33 @@
 #!/usr/bin/env python3
 """
 Tool context extraction utilities for Claude Code hooks.
+
+Tool-specific wording and the internal-tool list come from the rule config
+in lib/message_rules.json (see lib/message_rules.py).
 """
 
 import os
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Union
+
+from lib.deadline import Deadline, DeadlineExceeded, check_deadline
+from lib.message_rules import get_rules
+from lib.transcript_records import TranscriptEntry, iter_records
 
 
-def extract_tool_use_from_message(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def extract_tool_use_from_message(message: Union[Dict[str, Any], TranscriptEntry]) -> Optional[Dict[str, Any]]:
     """
     Extract tool use information from a message.
     
     Args:
-        message: Message dictionary from transcript
+        message: Message dictionary from transcript, or a TranscriptEntry
         
     Returns:
         Tool use dictionary or None if not found
     """
+    if isinstance(message, TranscriptEntry):
+        tool_use = message.tool_use
+        return tool_use.to_dict() if tool_use else None
+
     msg_content = message.get('message', {}).get('content', [])
     
     if isinstance(msg_content, list):
@@ -41,31 +52,47 @@ def is_internal_tool(tool_name: str) -> bool:
     Returns:
         True if tool is internal, False if it represents meaningful user work
     """
-    internal_tools = {
-        'TodoWrite',  # Todo management
-        'Task',       # Subagent coordination (usually internal)
-        # Add other internal tools as identified
-    }
-    return tool_name in internal_tools
+    return get_rules().is_internal(tool_name)
 
 
-def find_recent_tool_use(messages: List[Dict[str, Any]], 
+def find_recent_tool_use(messages: Union[List[Dict[str, Any]], str, "os.PathLike[str]"],
                         tool_names: Optional[List[str]] = None,
                         max_messages: int = 10,
-                        exclude_internal: bool = False) -> Optional[Dict[str, Any]]:
+                        exclude_internal: bool = False,
+                        deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """
     Find the most recent tool use in messages.
     
     Args:
-        messages: List of message dictionaries
+        messages: List of message dictionaries, or a transcript path
+            (answered from the transcript offset index, or without it from
+            typed records; only lines with a matching tool_use are decoded)
         tool_names: Optional list of tool names to filter by
         max_messages: Maximum number of messages to search
         exclude_internal: Whether to exclude internal tools
+        deadline: Optional deadline, checked between units of work
         
     Returns:
         Most recent tool use or None
-    """
-    for msg in reversed(messages[-max_messages:]):
+
+    Raises:
+        DeadlineExceeded: If the deadline passed before an answer was found
+    """
+    if isinstance(messages, (str, os.PathLike)):
+        path = os.fspath(messages)
+        try:
+            return _find_recent_tool_use_indexed(path, tool_names, max_messages,
+                                                 exclude_internal, deadline)
+        except DeadlineExceeded:
+            raise
+        except Exception:
+            recent = iter_records(path, tool_names=tool_names, blocks=("tool_use",),
+                                  reverse=True, window=max_messages)
+    else:
+        recent = reversed(messages[-max_messages:])
+
+    for msg in recent:
+        check_deadline(deadline)
         tool_use = extract_tool_use_from_message(msg)
         if tool_use:
             tool_name = tool_use['name']
@@ -80,6 +107,31 @@ def find_recent_tool_use(messages: List[Dict[str, Any]],
     return None
 
 
+def _find_recent_tool_use_indexed(transcript_path: str,
+                                  tool_names: Optional[List[str]],
+                                  max_messages: int,
+                                  exclude_internal: bool,
+                                  deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+    """Answer find_recent_tool_use for a transcript path from its index."""
+    from lib.transcript_index import TranscriptIndex, FLAG_TOOL_USE
+
+    if not os.path.exists(transcript_path):
+        return None
+
+    index = TranscriptIndex(transcript_path)
+    records = index.query(flags=FLAG_TOOL_USE, tool_names=tool_names,
+                          window=max_messages, limit=max_messages, deadline=deadline)
+    for record in records:
+        check_deadline(deadline)
+        if exclude_internal and is_internal_tool(record.tool_name or ''):
+            continue
+        entry = index.read_entry(record)
+        if entry:
+            return extract_tool_use_from_message(TranscriptEntry.from_dict(entry, record.offset))
+
+    return None
+
+
 def extract_file_context(tool_input: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
     """
     Extract file path and filename from tool input.
@@ -148,56 +200,7 @@ def generate_specific_message_for_tool(tool_name: str, tool_input: Dict[str, Any
     Returns:
         Specific message string
     """
-    if tool_name == "Write":
-        file_path, filename = extract_file_context(tool_input)
-        if filename:
-            return f"Claude wants to create {filename}"
-        return "Claude wants to create a file"
-    
-    elif tool_name == "Edit":
-        file_path, filename = extract_file_context(tool_input)
-        if filename:
-            return f"Claude wants to edit {filename}"
-        return "Claude wants to edit a file"
-    
-    elif tool_name == "Read":
-        file_path, filename = extract_file_context(tool_input)
-        if filename:
-            return f"Claude wants to read {filename}"
-        return "Claude wants to read a file"
-    
-    elif tool_name == "Bash":
-        cmd_info = extract_command_context(tool_input)
-        if cmd_info['description']:
-            # Use the description directly - they're already well-written
-            description = cmd_info['description']
-            # Make sure it starts with lowercase for "Claude wants to..."
-            if description and not description[0].islower():
-                description = description[0].lower() + description[1:]
-            return f"Claude wants to {description}"
-        elif cmd_info['main_cmd']:
-            return f"Claude wants to run {cmd_info['main_cmd']}"
-        return "Claude wants to run a command"
-    
-    elif tool_name == "WebFetch":
-        url = extract_url_context(tool_input)
-        if url:
-            return f"Claude wants to fetch {url}"
-        return "Claude wants to fetch a URL"
-    
-    elif tool_name == "Glob":
-        pattern = tool_input.get('pattern', '')
-        if pattern:
-            return f"Claude wants to search for {pattern}"
-        return "Claude wants to search files"
-    
-    elif tool_name == "Grep":
-        pattern = tool_input.get('pattern', '')
-        if pattern:
-            return f"Claude wants to search for {pattern}"
-        return "Claude wants to search file contents"
-    
-    return f"Claude wants to use {tool_name}"
+    return f"Claude wants to {get_rules().render_message(tool_name, tool_input)}"
 
 
 def extract_tool_details_for_context(tool_use: Dict[str, Any]) -> str:
@@ -213,41 +216,5 @@ def extract_tool_details_for_context(tool_use: Dict[str, Any]) -> str:
     tool_name = tool_use.get('name', '')
     tool_input = tool_use.get('input', {})
     
-    details = []
-    
-    if tool_name == "Write":
-        file_path, filename = extract_file_context(tool_input)
-        content_preview = tool_input.get('content', '')[:100]
-        if file_path:
-            details.append(f"Tool: Writing file '{file_path}'")
-        if content_preview:
-            details.append(f"Content preview: {content_preview}...")
-    
-    elif tool_name == "Edit":
-        file_path, filename = extract_file_context(tool_input)
-        old_string = tool_input.get('old_string', '')[:50]
-        new_string = tool_input.get('new_string', '')[:50]
-        if file_path:
-            details.append(f"Tool: Editing file '{file_path}'")
-        if old_string and new_string:
-            details.append(f"Changing: '{old_string}...' to '{new_string}...'")
-    
-    elif tool_name == "Bash":
-        cmd_info = extract_command_context(tool_input)
-        details.append(f"Tool: Running bash command")
-        if cmd_info['command']:
-            details.append(f"Command: {cmd_info['command']}")
-        if cmd_info['description']:
-            details.append(f"Description: {cmd_info['description']}")
-    
-    elif tool_name == "Read":
-        file_path, filename = extract_file_context(tool_input)
-        if file_path:
-            details.append(f"Tool: Reading file '{file_path}'")
-    
-    elif tool_name == "WebFetch":
-        url = extract_url_context(tool_input)
-        if url:
-            details.append(f"Tool: Fetching URL '{url}'")
-    
-    return "\n".join(details) if details else f"Tool: {tool_name}"
\ No newline at end of file
+    details = get_rules().render_details(tool_name, tool_input)
+    return "\n".join(details) if details else f"Tool: {tool_name}"
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained offset index for Claude Code transcripts.
+
+Each transcript gets a compact binary sidecar under ~/.claude/.transcript-index
+holding, per line, the byte offset and length, the entry role, tool_use /
+tool_result flags and the tool name. The index is extended from the last
+indexed offset on every access, rebuilt when the transcript is truncated or
+replaced, and guarded by an flock so concurrent hooks can share it. Filtered
+queries ("last Bash tool_use", "last 5 user/assistant turns") scan the
+fixed-size records and decode only the transcript lines they return.
+
+Updates and queries accept a lib.deadline.Deadline. When it expires, the
+lines indexed so far are kept, so the next access carries on from there,
+and DeadlineExceeded is raised.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Sequence
+
+from lib.deadline import Deadline, DeadlineExceeded
+from lib.transcript_parser import get_message_role
+from lib.transcript_records import loads
+
+
+DEFAULT_INDEX_DIR = "~/.claude/.transcript-index"
+
+MAGIC = b"CTIX"
+VERSION = 1
+# magic, version, reserved, inode, indexed offset, record count, head hash
+HEADER = struct.Struct("<4sHHQQQ16s")
+# offset, length, role, flags, tool id
+RECORD = struct.Struct("<QIBBH")
+HEAD_BYTES = 512
+# Lines indexed between deadline checks
+CHECK_EVERY = 32
+
+ROLE_CODES = {"user": 1, "assistant": 2, "system": 3, "summary": 4}
+ROLE_NAMES = {code: name for name, code in ROLE_CODES.items()}
+
+FLAG_TOOL_USE = 1
+FLAG_TOOL_RESULT = 2
+FLAG_ERROR = 4
+
+
+class IndexRecord(NamedTuple):
+    """One indexed transcript line."""
+    offset: int
+    length: int
+    role: Optional[str]
+    flags: int
+    tool_name: Optional[str]
+
+
+def classify_entry(entry: Dict[str, Any]):
+    """
+    Work out the role, flags and tool name of a decoded transcript entry.
+
+    Args:
+        entry: Decoded transcript line
+
+    Returns:
+        Tuple of (role, flags, tool name or None)
+    """
+    role = get_message_role(entry)
+    inner = entry.get("message")
+    inner = inner if isinstance(inner, dict) else {}
+
+    flags = 0
+    tool_name = None
+    content = inner.get("content")
+    if isinstance(content, list):
+        for item in content:
+            if not isinstance(item, dict):
+                continue
+            kind = item.get("type")
+            if kind == "tool_use":
+                flags |= FLAG_TOOL_USE
+                if tool_name is None:
+                    tool_name = item.get("name") or None
+            elif kind == "tool_result":
+                flags |= FLAG_TOOL_RESULT
+                if item.get("is_error"):
+                    flags |= FLAG_ERROR
+
+    return role, flags, tool_name
+
+
+class TranscriptIndex:
+    """Binary sidecar index for one transcript file."""
+
+    def __init__(self, transcript_path: str, index_dir: str = DEFAULT_INDEX_DIR):
+        """
+        Initialize the index for a transcript.
+
+        Args:
+            transcript_path: Path to the JSONL transcript file
+            index_dir: Directory holding sidecar files (supports ~ expansion)
+        """
+        self.transcript_path = os.path.realpath(transcript_path)
+        digest = hashlib.sha1(self.transcript_path.encode()).hexdigest()[:20]
+        self.index_dir = Path(index_dir).expanduser()
+        self.index_path = self.index_dir / f"{digest}.idx"
+        self.names_path = self.index_dir / f"{digest}.names"
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+
+    @contextmanager
+    def _locked(self, deadline: Optional[Deadline] = None) -> Iterator[int]:
+        """Open the index file and hold an exclusive lock on it."""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.index_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if deadline is None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                # Another process may be indexing; wait only as long as allowed
+                while True:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        deadline.check()
+                        time.sleep(0.0005)
+            yield fd
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _load_names(self) -> None:
+        try:
+            self._names = self.names_path.read_text().splitlines()
+        except OSError:
+            self._names = []
+        self._name_ids = {name: i + 1 for i, name in enumerate(self._names)}
+
+    def _tool_id(self, name: Optional[str]) -> int:
+        """Map a tool name to its id, appending new names to the names file."""
+        if not name:
+            return 0
+        tool_id = self._name_ids.get(name)
+        if tool_id is None:
+            self._names.append(name)
+            tool_id = self._name_ids[name] = len(self._names)
+            with open(self.names_path, "a") as f:
+                f.write(name + "\n")
+        return tool_id
+
+    @staticmethod
+    def _head_hash(transcript, size: int) -> bytes:
+        """Hash the first bytes of the transcript to detect replacement."""
+        transcript.seek(0)
+        return hashlib.md5(transcript.read(min(size, HEAD_BYTES))).digest()
+
+    def _reset(self, fd: int) -> None:
+        """Drop all records and names so indexing restarts at the top."""
+        os.ftruncate(fd, 0)
+        try:
+            self.names_path.unlink()
+        except OSError:
+            pass
+        self._names = []
+        self._name_ids = {}
+
+    def _update(self, fd: int, deadline: Optional[Deadline] = None) -> int:
+        """
+        Index lines appended since the last update.
+
+        Must be called with the lock held. Returns the number of records.
+        Raises DeadlineExceeded, after saving its progress, if the deadline
+        passes first.
+        """
+        st = os.stat(self.transcript_path)
+        with open(self.transcript_path, "rb") as transcript:
+            raw = os.pread(fd, HEADER.size, 0)
+            header = HEADER.unpack(raw) if len(raw) == HEADER.size else None
+            if (header is None or header[0] != MAGIC or header[1] != VERSION
+                    or header[3] != st.st_ino or header[4] > st.st_size
+                    or header[6] != self._head_hash(transcript, header[4])):
+                # New, corrupt, rotated or truncated transcript
+                self._reset(fd)
+                indexed, count = 0, 0
+            else:
+                indexed, count = header[4], header[5]
+                self._load_names()
+
+            if indexed >= st.st_size:
+                return count
+
+            transcript.seek(indexed)
+            records = []
+            offset = indexed
+            expired = False
+            for line in transcript:
+                if deadline is not None and len(records) % CHECK_EVERY == CHECK_EVERY - 1 \
+                        and deadline.expired:
+                    expired = True
+                    break
+                if not line.endswith(b"\n"):
+                    # Partially written line; pick it up next time
+                    break
+                if line.strip():
+                    try:
+                        role, flags, tool_name = classify_entry(loads(line))
+                    except ValueError:
+                        role, flags, tool_name = None, 0, None
+                    records.append(RECORD.pack(offset, len(line) - 1, ROLE_CODES.get(role, 0),
+                                               flags, self._tool_id(tool_name)))
+                offset += len(line)
+
+            if records:
+                os.pwrite(fd, b"".join(records), HEADER.size + count * RECORD.size)
+                count += len(records)
+            # Header last, so a crash mid-append leaves a consistent index
+            head_hash = self._head_hash(transcript, offset)
+            os.pwrite(fd, HEADER.pack(MAGIC, VERSION, 0, st.st_ino, offset, count, head_hash), 0)
+            if expired:
+                raise DeadlineExceeded(f"indexed {len(records)} lines before the deadline")
+            return count
+
+    def update(self, deadline: Optional[Deadline] = None) -> int:
+        """
+        Bring the index up to date with the transcript.
+
+        Args:
+            deadline: Optional deadline for the update
+
+        Returns:
+            Number of indexed lines
+
+        Raises:
+            DeadlineExceeded: If the deadline passed first
+        """
+        with self._locked(deadline) as fd:
+            return self._update(fd, deadline)
+
+    def query(self, roles: Optional[Sequence[str]] = None,
+              tool_names: Optional[Sequence[str]] = None,
+              flags: int = 0, limit: int = 1,
+              window: Optional[int] = None,
+              deadline: Optional[Deadline] = None) -> List[IndexRecord]:
+        """
+        Find the newest records matching a filter.
+
+        Args:
+            roles: Only records with one of these roles; unknown roles are
+                ignored, and if none are known nothing matches
+            tool_names: Only tool_use records for one of these tools
+            flags: Only records with all of these flag bits set
+            limit: Maximum number of records to return
+            window: Only consider the last `window` lines of the transcript
+            deadline: Optional deadline for bringing the index up to date
+
+        Returns:
+            Matching records, newest first
+
+        Raises:
+            DeadlineExceeded: If the deadline passed first
+        """
+        role_codes = None
+        if roles:
+            # Unknown roles match nothing (code 0 marks unclassified lines)
+            role_codes = {ROLE_CODES[role] for role in roles if role in ROLE_CODES}
+            if not role_codes:
+                return []
+        if tool_names:
+            flags |= FLAG_TOOL_USE
+
+        with self._locked(deadline) as fd:
+            count = self._update(fd, deadline)
+            if count == 0:
+                return []
+            tool_ids = ({self._name_ids[n] for n in tool_names if n in self._name_ids}
+                        if tool_names else None)
+            if tool_ids is not None and not tool_ids:
+                return []
+
+            results = []
+            stop = max(0, count - window) if window else 0
+            with mmap.mmap(fd, HEADER.size + count * RECORD.size, access=mmap.ACCESS_READ) as mm:
+                for i in range(count - 1, stop - 1, -1):
+                    offset, length, role, rec_flags, tool_id = RECORD.unpack_from(
+                        mm, HEADER.size + i * RECORD.size)
+                    if role_codes is not None and role not in role_codes:
+                        continue
+                    if rec_flags & flags != flags:
+                        continue
+                    if tool_ids is not None and tool_id not in tool_ids:
+                        continue
+                    results.append(IndexRecord(
+                        offset, length, ROLE_NAMES.get(role), rec_flags,
+                        self._names[tool_id - 1] if tool_id else None,
+                    ))
+                    if len(results) >= limit:
+                        break
+            return results
+
+    def read_entry(self, record: IndexRecord) -> Optional[Dict[str, Any]]:
+        """
+        Decode the transcript line behind a record.
+
+        Args:
+            record: Record returned by query()
+
+        Returns:
+            Decoded entry, or None if the line cannot be read
+        """
+        try:
+            with open(self.transcript_path, "rb") as f:
+                return loads(os.pread(f.fileno(), record.length, record.offset))
+        except (OSError, ValueError):
+            return None
+
+
+def query_entries(transcript_path: str, limit: int = 1, **filters: Any) -> List[Dict[str, Any]]:
+    """
+    Run an index query and decode the matching lines.
+
+    Args:
+        transcript_path: Path to the JSONL transcript file
+        limit: Maximum number of entries to return
+        **filters: roles, tool_names, flags and window, as for TranscriptIndex.query
+
+    Returns:
+        Matching entries, oldest first
+    """
+    index = TranscriptIndex(transcript_path)
+    entries = [index.read_entry(record) for record in index.query(limit=limit, **filters)]
+    entries = [entry for entry in entries if entry is not None]
+    entries.reverse()
+    return entries
@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
 """
 Transcript parsing utilities for Claude Code hooks.
+
+Hooks usually only need the last few entries of a transcript, so the tail
+readers here mmap the file and walk lines backwards from EOF, decoding only
+what they return. Their cost depends on how far back they look, not on the
+size of the transcript.
 """
 
 import json
+import mmap
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple, Union
+
+
+# Either an already-parsed list of messages or the path of a JSONL transcript
+Messages = Union[List[Dict[str, Any]], str, "os.PathLike[str]"]
 
 
 def parse_transcript(transcript_path: str) -> List[Dict[str, Any]]:
@@ -34,34 +44,154 @@ def parse_transcript(transcript_path: str) -> List[Dict[str, Any]]:
     return messages
 
 
-def get_recent_messages(messages: List[Dict[str, Any]], count: int = 10, 
+def iter_lines_reverse(transcript_path: str,
+                       with_offsets: bool = False) -> Iterator[Union[bytes, Tuple[int, bytes]]]:
+    """
+    Yield the raw lines of a file from last to first.
+
+    The file is memory-mapped and split backwards from EOF, so only the
+    lines actually consumed are touched. Blank lines are skipped; a final
+    line without a trailing newline (still being written) is yielded as-is
+    and left to the caller's decoder to reject.
+
+    Args:
+        transcript_path: Path to the JSONL transcript file
+        with_offsets: Yield (byte offset, line) tuples instead of lines
+
+    Yields:
+        Raw line bytes without the newline
+    """
+    if not transcript_path:
+        return
+
+    try:
+        with open(transcript_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = len(mm)
+                while end > 0:
+                    start = mm.rfind(b'\n', 0, end) + 1
+                    line = mm[start:end]
+                    if line.strip():
+                        yield (start, line) if with_offsets else line
+                    end = start - 1
+    except (OSError, ValueError):
+        # Missing or empty file (mmap refuses zero-length files)
+        return
+
+
+def iter_entries_reverse(transcript_path: str,
+                         predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+                         ) -> Iterator[Dict[str, Any]]:
+    """
+    Yield decoded transcript entries from newest to oldest.
+
+    Lines that fail to decode (e.g. a partially written final line) are
+    skipped.
+
+    Args:
+        transcript_path: Path to the JSONL transcript file
+        predicate: Optional filter; only entries it accepts are yielded
+
+    Yields:
+        Message dictionaries
+    """
+    for line in iter_lines_reverse(transcript_path):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if predicate is None or predicate(entry):
+            yield entry
+
+
+def read_tail(transcript_path: str, count: int,
+              predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+    """
+    Read the last entries of a transcript without parsing the whole file.
+
+    Args:
+        transcript_path: Path to the JSONL transcript file
+        count: Maximum number of entries to return
+        predicate: Optional filter applied before counting
+
+    Returns:
+        Up to count matching entries, oldest first
+    """
+    entries = []
+    if count <= 0:
+        return entries
+
+    for entry in iter_entries_reverse(transcript_path, predicate):
+        entries.append(entry)
+        if len(entries) >= count:
+            break
+
+    entries.reverse()
+    return entries
+
+
+def get_message_role(message: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the role of a transcript entry.
+
+    Args:
+        message: Message dictionary
+
+    Returns:
+        Top-level 'role', falling back to the nested message role and
+        then the entry type
+    """
+    role = message.get('role')
+    if role is None:
+        inner = message.get('message')
+        if isinstance(inner, dict):
+            role = inner.get('role')
+    return role or message.get('type')
+
+
+def get_recent_messages(messages: Messages, count: int = 10, 
                        roles: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """
     Get the most recent messages, optionally filtered by roles.
     
     Args:
-        messages: List of message dictionaries
+        messages: List of message dictionaries, or a transcript path (read
+            from the tail, or from the offset index when filtering by role,
+            so cost does not grow with the transcript)
         count: Maximum number of messages to return
         roles: List of roles to filter by (e.g., ['user', 'assistant'])
         
     Returns:
         List of recent messages
     """
-    if roles:
-        filtered_messages = [msg for msg in messages if msg.get('role') in roles]
+    predicate = (lambda msg: get_message_role(msg) in roles) if roles else None
+
+    if isinstance(messages, (str, os.PathLike)):
+        path = os.fspath(messages)
+        if roles and count > 0 and os.path.exists(path):
+            # Role filters may skip far back; answer them from the index
+            try:
+                from lib.transcript_index import query_entries
+                return query_entries(path, limit=count, roles=roles)
+            except Exception:
+                pass
+        return read_tail(path, count, predicate)
+
+    if predicate:
+        filtered_messages = [msg for msg in messages if predicate(msg)]
     else:
         filtered_messages = messages
     
     return filtered_messages[-count:] if filtered_messages else []
 
 
-def get_recent_user_assistant_messages(messages: List[Dict[str, Any]], 
+def get_recent_user_assistant_messages(messages: Messages, 
                                      count: int = 5) -> List[Dict[str, Any]]:
     """
     Get recent user and assistant messages, excluding system messages.
     
     Args:
-        messages: List of message dictionaries
+        messages: List of message dictionaries or a transcript path
         count: Maximum number of messages to return
         
     Returns:
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Compact typed transcript records for Claude Code hooks.
+
+Instead of keeping every transcript line as nested dicts, entries are decoded
+into small __slots__ records holding only the fields the hooks use. Role,
+type, content-block and tool-name filters are pushed down to a byte scan of
+the raw line, so lines that cannot match are rejected before any JSON
+decoding. orjson is used for decoding when it is installed.
+"""
+
+import mmap
+import re
+from itertools import islice
+from typing import Dict, Any, Iterator, Optional, Sequence, Tuple, Callable
+
+from lib.deadline import Deadline, DeadlineExceeded
+from lib.transcript_parser import iter_lines_reverse
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    import json
+    loads = json.loads
+
+
+# Start of the tool_result Claude Code writes when the user declines a tool use
+REJECTION_PREFIX = "The user doesn't want to proceed"
+# Content blocks that carry tool activity, for the blocks filter
+TOOL_BLOCKS = ("tool_use", "tool_result")
+# Lines scanned between deadline checks
+CHECK_EVERY = 32
+
+
+class ToolUse:
+    """A tool_use block from an assistant message."""
+
+    __slots__ = ("id", "name", "input")
+
+    def __init__(self, id: str, name: str, input: Dict[str, Any]):
+        self.id = id
+        self.name = name
+        self.input = input
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the dictionary form used by tool_context_extractor."""
+        return {"name": self.name, "input": self.input, "id": self.id}
+
+    def __repr__(self) -> str:
+        return f"ToolUse({self.name!r}, id={self.id!r})"
+
+
+class TranscriptEntry:
+    """The fields of one transcript line that the hooks care about."""
+
+    __slots__ = ("offset", "type", "role", "timestamp", "session_id",
+                 "tool_uses", "tool_results", "errors", "rejections")
+
+    def __init__(self, offset: int, type: Optional[str], role: Optional[str],
+                 timestamp: Optional[str], session_id: Optional[str],
+                 tool_uses: Tuple[ToolUse, ...], tool_results: int, errors: int,
+                 rejections: int = 0):
+        self.offset = offset
+        self.type = type
+        self.role = role
+        self.timestamp = timestamp
+        self.session_id = session_id
+        self.tool_uses = tool_uses
+        self.tool_results = tool_results
+        self.errors = errors
+        self.rejections = rejections
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any], offset: int = -1) -> "TranscriptEntry":
+        """
+        Build a record from a decoded transcript line.
+
+        Args:
+            entry: Decoded transcript line
+            offset: Byte offset of the line in the transcript
+
+        Returns:
+            TranscriptEntry
+        """
+        # get_message_role(), inlined for the scan loop
+        inner = entry.get("message")
+        inner = inner if isinstance(inner, dict) else {}
+        role = entry.get("role")
+        if role is None:
+            role = inner.get("role")
+        kind = entry.get("type")
+
+        tool_uses = []
+        tool_results = 0
+        errors = 0
+        rejections = 0
+        content = inner.get("content")
+        if isinstance(content, list):
+            for item in content:
+                if not isinstance(item, dict):
+                    continue
+                block = item.get("type")
+                if block == "tool_use":
+                    tool_uses.append(ToolUse(item.get("id", ""), item.get("name", ""),
+                                             item.get("input") or {}))
+                elif block == "tool_result":
+                    tool_results += 1
+                    if item.get("is_error"):
+                        errors += 1
+                        if _is_rejection(item):
+                            rejections += 1
+
+        return cls(offset, kind, role or kind, entry.get("timestamp"),
+                   entry.get("sessionId"), tuple(tool_uses), tool_results, errors, rejections)
+
+    @property
+    def tool_use(self) -> Optional[ToolUse]:
+        """First tool_use in the entry, if any."""
+        return self.tool_uses[0] if self.tool_uses else None
+
+    def __repr__(self) -> str:
+        tools = ",".join(tool.name for tool in self.tool_uses)
+        return f"TranscriptEntry(offset={self.offset}, role={self.role!r}, tools=[{tools}])"
+
+
+def _is_rejection(item: Dict[str, Any]) -> bool:
+    """Whether a tool_result block is a declined permission prompt."""
+    content = item.get("content")
+    if isinstance(content, list):
+        content = " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return isinstance(content, str) and content.startswith(REJECTION_PREFIX)
+
+
+def make_prefilter(roles: Optional[Sequence[str]] = None,
+                   types: Optional[Sequence[str]] = None,
+                   tool_names: Optional[Sequence[str]] = None,
+                   blocks: Optional[Sequence[str]] = None) -> Optional[Callable[[bytes], bool]]:
+    """
+    Build a cheap byte-level test that rejects lines which cannot match.
+
+    The test only checks that the quoted values occur somewhere in the raw
+    line; it may accept lines that fail the real filter, never the reverse.
+    Its result is truthy rather than strictly a bool.
+
+    Args:
+        roles: Wanted roles
+        types: Wanted entry types
+        tool_names: Wanted tool_use names
+        blocks: Wanted content block types (e.g., "tool_use", "tool_result")
+
+    Returns:
+        Predicate on raw line bytes, or None if nothing can be pushed down
+    """
+    groups = []
+    if roles:
+        groups.append([f'"{role}"'.encode() for role in roles])
+    if types:
+        groups.append([f'"{kind}"'.encode() for kind in types])
+    if tool_names:
+        groups.append([b'"tool_use"'])
+        groups.append([f'"{name}"'.encode() for name in tool_names])
+    if blocks:
+        groups.append([f'"{block}"'.encode() for block in blocks])
+    if not groups:
+        return None
+
+    # One alternation per group; re finds the literals in C, which is much
+    # cheaper than a Python loop of `in` tests on every line
+    searches = [re.compile(b"|".join(re.escape(needle) for needle in group)).search
+                for group in groups]
+    if len(searches) == 1:
+        return searches[0]
+
+    def prefilter(line: bytes) -> bool:
+        return all(search(line) for search in searches)
+
+    return prefilter
+
+
+def _matches(record: TranscriptEntry, roles, types, tool_names, blocks) -> bool:
+    if roles and record.role not in roles:
+        return False
+    if types and record.type not in types:
+        return False
+    if tool_names and not any(tool.name in tool_names for tool in record.tool_uses):
+        return False
+    if blocks and not (("tool_use" in blocks and record.tool_uses)
+                       or ("tool_result" in blocks and record.tool_results)):
+        return False
+    return True
+
+
+def _decode(offset: int, line: bytes, filters) -> Optional[TranscriptEntry]:
+    """Decode a line that passed the prefilter into a record, if it matches."""
+    try:
+        entry = loads(line)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict):
+        return None
+    record = TranscriptEntry.from_dict(entry, offset)
+    return record if _matches(record, *filters) else None
+
+
+def _iter_lines(transcript_path: str, start: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """Yield (offset, line) for complete lines from start to EOF."""
+    try:
+        with open(transcript_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = len(mm)
+                pos = start
+                while pos < size:
+                    end = mm.find(b"\n", pos)
+                    if end == -1:
+                        # Partially written final line
+                        return
+                    if end > pos:
+                        yield pos, mm[pos:end]
+                    pos = end + 1
+    except (OSError, ValueError):
+        return
+
+
+class RecordScan:
+    """
+    Forward scan of a transcript that remembers how far it got.
+
+    Iterating yields the matching records. ``offset`` is the end of the last
+    line the caller is done with (a yielded record counts as done once the
+    caller asks for the next one), so a scan that stops early, e.g. on
+    DeadlineExceeded, can be resumed from it. A partially written final
+    line is left for the next scan.
+    """
+
+    def __init__(self, transcript_path: str,
+                 roles: Optional[Sequence[str]] = None,
+                 types: Optional[Sequence[str]] = None,
+                 tool_names: Optional[Sequence[str]] = None,
+                 blocks: Optional[Sequence[str]] = None,
+                 start: int = 0,
+                 deadline: Optional[Deadline] = None):
+        """
+        Set up the scan; nothing is read until iteration.
+
+        Args:
+            transcript_path: Path to the JSONL transcript file
+            roles: Only entries with one of these roles
+            types: Only entries with one of these types
+            tool_names: Only entries with a tool_use for one of these tools
+            blocks: Only entries with a content block of one of these types
+            start: Byte offset of the first line to read
+            deadline: Optional deadline, checked every CHECK_EVERY lines
+        """
+        self.transcript_path = transcript_path
+        self.filters = (roles, types, tool_names, blocks)
+        self.offset = start
+        self.lines = 0
+        self.deadline = deadline
+
+    def __iter__(self) -> Iterator[TranscriptEntry]:
+        """
+        Yield matching records from the current offset to EOF.
+
+        Raises:
+            DeadlineExceeded: If the deadline passes; offset is the first
+                line not yet read
+        """
+        prefilter = make_prefilter(*self.filters)
+        filters = self.filters
+        deadline = self.deadline
+        # self.offset and self.lines are only stored when control leaves
+        # the loop (yield, raise or EOF); attribute writes per line add up
+        lines = self.lines
+        end = self.offset
+        try:
+            for offset, line in _iter_lines(self.transcript_path, end):
+                if deadline is not None and lines % CHECK_EVERY == CHECK_EVERY - 1 and deadline.expired:
+                    end = offset
+                    raise DeadlineExceeded(f"read {lines} lines before the deadline")
+                lines += 1
+                if prefilter is None or prefilter(line):
+                    record = _decode(offset, line, filters)
+                    if record is not None:
+                        self.offset, self.lines = offset, lines
+                        yield record
+                end = offset + len(line) + 1
+        finally:
+            self.offset, self.lines = end, lines
+
+
+def iter_records(transcript_path: str,
+                 roles: Optional[Sequence[str]] = None,
+                 types: Optional[Sequence[str]] = None,
+                 tool_names: Optional[Sequence[str]] = None,
+                 start: int = 0,
+                 reverse: bool = False,
+                 blocks: Optional[Sequence[str]] = None,
+                 window: Optional[int] = None) -> Iterator[TranscriptEntry]:
+    """
+    Iterate typed records, decoding only lines that pass the byte prefilter.
+
+    Args:
+        transcript_path: Path to the JSONL transcript file
+        roles: Only entries with one of these roles
+        types: Only entries with one of these types
+        tool_names: Only entries with a tool_use for one of these tools
+        start: Byte offset to start from (forward iteration only)
+        reverse: Iterate from newest to oldest
+        blocks: Only entries with a content block of one of these types
+            ("tool_use", "tool_result")
+        window: Only look at this many lines (the newest ones when reverse),
+            matching or not
+
+    Yields:
+        Matching TranscriptEntry records
+    """
+    if not reverse and window is None:
+        yield from RecordScan(transcript_path, roles, types, tool_names, blocks, start)
+        return
+
+    filters = (roles, types, tool_names, blocks)
+    prefilter = make_prefilter(*filters)
+    if reverse:
+        lines = iter_lines_reverse(transcript_path, with_offsets=True)
+    else:
+        lines = _iter_lines(transcript_path, start)
+    if window is not None:
+        lines = islice(lines, window)
+
+    for offset, line in lines:
+        if prefilter is None or prefilter(line):
+            record = _decode(offset, line, filters)
+            if record is not None:
+                yield record
@@ -0,0 +1,865 @@
+#!/usr/bin/env python3
+"""
+Pluggable TTS backend registry for Claude Code hooks.
+
+Every backend has the same interface: probe() reports whether it can run
+here, and prepare() synthesizes an utterance into audio that is ready to
+play. Local engines (espeak-ng, piper, pico2wave, macOS say) render WAV
+bytes in memory (espeak-ng on stdout, the others through a scratch file that
+is read back and removed at once) and hand the samples to the long-lived
+audio sink (lib/audio_sink.py); without a sink the WAV is fed to a player
+(aplay, paplay, ffplay or afplay). The OpenAI backend keeps its cache and
+streaming path in lib.tts_manager.
+
+Probe results are kept in ~/.claude/.tts-backends.json for
+CLAUDE_TTS_PROBE_TTL seconds (default one day) and are redone sooner if PATH
+or the relevant settings change, so a hook never spawns `which`. The same
+file holds recent time-to-audio samples per backend (cache hits excluded);
+backends are tried in order of their median (a default estimate until
+measured). CLAUDE_TTS_BACKEND, or `speak.py --backend`, forces one backend.
+
+Speech is hedged: if the preferred backend has no audio ready within the
+hedge delay, the best backend of the other kind (local vs remote) starts
+synthesizing too, the first to have audio plays and the other is
+cancelled. The delay is the p90 of the preferred backend's recent
+time-to-audio (CLAUDE_TTS_HEDGE_DELAY_MS, default 400, until there are
+enough samples); CLAUDE_TTS_HEDGE=0 turns hedging off. Win/loss counts per
+backend are kept in the state file.
+
+The remote backend sits behind a cross-process circuit breaker
+(lib/circuit_breaker.py): after CLAUDE_TTS_CIRCUIT_FAILURES consecutive
+failures (default 3) it is skipped for CLAUDE_TTS_CIRCUIT_COOLDOWN seconds
+(default 30, doubling after each failed half-open probe), so hooks go
+straight to a local engine instead of waiting on a dead endpoint.
+"""
+
+import abc
+import fcntl
+import json
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from lib.audio_sink import get_sink, read_wav
+from lib.circuit_breaker import CircuitBreaker
+from lib.hook_events import SpanCapture, span, tag
+from lib.tts_manager import PreparedAudio
+
+
+DEFAULT_STATE_PATH = "~/.claude/.tts-backends.json"
+DEFAULT_PROBE_TTL = 86400
+LATENCY_SAMPLES = 20
+
+DEFAULT_HEDGE_DELAY_MS = 400.0
+HEDGE_MIN_SAMPLES = 5
+HEDGE_MIN_MS = 100.0
+HEDGE_MAX_MS = 2000.0
+
+# Players for synthesized WAV/AIFF files, in order of preference
+PLAYERS = [
+    ["aplay", "-q"],
+    ["paplay"],
+    ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"],
+    ["afplay"],
+]
+
+# Settings that change what a probe would find
+PROBE_ENV = ("PATH", "OPENAI_API_KEY", "CLAUDE_PIPER_MODEL", "CLAUDE_TTS_STREAM_PLAYER")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _which(name: str) -> Optional[str]:
+    import shutil
+    return shutil.which(name)
+
+
+def _run(command: List[str], stdin: Optional[bytes] = None,
+         cancel: Optional[threading.Event] = None, timeout: float = 60,
+         capture: bool = False) -> Tuple[bool, bytes]:
+    """
+    Run an engine or player quietly.
+
+    Args:
+        command: Command line
+        stdin: Bytes to feed on stdin
+        cancel: Kills the process when set
+        timeout: Seconds before the process is killed
+        capture: Collect what the process writes to stdout
+
+    Returns:
+        Tuple of (whether it exited cleanly, its stdout if captured)
+    """
+    import subprocess
+    try:
+        proc = subprocess.Popen(command, stdin=subprocess.PIPE if stdin is not None else subprocess.DEVNULL,
+                                stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+    except OSError:
+        return False, b""
+
+    try:
+        give_up = time.monotonic() + timeout
+        # Retried communicate() calls keep the output read so far
+        pending_input = stdin
+        while True:
+            try:
+                out, _ = proc.communicate(pending_input, timeout=0.005 if cancel is not None else timeout)
+                return proc.returncode == 0, out or b""
+            except subprocess.TimeoutExpired:
+                pending_input = None
+                if (cancel is not None and cancel.is_set()) or time.monotonic() >= give_up:
+                    break
+    except Exception:
+        pass
+
+    proc.kill()
+    proc.wait()
+    return False, b""
+
+
+def _play_wav(player: List[str], audio: bytes, cancel: Optional[threading.Event] = None) -> bool:
+    """Play WAV bytes with a file player, feeding them on stdin where it can."""
+    name = os.path.basename(player[0])
+    if name != "afplay":
+        return _run(player + ["-"] if name == "ffplay" else player, stdin=audio, cancel=cancel)[0]
+
+    # afplay only plays files
+    import tempfile
+    fd, path = tempfile.mkstemp(prefix="claude-tts-", suffix=".wav")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        return _run(player + [path], cancel=cancel)[0]
+    finally:
+        os.unlink(path)
+
+
+class TTSBackend(abc.ABC):
+    """Base class: anything that turns text into audio ready to play."""
+
+    name = ""
+    kind = "local"
+    # Time-to-audio guess used until the backend has been measured
+    default_latency_ms = 500.0
+    # Guards backends whose failures are slow to discover
+    breaker: Optional[CircuitBreaker] = None
+
+    @abc.abstractmethod
+    def probe(self) -> Dict[str, Any]:
+        """
+        Check whether the backend can run on this machine.
+
+        Returns:
+            Dictionary with 'available' and a 'reason' when unavailable,
+            plus whatever prepare() needs as its capability
+        """
+
+    @abc.abstractmethod
+    def prepare(self, text: str, voice: str, capability: Dict[str, Any],
+                player: Optional[List[str]],
+                cancel: Optional[threading.Event] = None) -> Optional[PreparedAudio]:
+        """
+        Synthesize text and return audio ready to play.
+
+        Args:
+            text: Text to speak
+            voice: Requested voice
+            capability: This backend's probe result
+            player: Player command for synthesized files, used when there
+                is no audio sink
+            cancel: Abandons synthesis when set, and stops playback when
+                set after it has started
+
+        Returns:
+            PreparedAudio, or None on failure or cancellation
+        """
+
+    def failure_reason(self) -> Optional[str]:
+        """Why the calling thread's last prepare() failed, if known."""
+        return None
+
+
+class EngineBackend(TTSBackend):
+    """Base class: a local engine binary that synthesizes WAV audio."""
+
+    binaries: List[str] = []
+    suffix = ".wav"
+
+    def probe(self) -> Dict[str, Any]:
+        """
+        Check whether the engine is installed.
+
+        Returns:
+            Dictionary with 'available', a 'reason' when unavailable and the
+            resolved 'binary'
+        """
+        for binary in self.binaries:
+            path = _which(binary)
+            if path:
+                return {"available": True, "binary": path}
+        return {"available": False, "reason": f"{' or '.join(self.binaries)} not found"}
+
+    @abc.abstractmethod
+    def command(self, capability: Dict[str, Any], text: str, output: str) -> List[str]:
+        """Command line (for the probed capability) that writes the synthesized text to output."""
+
+    def synthesize(self, text: str, voice: str, output: str, capability: Dict[str, Any],
+                   cancel: Optional[threading.Event] = None) -> bool:
+        """
+        Synthesize text into an audio file.
+
+        Args:
+            text: Text to speak
+            voice: Requested voice (engines without OpenAI voices ignore it)
+            output: File to write
+            capability: This backend's probe result
+            cancel: Kills the engine when set
+
+        Returns:
+            True if the file was written
+        """
+        return (_run(self.command(capability, text, output), cancel=cancel)[0]
+                and os.path.getsize(output) > 0)
+
+    def render(self, text: str, voice: str, capability: Dict[str, Any],
+               cancel: Optional[threading.Event] = None) -> Optional[bytes]:
+        """
+        Synthesize text into WAV bytes.
+
+        Engines that can only write files synthesize into a scratch file
+        that is read back and removed straight away.
+
+        Returns:
+            The WAV file contents, or None on failure or cancellation
+        """
+        import tempfile
+        fd, output = tempfile.mkstemp(prefix="claude-tts-", suffix=self.suffix)
+        os.close(fd)
+        try:
+            if not self.synthesize(text, voice, output, capability, cancel):
+                return None
+            with open(output, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+        finally:
+            os.unlink(output)
+
+    def prepare(self, text: str, voice: str, capability: Dict[str, Any],
+                player: Optional[List[str]],
+                cancel: Optional[threading.Event] = None) -> Optional[PreparedAudio]:
+        """Render WAV and play it through the audio sink, or the player without one."""
+        sink = get_sink()
+        if sink is None and not player:
+            return None
+        if cancel is None:
+            cancel = threading.Event()
+
+        with span("synthesize"):
+            audio = self.render(text, voice, capability, cancel)
+        if not audio or cancel.is_set():
+            return None
+
+        decoded = read_wav(audio) if sink is not None else None
+        if decoded is not None:
+            fmt, pcm = decoded
+
+            def play_pcm() -> bool:
+                with span("play"):
+                    return sink.play(pcm, fmt, cancel)
+            return PreparedAudio(play_pcm, cancel=cancel)
+
+        if not player:
+            return None
+
+        def play_file() -> bool:
+            with span("play"):
+                return _play_wav(player, audio, cancel)
+        return PreparedAudio(play_file, cancel=cancel)
+
+
+class OpenAIBackend(TTSBackend):
+    """OpenAI speech API, with the TTS cache and streaming playback."""
+
+    name = "openai"
+    kind = "remote"
+    # Tried first until measured, as before the registry existed
+    default_latency_ms = 250.0
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            self.name,
+            failure_threshold=int(_env_float("CLAUDE_TTS_CIRCUIT_FAILURES", 3)),
+            cooldown=_env_float("CLAUDE_TTS_CIRCUIT_COOLDOWN", 30.0),
+        )
+
+    def failure_reason(self) -> Optional[str]:
+        from lib.tts_manager import last_openai_error
+        return last_openai_error()
+
+    def probe(self) -> Dict[str, Any]:
+        if not os.getenv("OPENAI_API_KEY"):
+            return {"available": False, "reason": "OPENAI_API_KEY not set"}
+        import importlib.util
+        if importlib.util.find_spec("requests") is None:
+            return {"available": False, "reason": "requests not installed"}
+        return {"available": True}
+
+    def prepare(self, text: str, voice: str, capability: Dict[str, Any],
+                player: Optional[List[str]],
+                cancel: Optional[threading.Event] = None) -> Optional[PreparedAudio]:
+        from lib.tts_manager import prepare_openai_audio
+        return prepare_openai_audio(text, voice, cancel)
+
+
+class SayBackend(EngineBackend):
+    """macOS say."""
+
+    name = "say"
+    binaries = ["say"]
+    default_latency_ms = 300.0
+
+    def command(self, capability: Dict[str, Any], text: str, output: str) -> List[str]:
+        # 16-bit little-endian WAV, which the audio sink can take as is
+        return [capability["binary"], "-o", output, "--data-format=LEI16@22050", text]
+
+
+class EspeakBackend(EngineBackend):
+    """espeak-ng (or classic espeak)."""
+
+    name = "espeak-ng"
+    binaries = ["espeak-ng", "espeak"]
+    default_latency_ms = 600.0
+
+    def command(self, capability: Dict[str, Any], text: str, output: str) -> List[str]:
+        return [capability["binary"], "-w", output, "--", text]
+
+    def render(self, text: str, voice: str, capability: Dict[str, Any],
+               cancel: Optional[threading.Event] = None) -> Optional[bytes]:
+        # Straight from stdout; no scratch file
+        ok, audio = _run([capability["binary"], "--stdout", "--", text], cancel=cancel, capture=True)
+        return audio if ok and audio else None
+
+
+class PiperBackend(EngineBackend):
+    """Piper neural TTS; the voice model comes from CLAUDE_PIPER_MODEL."""
+
+    name = "piper"
+    binaries = ["piper"]
+    default_latency_ms = 500.0
+
+    def probe(self) -> Dict[str, Any]:
+        result = super().probe()
+        if not result["available"]:
+            return result
+        model = os.path.expanduser(os.getenv("CLAUDE_PIPER_MODEL", ""))
+        if not model or not os.path.exists(model):
+            return {"available": False, "reason": "CLAUDE_PIPER_MODEL not set or missing"}
+        return dict(result, model=model)
+
+    def command(self, capability: Dict[str, Any], text: str, output: str) -> List[str]:
+        # The text goes on stdin (see synthesize)
+        return [capability["binary"], "--model", capability["model"], "--output_file", output]
+
+    def synthesize(self, text: str, voice: str, output: str, capability: Dict[str, Any],
+                   cancel: Optional[threading.Event] = None) -> bool:
+        command = self.command(capability, text, output)
+        return _run(command, stdin=text.encode(), cancel=cancel)[0] and os.path.getsize(output) > 0
+
+
+class Pico2WaveBackend(EngineBackend):
+    """SVOX pico2wave."""
+
+    name = "pico2wave"
+    binaries = ["pico2wave"]
+    default_latency_ms = 650.0
+
+    def command(self, capability: Dict[str, Any], text: str, output: str) -> List[str]:
+        return [capability["binary"], "-w", output, text]
+
+
+class BackendRegistry:
+    """Registered backends, their cached capabilities and measured latency."""
+
+    def __init__(self, state_path: str = DEFAULT_STATE_PATH, probe_ttl: Optional[float] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            state_path: Capability and latency state file (supports ~ expansion)
+            probe_ttl: Seconds a probe stays valid (defaults to
+                CLAUDE_TTS_PROBE_TTL or one day)
+        """
+        self.state_path = Path(state_path).expanduser()
+        if probe_ttl is None:
+            try:
+                probe_ttl = float(os.getenv("CLAUDE_TTS_PROBE_TTL", DEFAULT_PROBE_TTL))
+            except ValueError:
+                probe_ttl = DEFAULT_PROBE_TTL
+        self.probe_ttl = probe_ttl
+        self.backends: Dict[str, TTSBackend] = {}
+        self._state: Optional[Dict[str, Any]] = None
+        self._state_mtime: Optional[int] = None
+        # Serializes the threads of this process; the flock in _locked()
+        # serializes processes
+        self._lock = threading.Lock()
+
+    def register(self, backend: TTSBackend) -> None:
+        """Add a backend (replacing one with the same name)."""
+        self.backends[backend.name] = backend
+        self._state = None
+
+    def names(self) -> List[str]:
+        """Names of all registered backends."""
+        return list(self.backends)
+
+    @staticmethod
+    def _fingerprint() -> str:
+        material = "\x00".join(os.getenv(name, "") for name in PROBE_ENV)
+        return format(zlib.crc32(material.encode()), "08x")
+
+    def _load(self) -> Dict[str, Any]:
+        """Read the state file if it changed since it was last read."""
+        try:
+            mtime = self.state_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if self._state is None or mtime != self._state_mtime:
+            try:
+                self._state = json.loads(self.state_path.read_text())
+            except (OSError, ValueError):
+                self._state = {}
+            self._state_mtime = mtime
+        return self._state
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict[str, Any]]:
+        """
+        Hold the state lock and yield a fresh copy of the state.
+
+        Changes to the yielded dictionary are written back atomically on
+        exit. The lock is an flock on a sibling file, so read-modify-write
+        is serialized between processes as well as threads; the state file
+        itself is replaced on every write, which leaves readers lock-free.
+        """
+        with self._lock:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.state_path.with_name(f".{self.state_path.name}.lock"),
+                         os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    state = json.loads(self.state_path.read_text())
+                except (OSError, ValueError):
+                    state = {}
+                before = json.dumps(state, sort_keys=True)
+
+                yield state
+
+                if json.dumps(state, sort_keys=True) != before:
+                    self._write(state)
+                self._state = state
+                try:
+                    self._state_mtime = self.state_path.stat().st_mtime_ns
+                except OSError:
+                    self._state_mtime = None
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        """Replace the state file; must hold the state lock."""
+        import tempfile
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_path.parent,
+                                        prefix=f".{self.state_path.name}-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(state, indent=2))
+            os.replace(tmp_path, self.state_path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def probe(self) -> Dict[str, Any]:
+        """
+        Probe every backend and player now and store the result.
+
+        Returns:
+            The new capability state
+        """
+        capabilities = {}
+        for name, backend in self.backends.items():
+            try:
+                capabilities[name] = backend.probe()
+            except Exception as e:
+                capabilities[name] = {"available": False, "reason": str(e)}
+        player = next((command for command in PLAYERS if _which(command[0])), None)
+
+        try:
+            with self._locked() as state:
+                state.update(probed_at=time.time(), fingerprint=self._fingerprint(),
+                             backends=capabilities, player=player)
+        except OSError:
+            # Unwritable state directory: use the probe without keeping it
+            state = dict(self._load(), probed_at=time.time(), fingerprint=self._fingerprint(),
+                         backends=capabilities, player=player)
+            self._state = state
+        return state
+
+    def capabilities(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get the probe results, probing again if they are stale.
+
+        Args:
+            refresh: Probe even if the stored results are still valid
+
+        Returns:
+            Capability state with 'backends', 'player' and 'probed_at'
+        """
+        state = self._load()
+        stale = (refresh
+                 or time.time() - state.get("probed_at", 0) > self.probe_ttl
+                 or state.get("fingerprint") != self._fingerprint()
+                 or set(state.get("backends", {})) != set(self.backends))
+        return self.probe() if stale else state
+
+    def is_available(self, name: str) -> bool:
+        """Whether a backend passed its last probe."""
+        return bool(self.capabilities().get("backends", {}).get(name, {}).get("available"))
+
+    def median_latency(self, name: str) -> Optional[float]:
+        """Median measured time-to-audio of a backend in ms, if measured."""
+        samples = sorted(self._load().get("latency", {}).get(name, []))
+        return samples[len(samples) // 2] if samples else None
+
+    def record_latency(self, name: str, ms: float) -> None:
+        """
+        Add a time-to-audio sample for a backend.
+
+        Args:
+            name: Backend name
+            ms: Milliseconds from the start of synthesis until audio was ready
+        """
+        try:
+            with self._locked() as state:
+                latency = state.setdefault("latency", {})
+                latency[name] = (latency.get(name, []) + [round(ms, 1)])[-LATENCY_SAMPLES:]
+        except OSError:
+            pass
+
+    def candidates(self, prefer_openai: bool = True) -> List[str]:
+        """
+        Available backends in the order they should be tried.
+
+        Args:
+            prefer_openai: If False, remote backends go last
+
+        Returns:
+            Backend names, fastest median time-to-audio first
+        """
+        capabilities = self.capabilities().get("backends", {})
+        available = [name for name in self.backends
+                     if capabilities.get(name, {}).get("available")
+                     and not (self.backends[name].breaker and self.backends[name].breaker.is_blocked())]
+
+        def rank(name: str):
+            backend = self.backends[name]
+            median = self.median_latency(name)
+            demoted = not prefer_openai and backend.kind == "remote"
+            return (demoted, median if median is not None else backend.default_latency_ms)
+
+        return sorted(available, key=rank)
+
+    def hedge_delay_ms(self, name: str) -> float:
+        """
+        How long to wait for a backend's audio before hedging.
+
+        Args:
+            name: Backend that goes first
+
+        Returns:
+            p90 of its recent time-to-audio, clamped, or the configured
+            delay until there are enough samples
+        """
+        samples = sorted(self._load().get("latency", {}).get(name, []))
+        if len(samples) >= HEDGE_MIN_SAMPLES:
+            p90 = samples[min(len(samples) - 1, int(0.9 * len(samples)))]
+            return min(HEDGE_MAX_MS, max(HEDGE_MIN_MS, p90))
+        try:
+            return float(os.getenv("CLAUDE_TTS_HEDGE_DELAY_MS", DEFAULT_HEDGE_DELAY_MS))
+        except ValueError:
+            return DEFAULT_HEDGE_DELAY_MS
+
+    def record_race(self, winner: str, losers: List[str]) -> None:
+        """
+        Count the outcome of a hedged race.
+
+        Args:
+            winner: Backend whose audio was played
+            losers: Backends that were cancelled or failed
+        """
+        try:
+            with self._locked() as state:
+                counts = state.setdefault("hedge", {})
+                for name, outcome in [(winner, "wins")] + [(loser, "losses") for loser in losers]:
+                    entry = counts.setdefault(name, {"wins": 0, "losses": 0})
+                    entry[outcome] = entry.get(outcome, 0) + 1
+        except OSError:
+            pass
+
+    def _prepare(self, name: str, text: str, voice: str, state: Dict[str, Any],
+                 cancel: Optional[threading.Event] = None) -> Optional[PreparedAudio]:
+        """Run one backend's prepare(), treating exceptions as failure and
+        reporting the outcome to the backend's circuit breaker."""
+        backend = self.backends[name]
+        breaker = backend.breaker
+        if breaker and not breaker.allow():
+            tag(circuit="open")
+            return None
+
+        capability = state.get("backends", {}).get(name, {})
+        try:
+            prepared = backend.prepare(text, voice, capability, state.get("player"), cancel)
+        except Exception:
+            prepared = None
+
+        if breaker:
+            reason = backend.failure_reason() if prepared is None else None
+            if prepared is not None:
+                breaker.record_success()
+            elif reason is None and cancel is not None and cancel.is_set():
+                # Abandoned after losing a hedged race: no verdict on the
+                # backend's health
+                breaker.release()
+            else:
+                # Includes calls that failed on their own after the race
+                # was lost, e.g., a hung endpoint that finally errors
+                breaker.record_failure(reason or "synthesis failed")
+        return prepared
+
+    def _finish(self, name: str, prepared: PreparedAudio, elapsed_ms: float) -> PreparedAudio:
+        """Record the backend's time-to-audio and label the audio with it."""
+        tag(backend=name)
+        if name == "openai":
+            tag(cache="hit" if prepared.cached else "miss")
+        if not prepared.cached:
+            self.record_latency(name, elapsed_ms)
+        prepared.backend = name
+        return prepared
+
+    def _race(self, text: str, voice: str, state: Dict[str, Any],
+              primary: str, secondary: str) -> Tuple[Optional[str], Optional[PreparedAudio], float]:
+        """
+        Start primary, start secondary too if primary has no audio within the
+        hedge delay, and keep whichever has audio first.
+
+        Returns:
+            Tuple of (winner, its audio, ms from the winner's start until
+            its audio was ready); the winner is None if both failed
+        """
+        delay = self.hedge_delay_ms(primary)
+        cond = threading.Condition()
+        finished: List[str] = []
+        won: Dict[str, Any] = {}
+        cancels = {primary: threading.Event(), secondary: threading.Event()}
+        # The invocation is thread-local, so each contender collects its own
+        # spans and tags and only the winner's are merged below
+        captures = {primary: SpanCapture(), secondary: SpanCapture()}
+
+        def contend(name: str) -> None:
+            own_start = time.perf_counter()
+            with captures[name]:
+                prepared = self._prepare(name, text, voice, state, cancels[name])
+            with cond:
+                finished.append(name)
+                if prepared is not None and not won:
+                    won.update(name=name, audio=prepared,
+                               ms=(time.perf_counter() - own_start) * 1000)
+                elif prepared is not None:
+                    prepared.discard()
+                cond.notify_all()
+
+        running = [primary]
+        threading.Thread(target=contend, args=(primary,), daemon=True).start()
+        with span("synthesize"):
+            with cond:
+                cond.wait_for(lambda: won or finished, timeout=delay / 1000)
+                hedged = not won
+            if hedged:
+                running.append(secondary)
+                threading.Thread(target=contend, args=(secondary,), daemon=True).start()
+                with cond:
+                    cond.wait_for(lambda: won or len(finished) == len(running))
+
+        winner = won.get("name")
+        for name, cancel in cancels.items():
+            if name != winner:
+                cancel.set()
+        # Without a winner every contender has finished, and all of them
+        # explain the failure
+        for name in [winner] if winner else running:
+            captures[name].merge()
+
+        tag(hedge="fired" if hedged else "not needed", hedge_delay_ms=round(delay, 1))
+        if hedged and winner:
+            self.record_race(winner, [name for name in running if name != winner])
+        return winner, won.get("audio"), won.get("ms", 0.0)
+
+    def hedge_pair(self, names: List[str]) -> Optional[Tuple[str, str]]:
+        """
+        Pick the backends to race: the first candidate and the best
+        candidate of the other kind (remote vs local).
+
+        Args:
+            names: Candidates in order of preference
+
+        Returns:
+            Tuple of (primary, secondary), or None if there is no such pair
+        """
+        if not names:
+            return None
+        primary = names[0]
+        kind = self.backends[primary].kind
+        secondary = next((name for name in names[1:] if self.backends[name].kind != kind), None)
+        return (primary, secondary) if secondary else None
+
+    def prepare(self, text: str, voice: str = "alloy", backend: Optional[str] = None,
+                prefer_openai: bool = True, hedge: Optional[bool] = None,
+                exclude: Optional[List[str]] = None) -> Optional[PreparedAudio]:
+        """
+        Synthesize text with the forced backend or the fastest available one,
+        without playing it.
+
+        Args:
+            text: Text to speak
+            voice: Voice to use for OpenAI TTS
+            backend: Only use this backend (defaults to CLAUDE_TTS_BACKEND)
+            prefer_openai: If False, remote backends are tried last
+            hedge: Race a second backend if the first is slow (defaults to
+                CLAUDE_TTS_HEDGE, on unless '0')
+            exclude: Backends not to try (e.g., ones whose audio failed to play)
+
+        Returns:
+            PreparedAudio labelled with its backend, or None if every
+            backend failed
+        """
+        backend = backend or os.getenv("CLAUDE_TTS_BACKEND") or None
+        state = self.capabilities()
+        names = [backend] if backend else self.candidates(prefer_openai)
+        names = [name for name in names if name in self.backends and name not in (exclude or [])]
+        if hedge is None:
+            hedge = os.getenv("CLAUDE_TTS_HEDGE", "1") != "0"
+
+        pair = self.hedge_pair(names) if hedge and not backend else None
+        if pair:
+            winner, prepared, elapsed_ms = self._race(text, voice, state, *pair)
+            if prepared is not None:
+                return self._finish(winner, prepared, elapsed_ms)
+            names = [name for name in names if name not in pair]
+
+        for name in names:
+            started = time.perf_counter()
+            prepared = self._prepare(name, text, voice, state)
+            if prepared is not None:
+                return self._finish(name, prepared, (time.perf_counter() - started) * 1000)
+        return None
+
+    def speak(self, text: str, voice: str = "alloy", backend: Optional[str] = None,
+              prefer_openai: bool = True, hedge: Optional[bool] = None) -> bool:
+        """
+        Speak text with the forced backend or the fastest available one.
+
+        Args:
+            text: Text to speak
+            voice: Voice to use for OpenAI TTS
+            backend: Only use this backend (defaults to CLAUDE_TTS_BACKEND)
+            prefer_openai: If False, remote backends are tried last
+            hedge: Race a second backend if the first is slow (defaults to
+                CLAUDE_TTS_HEDGE, on unless '0')
+
+        Returns:
+            True if a backend spoke the text
+        """
+        # Audio that can't be played (e.g., no player for its format) moves
+        # on to the next backend, as a synthesis failure does
+        failed: List[str] = []
+        while True:
+            prepared = self.prepare(text, voice, backend=backend, prefer_openai=prefer_openai,
+                                    hedge=hedge, exclude=failed)
+            if prepared is None:
+                return False
+            if prepared.play():
+                return True
+            tag(playback_failed=prepared.backend)
+            failed.append(prepared.backend)
+
+    @staticmethod
+    def _circuit_report(backend: TTSBackend) -> Optional[Dict[str, Any]]:
+        """Breaker state of a backend, with seconds until the next probe."""
+        if not backend.breaker:
+            return None
+        status = backend.breaker.status()
+        report = {"state": status.get("state"), "failures": status.get("failures", 0)}
+        if status.get("state") == "open":
+            report["retry_in"] = round(max(0.0, status.get("retry_at", 0) - time.time()), 1)
+        return report
+
+    def report(self, refresh: bool = True) -> Dict[str, Any]:
+        """
+        Describe every backend for `speak.py --probe`.
+
+        Args:
+            refresh: Probe again instead of using cached results
+
+        Returns:
+            Dictionary with 'backends' rows, the 'player', the audio 'sink', the selection
+            'order', the 'hedge' pair and delay, and when the probe ran
+        """
+        state = self.capabilities(refresh=refresh)
+        hedge = state.get("hedge", {})
+        rows = []
+        for name, backend in self.backends.items():
+            capability = state.get("backends", {}).get(name, {})
+            rows.append({
+                "name": name,
+                "kind": backend.kind,
+                "available": bool(capability.get("available")),
+                "detail": capability.get("binary") or capability.get("reason", ""),
+                "median_ms": self.median_latency(name),
+                "samples": len(self._load().get("latency", {}).get(name, [])),
+                "hedge_wins": hedge.get(name, {}).get("wins", 0),
+                "hedge_losses": hedge.get(name, {}).get("losses", 0),
+                "circuit": self._circuit_report(backend),
+            })
+        order = self.candidates()
+        pair = self.hedge_pair(order)
+        sink = get_sink()
+        return {"backends": rows, "player": state.get("player"),
+                "sink": sink.describe() if sink is not None else None, "order": order,
+                "hedge": {"primary": pair[0], "secondary": pair[1],
+                          "delay_ms": self.hedge_delay_ms(pair[0])} if pair else None,
+                "probed_at": state.get("probed_at")}
+
+
+def create_default_registry() -> BackendRegistry:
+    """Registry with every built-in backend."""
+    registry = BackendRegistry()
+    for backend in (OpenAIBackend(), SayBackend(), PiperBackend(),
+                    EspeakBackend(), Pico2WaveBackend()):
+        registry.register(backend)
+    return registry
+
+
+default_registry = create_default_registry()
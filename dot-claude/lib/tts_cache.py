@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache of synthesized TTS audio.
+
+Entries are keyed by (text, voice, model, format) and stored under
+~/.claude/.tts-cache. Writes are atomic (tempfile + rename) so several hook
+processes can fill the cache at once, and the total size is capped with LRU
+eviction based on file mtime.
+
+Lookups count hits and misses by appending one byte to .counts (an O_APPEND
+write, so concurrent hooks neither lock nor lose increments). The bytes are
+folded into stats.json under the cache lock by evict() and stats().
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+
+DEFAULT_CACHE_DIR = "~/.claude/.tts-cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+COUNTS_FILE = ".counts"
+COUNTER_CODES = {"hits": b"h", "misses": b"m"}
+# Folded counts files larger than this are removed and started afresh
+MAX_COUNTS_BYTES = 1024 * 1024
+
+
+class TTSCache:
+    """Size-capped, multi-process safe cache of synthesized audio files."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cached audio (supports ~ expansion)
+            max_bytes: Maximum total size of cached audio before eviction
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(text: str, voice: str, model: str, fmt: str) -> str:
+        """
+        Build the content address for an utterance.
+
+        Args:
+            text: Spoken text
+            voice: Voice name
+            model: TTS model name
+            fmt: Audio format (e.g., 'mp3')
+
+        Returns:
+            Hex digest identifying the audio
+        """
+        material = "\x00".join((text, voice, model, fmt))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str, fmt: str) -> Path:
+        """Get the file path for a cache key."""
+        return self.cache_dir / f"{key}.{fmt}"
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the cache-wide advisory lock (eviction and folding counters)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.cache_dir / ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _count(self, field: str) -> None:
+        """Record one hit or miss; lock-free."""
+        path = self.cache_dir / COUNTS_FILE
+        try:
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            except FileNotFoundError:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, COUNTER_CODES[field])
+            finally:
+                os.close(fd)
+        except Exception:
+            pass
+
+    def _fold(self) -> Dict[str, Any]:
+        """
+        Add new counter bytes to stats.json; must hold the cache lock.
+
+        Returns:
+            The updated stats
+        """
+        stats_path = self.cache_dir / "stats.json"
+        counts_path = self.cache_dir / COUNTS_FILE
+        try:
+            stats = json.loads(stats_path.read_text())
+        except (OSError, ValueError):
+            stats = {}
+
+        folded = stats.get("folded", 0)
+        try:
+            with open(counts_path, "rb") as f:
+                f.seek(folded)
+                data = f.read()
+        except OSError:
+            data = b""
+            folded = 0
+        if not data and folded == stats.get("folded", 0):
+            return stats
+
+        for field, code in COUNTER_CODES.items():
+            stats[field] = stats.get(field, 0) + data.count(code)
+        stats["folded"] = folded + len(data)
+        if stats["folded"] > MAX_COUNTS_BYTES:
+            # An increment racing this unlink is lost; counters are advisory
+            counts_path.unlink(missing_ok=True)
+            stats["folded"] = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".stats-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(stats))
+            os.replace(tmp_path, stats_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return stats
+
+    def contains(self, text: str, voice: str, model: str, fmt: str) -> bool:
+        """Check for cached audio without touching LRU order or counters."""
+        return self.path_for(self.make_key(text, voice, model, fmt), fmt).exists()
+
+    def get(self, text: str, voice: str, model: str, fmt: str) -> Optional[Path]:
+        """
+        Look up cached audio and mark it as recently used.
+
+        Args:
+            text: Spoken text
+            voice: Voice name
+            model: TTS model name
+            fmt: Audio format
+
+        Returns:
+            Path of the cached audio, or None on a miss
+        """
+        path = self.path_for(self.make_key(text, voice, model, fmt), fmt)
+        try:
+            os.utime(path)
+        except OSError:
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        return path
+
+    def put(self, text: str, voice: str, model: str, fmt: str, audio: bytes) -> Optional[Path]:
+        """
+        Store audio atomically and evict old entries if over the size cap.
+
+        Args:
+            text: Spoken text
+            voice: Voice name
+            model: TTS model name
+            fmt: Audio format
+            audio: Encoded audio bytes
+
+        Returns:
+            Path of the cached audio, or None if it could not be written
+        """
+        path = self.path_for(self.make_key(text, voice, model, fmt), fmt)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-", suffix=f".{fmt}")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except Exception:
+            return None
+
+        self.evict()
+        return path
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        try:
+            with self._locked():
+                self._fold()
+                entries = []
+                total = 0
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.startswith(".") or entry.name == "stats.json":
+                        continue
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+
+                for _, size, path in sorted(entries):
+                    if total <= self.max_bytes:
+                        break
+                    try:
+                        os.unlink(path)
+                        total -= size
+                        removed += 1
+                    except OSError:
+                        pass
+        except Exception:
+            pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters and usage.
+
+        Returns:
+            Dictionary with hits, misses, entries and total bytes
+        """
+        try:
+            with self._locked():
+                stats = self._fold()
+        except Exception:
+            stats = {}
+
+        entries = 0
+        total = 0
+        if self.cache_dir.exists():
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.startswith(".") and entry.name != "stats.json":
+                    entries += 1
+                    total += entry.stat().st_size
+
+        return {
+            "hits": stats.get("hits", 0),
+            "misses": stats.get("misses", 0),
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Global cache instance with default configuration
+default_cache = TTSCache()
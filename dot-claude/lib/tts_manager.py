@@ -1,62 +1,510 @@
 #!/usr/bin/env python3
 """
 Text-to-Speech manager utilities for Claude Code hooks.
+
+speak_text() picks a backend through the registry in lib/tts_backends.py;
+this module holds the OpenAI path (cache, streaming) it uses. When an audio
+sink is available (lib/audio_sink.py) OpenAI is asked for raw PCM, which is
+streamed into the sink's long-lived player instead of a new player process.
 """
 
+import itertools
 import os
-import subprocess
-import tempfile
-import requests
-from typing import Optional
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from lib.hook_events import span, tag
+
+# subprocess, tempfile and requests are imported inside the functions that
+# need them so hooks that never reach speech synthesis don't pay for them.
+
+
+OPENAI_VOICES = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
+OPENAI_TTS_MODEL = "tts-1"
+OPENAI_TTS_FORMAT = "mp3"
+STREAM_CHUNK_SIZE = 4096
+# Seconds between cancel checks while a player runs
+CANCEL_POLL = 0.02
+
+# Players that can decode mp3 from stdin, in order of preference
+STREAM_PLAYERS = [
+    ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", "-"],
+    ["mpg123", "-q", "-"],
+    ["mpv", "--no-video", "--really-quiet", "-"],
+]
+
+# Keep-alive HTTP session, reused for every request in long-lived processes
+_session = None
+_stream_player = None
+# Why the calling thread's last OpenAI request failed
+_last_error = threading.local()
+
+
+def last_openai_error() -> Optional[str]:
+    """Why the calling thread's last OpenAI request failed, if it did."""
+    return getattr(_last_error, "reason", None)
+
 
+def _set_openai_error(reason: Optional[str]) -> None:
+    _last_error.reason = reason
 
-def speak_with_openai(text: str, voice: str = "alloy") -> bool:
+
+def _get_session():
+    """Get the shared requests.Session, creating it on first use."""
+    global _session
+    if _session is None:
+        import requests
+        _session = requests.Session()
+    return _session
+
+
+def openai_audio_format() -> str:
+    """Format to request from OpenAI: raw PCM when a sink can play it."""
+    from lib.audio_sink import get_sink
+    return "pcm" if get_sink() is not None else OPENAI_TTS_FORMAT
+
+
+def _openai_speech_request(text: str, voice: str, stream: bool, fmt: str = OPENAI_TTS_FORMAT):
+    """
+    Send a speech request to the OpenAI TTS API.
+
+    The endpoint base can be overridden with OPENAI_BASE_URL (e.g. to point at
+    a local stand-in server).
+
+    Returns:
+        requests.Response, or None if no API key is configured
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+
+    base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+    return _get_session().post(
+        f"{base_url}/audio/speech",
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        },
+        json={
+            "model": OPENAI_TTS_MODEL,
+            "input": text,
+            "voice": voice,
+            "response_format": fmt
+        },
+        timeout=(5, 30),
+        stream=stream,
+    )
+
+
+def fetch_openai_audio(text: str, voice: str = "alloy",
+                       fmt: str = OPENAI_TTS_FORMAT) -> Optional[bytes]:
+    """
+    Synthesize speech with the OpenAI TTS API.
+    
+    Args:
+        text: Text to speak
+        voice: Voice to use (alloy, echo, fable, onyx, nova, shimmer)
+        fmt: Response format ('mp3' or 'pcm')
+        
+    Returns:
+        Encoded audio bytes, or None on failure
+    """
+    _set_openai_error(None)
+    try:
+        response = _openai_speech_request(text, voice, stream=False, fmt=fmt)
+        if response is not None and response.status_code == 200:
+            return response.content
+        _set_openai_error(f"HTTP {response.status_code}" if response is not None else "no API key")
+        return None
+    except Exception as e:
+        _set_openai_error(type(e).__name__)
+        return None
+
+
+def get_stream_player() -> Optional[List[str]]:
+    """
+    Find a player that can decode audio from stdin.
+
+    CLAUDE_TTS_STREAM_PLAYER overrides the detection with an explicit
+    command line (e.g. a fake player in tests).
+
+    Returns:
+        Player command, or None if none is installed
+    """
+    global _stream_player
+    if _stream_player is None:
+        override = os.getenv("CLAUDE_TTS_STREAM_PLAYER")
+        if override:
+            import shlex
+            _stream_player = shlex.split(override)
+        else:
+            import shutil
+            _stream_player = next((cmd for cmd in STREAM_PLAYERS if shutil.which(cmd[0])), [])
+    return _stream_player or None
+
+
+class PreparedAudio:
+    """
+    Synthesized audio that is ready to play.
+
+    Exactly one of play() or discard() should be called. Splitting speech
+    into prepare and play lets lib/tts_backends.py race backends on
+    synthesis and play only the winner.
+    """
+
+    def __init__(self, play: Callable[[], bool], discard: Optional[Callable[[], None]] = None,
+                 cached: bool = False, cancel: Optional[threading.Event] = None):
+        """
+        Wrap the play and discard actions.
+
+        Args:
+            play: Plays the audio; returns True on success
+            discard: Releases the audio without playing it
+            cached: Whether the audio came from the TTS cache
+            cancel: Event play() watches; set by stop()
+        """
+        self._play = play
+        self._discard = discard
+        self.cached = cached
+        self.cancel = cancel
+        # Set by the backend registry
+        self.backend: Optional[str] = None
+
+    def play(self) -> bool:
+        """Play the audio."""
+        return self._play()
+
+    def stop(self) -> None:
+        """Cut playback short from another thread, where the player supports it."""
+        if self.cancel is not None:
+            self.cancel.set()
+
+    def discard(self) -> None:
+        """Release the audio without playing it."""
+        if self._discard:
+            try:
+                self._discard()
+            except Exception:
+                pass
+
+
+def _open_openai_stream(text: str, voice: str,
+                        cancel: Optional[threading.Event] = None,
+                        fmt: str = OPENAI_TTS_FORMAT):
+    """
+    Start a streaming speech request and wait for the first chunk.
+
+    Returns:
+        Tuple of (response, first chunk, iterator over the rest), or None
+    """
+    _set_openai_error(None)
+    try:
+        response = _openai_speech_request(text, voice, stream=True, fmt=fmt)
+        if response is None:
+            _set_openai_error("no API key")
+            return None
+        if response.status_code != 200:
+            _set_openai_error(f"HTTP {response.status_code}")
+            response.close()
+            return None
+        rest = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        first = next(rest, b"")
+        if not first or (cancel is not None and cancel.is_set()):
+            if not first:
+                _set_openai_error("empty response")
+            response.close()
+            return None
+        return response, first, rest
+    except Exception as e:
+        _set_openai_error(type(e).__name__)
+        return None
+
+
+def _start_player(command: List[str], cancel: Optional[threading.Event] = None, **popen_args):
+    """
+    Start a quiet player process that is killed once cancel is set.
+
+    The kill comes from a watcher thread, because writes to the player's
+    stdin block while it plays.
+    """
+    import subprocess
+
+    proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **popen_args)
+    if cancel is not None:
+        def watch() -> None:
+            while proc.poll() is None:
+                if cancel.wait(CANCEL_POLL):
+                    proc.kill()
+                    return
+        threading.Thread(target=watch, name="player-cancel", daemon=True).start()
+    return proc
+
+
+def _finished(proc, cancel: Optional[threading.Event] = None) -> bool:
+    """Wait for a player; whether it played to the end without being cancelled."""
+    return proc.wait() == 0 and not (cancel is not None and cancel.is_set())
+
+
+def _pipe_to_player(response, first: bytes, rest: Iterator[bytes], player: List[str],
+                    cancel: Optional[threading.Event] = None) -> Optional[bytes]:
+    """Feed an open streaming response into a player; the audio bytes on success."""
+    import subprocess
+
+    proc = None
+    try:
+        with response:
+            proc = _start_player(player, cancel, stdin=subprocess.PIPE)
+            chunks = []
+            for chunk in itertools.chain([first], rest):
+                if cancel is not None and cancel.is_set():
+                    raise InterruptedError("playback cancelled")
+                proc.stdin.write(chunk)
+                proc.stdin.flush()
+                chunks.append(chunk)
+
+        proc.stdin.close()
+        if not _finished(proc, cancel):
+            return None
+        return b"".join(chunks)
+
+    except Exception:
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        return None
+
+
+def stream_openai_audio(text: str, voice: str, player: List[str],
+                        on_audio: Optional[Callable[[], None]] = None) -> Optional[bytes]:
+    """
+    Stream synthesized audio straight into a player's stdin as it arrives.
+
+    Playback starts after the first chunk instead of after the whole clip.
+
+    Args:
+        text: Text to speak
+        voice: Voice to use for OpenAI TTS
+        player: Player command reading audio from stdin
+        on_audio: Called when the first chunk has arrived
+
+    Returns:
+        The complete audio bytes if synthesis and playback succeeded, else None
+    """
+    opened = _open_openai_stream(text, voice)
+    if opened is None:
+        return None
+    if on_audio:
+        on_audio()
+    return _pipe_to_player(*opened, player)
+
+
+def _pipe_to_sink(response, first: bytes, rest: Iterator[bytes], sink,
+                  cancel: Optional[threading.Event] = None) -> Optional[bytes]:
+    """Feed an open PCM streaming response into an audio sink; the audio bytes on success."""
+    from lib.audio_sink import OPENAI_PCM_FORMAT
+
+    chunks = []
+
+    def collect() -> Iterator[bytes]:
+        for chunk in itertools.chain([first], rest):
+            chunks.append(chunk)
+            yield chunk
+
+    try:
+        with response:
+            if not sink.play_stream(collect(), OPENAI_PCM_FORMAT, cancel):
+                return None
+        return b"".join(chunks)
+    except Exception:
+        return None
+
+
+def _play_audio_file(path: str, cancel: Optional[threading.Event] = None) -> bool:
+    """Play an audio file with afplay, or feed it to a streaming player; cancel stops it."""
+    try:
+        import shutil
+
+        if shutil.which("afplay"):
+            return _finished(_start_player(["afplay", path], cancel), cancel)
+
+        player = get_stream_player()
+        if not player:
+            return False
+        with open(path, "rb") as audio:
+            return _finished(_start_player(player, cancel, stdin=audio), cancel)
+    except Exception:
+        return False
+
+
+def _play_audio_bytes(audio: bytes, cancel: Optional[threading.Event] = None) -> bool:
+    """Play encoded audio held in memory through a streaming player; cancel stops it."""
+    try:
+        import subprocess
+
+        player = get_stream_player()
+        if player:
+            proc = _start_player(player, cancel, stdin=subprocess.PIPE)
+            try:
+                proc.communicate(audio)
+            except OSError:
+                # Killed on cancel while we were writing
+                pass
+            return _finished(proc, cancel)
+
+        # afplay only plays files
+        import tempfile
+        fd, path = tempfile.mkstemp(prefix="claude-tts-", suffix=f".{OPENAI_TTS_FORMAT}")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            return _play_audio_file(path, cancel)
+        finally:
+            os.unlink(path)
+    except Exception:
+        return False
+
+
+def prepare_openai_audio(text: str, voice: str = "alloy",
+                         cancel: Optional[threading.Event] = None) -> Optional[PreparedAudio]:
+    """
+    Get OpenAI audio ready to play without playing it.
+
+    Audio is served from the on-disk TTS cache when available. On a miss,
+    this returns as soon as the first streamed chunk arrives and play()
+    streams the rest into the audio sink (as raw PCM) or a stdin-capable
+    player; without either the whole clip is downloaded and cached first.
+
+    Args:
+        text: Text to speak
+        voice: Voice to use (alloy, echo, fable, onyx, nova, shimmer)
+        cancel: Set by another thread to abandon the request, or to stop
+            playback once it has started
+
+    Returns:
+        PreparedAudio, or None on failure or cancellation
+    """
+    from lib.audio_sink import OPENAI_PCM_FORMAT, get_sink
+    from lib.tts_cache import default_cache
+
+    if cancel is None:
+        cancel = threading.Event()
+    sink = get_sink()
+    fmt = "pcm" if sink is not None else OPENAI_TTS_FORMAT
+
+    with span("cache"):
+        cached = default_cache.get(text, voice, OPENAI_TTS_MODEL, fmt)
+    tag(cache="hit" if cached else "miss")
+    if cached and sink is not None:
+        def play_cached_pcm() -> bool:
+            with span("play"):
+                try:
+                    pcm = cached.read_bytes()
+                except OSError:
+                    return False
+                return sink.play(pcm, OPENAI_PCM_FORMAT, cancel)
+        return PreparedAudio(play_cached_pcm, cached=True, cancel=cancel)
+    if cached:
+        def play_cached() -> bool:
+            with span("play"):
+                return _play_audio_file(str(cached), cancel)
+        return PreparedAudio(play_cached, cached=True, cancel=cancel)
+
+    player = get_stream_player()
+    if sink is not None or player:
+        # Synthesis and playback overlap, so they are one stage here
+        with span("stream"):
+            opened = _open_openai_stream(text, voice, cancel, fmt)
+        if opened is None:
+            return None
+
+        def play_stream() -> bool:
+            with span("stream"):
+                if sink is not None:
+                    audio = _pipe_to_sink(*opened, sink, cancel)
+                else:
+                    audio = _pipe_to_player(*opened, player, cancel)
+            if audio is None:
+                return False
+            with span("cache"):
+                default_cache.put(text, voice, OPENAI_TTS_MODEL, fmt, audio)
+            return True
+        return PreparedAudio(play_stream, opened[0].close, cancel=cancel)
+
+    with span("synthesize"):
+        audio = fetch_openai_audio(text, voice)
+    if audio is None or cancel.is_set():
+        return None
+
+    with span("cache"):
+        stored = default_cache.put(text, voice, OPENAI_TTS_MODEL, OPENAI_TTS_FORMAT, audio)
+    if stored:
+        def play_stored() -> bool:
+            with span("play"):
+                return _play_audio_file(str(stored), cancel)
+        return PreparedAudio(play_stored, cancel=cancel)
+
+    # Cache unavailable - play straight from memory
+    def play_memory() -> bool:
+        with span("play"):
+            return _play_audio_bytes(audio, cancel)
+    return PreparedAudio(play_memory, cancel=cancel)
+
+
+def speak_with_openai(text: str, voice: str = "alloy",
+                      on_audio: Optional[Callable[[], None]] = None) -> bool:
     """
     Use OpenAI TTS API to generate and play speech.
+
+    Audio is served from the on-disk TTS cache when available, so repeated
+    phrases skip the network round-trip. On a miss the response is streamed
+    into the audio sink or a stdin-capable player when one is installed, and
+    falls back to download-then-afplay otherwise.
     
     Args:
         text: Text to speak
         voice: Voice to use (alloy, echo, fable, onyx, nova, shimmer)
+        on_audio: Called once audio is ready to play
         
     Returns:
         True if successful, False otherwise
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    prepared = prepare_openai_audio(text, voice)
+    if prepared is None:
         return False
+    if on_audio:
+        on_audio()
+    return prepared.play()
+
+
+def prewarm_openai_cache(texts: Iterable[str], voice: str = "alloy") -> Dict[str, int]:
+    """
+    Synthesize every text that is not cached yet.
     
-    try:
-        response = requests.post(
-            "https://api.openai.com/v1/audio/speech",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "tts-1",
-                "input": text,
-                "voice": voice,
-                "response_format": "mp3"
-            },
-            timeout=30
-        )
+    Args:
+        texts: Phrases to synthesize
+        voice: Voice to use for OpenAI TTS
         
-        if response.status_code == 200:
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp_file:
-                tmp_file.write(response.content)
-                tmp_file_path = tmp_file.name
-            
-            # Play the audio file using macOS built-in player
-            subprocess.run(["afplay", tmp_file_path], check=True)
-            
-            # Clean up
-            os.unlink(tmp_file_path)
-            return True
+    Returns:
+        Dictionary with counts of 'cached', 'synthesized' and 'failed' phrases
+    """
+    from lib.tts_cache import default_cache
+
+    # Cache what playback will ask for
+    fmt = openai_audio_format()
+    counts = {"cached": 0, "synthesized": 0, "failed": 0}
+    for text in texts:
+        if default_cache.contains(text, voice, OPENAI_TTS_MODEL, fmt):
+            counts["cached"] += 1
+            continue
+
+        audio = fetch_openai_audio(text, voice, fmt)
+        if audio is not None and default_cache.put(text, voice, OPENAI_TTS_MODEL,
+                                                   fmt, audio):
+            counts["synthesized"] += 1
         else:
-            return False
-            
-    except Exception:
-        return False
+            counts["failed"] += 1
+
+    return counts
 
 
 def speak_with_macos(text: str) -> bool:
@@ -70,33 +518,36 @@ def speak_with_macos(text: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        subprocess.run(["say", text], check=True)
+        import subprocess
+        with span("say"):
+            subprocess.run(["say", text], check=True)
         return True
     except Exception:
         return False
 
 
 def speak_text(text: str, voice: str = "alloy", 
-               prefer_openai: bool = True) -> bool:
+               prefer_openai: bool = True, backend: Optional[str] = None,
+               hedge: Optional[bool] = None) -> bool:
     """
     Speak text using the best available TTS method.
     
+    Backends are tried fastest first by measured time-to-audio, and a slow
+    remote request is hedged with a local engine (see lib/tts_backends.py).
+    
     Args:
         text: Text to speak
         voice: Voice to use for OpenAI TTS
-        prefer_openai: Whether to try OpenAI first
+        prefer_openai: If False, OpenAI is only tried after local engines
+        backend: Only use this backend (e.g., 'espeak-ng')
+        hedge: Whether to hedge (defaults to CLAUDE_TTS_HEDGE)
         
     Returns:
         True if successful, False otherwise
     """
-    if prefer_openai:
-        if speak_with_openai(text, voice):
-            return True
-        return speak_with_macos(text)
-    else:
-        if speak_with_macos(text):
-            return True
-        return speak_with_openai(text, voice)
+    from lib.tts_backends import default_registry
+    return default_registry.speak(text, voice, backend=backend, prefer_openai=prefer_openai,
+                                  hedge=hedge)
 
 
 def is_openai_available() -> bool:
@@ -113,11 +564,10 @@ def is_macos_tts_available() -> bool:
     """
     Check if macOS TTS is available.
     
+    Uses the cached backend probe instead of spawning a process.
+    
     Returns:
         True if 'say' command is available
     """
-    try:
-        subprocess.run(["which", "say"], capture_output=True, check=True)
-        return True
-    except Exception:
-        return False
\ No newline at end of file
+    from lib.tts_backends import default_registry
+    return default_registry.is_available("say")
@@ -0,0 +1,130 @@
+#!/Users/codylandry/.claude/.venv/bin/python
+"""
+Query Claude Code hook logs through an incremental SQLite index.
+
+Every command first ingests whatever was appended to the logs since the
+last run (see lib/log_index.py), so queries never rescan whole files.
+
+Usage:
+    hook_logs.py ingest                     Update the index
+    hook_logs.py session <session-id>       All events for a session
+    hook_logs.py errors [--days N]          Error rate per hour
+    hook_logs.py slowest [--days N]         Slowest hook invocations
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lib.log_index import LogIndex, DEFAULT_INDEX_PATH, start_of_today
+
+
+def _when(ts) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else "-"
+
+
+def _since(days: float) -> float:
+    """Local midnight today for days=0, otherwise N days back from now."""
+    return start_of_today() if not days else time.time() - days * 86400
+
+
+def ingest(index: LogIndex, args) -> int:
+    """Print how much the index grew."""
+    started = time.perf_counter()
+    stats = index.ingest()
+    print(f"Ingested {stats['events']} events from {stats['files']} files "
+          f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return 0
+
+
+def session(index: LogIndex, args) -> int:
+    """Print all events for a session."""
+    index.ingest()
+    rows = index.session_events(args.session_id, args.limit)
+    if args.json:
+        keys = ("ts", "hook", "hook_event_name", "outcome", "is_error", "duration_ms", "message")
+        print(json.dumps([dict(zip(keys, row)) for row in rows], indent=2))
+        return 0
+
+    for ts, hook, event, outcome, is_error, duration, message in rows:
+        took = f"{duration:.1f}ms" if duration is not None else ""
+        print(f"{_when(ts)}  {hook or '-':<13} {event or '-':<13} {outcome or '-':<9} {took:>9}  {message or ''}")
+    if not rows:
+        print(f"No events for session {args.session_id}")
+    return 0
+
+
+def errors(index: LogIndex, args) -> int:
+    """Print invocations, errors and error rate per hour."""
+    index.ingest()
+    rows = index.error_rate(_since(args.days))
+    if args.json:
+        print(json.dumps([{"hour": start, "invocations": total, "errors": failed}
+                          for start, total, failed in rows], indent=2))
+        return 0
+
+    print(f"{'Hour':<20} {'Invocations':>11} {'Errors':>7} {'Rate':>7}")
+    for start, total, failed in rows:
+        rate = f"{failed / total:.1%}" if total else "-"
+        print(f"{_when(start):<20} {total:>11} {failed:>7} {rate:>7}")
+    return 0
+
+
+def slowest(index: LogIndex, args) -> int:
+    """Print the slowest hook invocations."""
+    index.ingest()
+    rows = index.slowest(_since(args.days), args.limit)
+    if args.json:
+        keys = ("ts", "hook", "session_id", "duration_ms", "message")
+        print(json.dumps([dict(zip(keys, row)) for row in rows], indent=2))
+        return 0
+
+    for ts, hook, session_id, duration, message in rows:
+        print(f"{_when(ts)}  {hook or '-':<14} {duration:>9.1f}ms  {(session_id or '-')[:8]}  {message or ''}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query Claude Code hook logs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    hook_logs.py session 4f1c2a
+    hook_logs.py errors --days 7
+    hook_logs.py slowest --limit 10
+        """
+    )
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help='SQLite index path')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable output')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('ingest', help='Update the index')
+
+    session_parser = commands.add_parser('session', help='All events for a session')
+    session_parser.add_argument('session_id', help='Session id or unique prefix')
+    session_parser.add_argument('--limit', type=int, default=200)
+
+    errors_parser = commands.add_parser('errors', help='Error rate per hour')
+    errors_parser.add_argument('--days', type=float, default=1, help='How far back to look (0 = today)')
+
+    slowest_parser = commands.add_parser('slowest', help='Slowest hook invocations')
+    slowest_parser.add_argument('--days', type=float, default=0, help='How far back to look (0 = today)')
+    slowest_parser.add_argument('--limit', type=int, default=20)
+
+    args = parser.parse_args()
+    handlers = {'ingest': ingest, 'session': session, 'errors': errors, 'slowest': slowest}
+
+    index = LogIndex(args.index)
+    try:
+        sys.exit(handlers[args.command](index, args))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
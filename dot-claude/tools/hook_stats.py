@@ -0,0 +1,141 @@
+#!/Users/codylandry/.claude/.venv/bin/python
+"""
+Latency percentiles for Claude Code hooks.
+
+Reads the structured hook events (via the incremental index in
+lib/log_index.py) and reports p50/p95/p99 per hook stage, per TTS
+backend and cache status for speech deliveries, and how often notification
+transcript lookups found the pending tool use within their deadline.
+
+Usage:
+    hook_stats.py                 Last 24 hours
+    hook_stats.py --hours 1       Last hour
+    hook_stats.py --json          Machine-readable output
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lib.log_index import LogIndex, DEFAULT_INDEX_PATH
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def collect(index: LogIndex, since: float, hook: Optional[str] = None) -> Dict[str, Dict[str, List[float]]]:
+    """
+    Group durations by hook stage and by speech backend.
+
+    Args:
+        index: Log index
+        since: Start timestamp
+        hook: Only events of this hook
+
+    Returns:
+        Dictionary with 'stages' ('hook/stage' -> ms values, 'hook/duration' for
+        the whole handler),
+        'backends' ('backend cache' -> total ms values) and
+        'context' (lookup outcome -> context stage ms values)
+    """
+    stages: Dict[str, List[float]] = {}
+    backends: Dict[str, List[float]] = {}
+    context: Dict[str, List[float]] = {}
+
+    for record in index.iter_events(since, hook):
+        name = record.get("hook")
+        duration = record.get("duration_ms")
+        if not isinstance(duration, (int, float)):
+            continue
+
+        stages.setdefault(f"{name}/duration", []).append(duration)
+        for stage, ms in (record.get("timings") or {}).items():
+            stages.setdefault(f"{name}/{stage}", []).append(ms)
+
+        if name == "speech":
+            key = record.get("backend") or "failed"
+            if record.get("cache"):
+                key += f" (cache {record['cache']})"
+            backends.setdefault(key, []).append(duration)
+
+        if record.get("context"):
+            ms = (record.get("timings") or {}).get("context", 0.0)
+            context.setdefault(record["context"], []).append(ms)
+
+    return {"stages": stages, "backends": backends, "context": context}
+
+
+def summarize(groups: Dict[str, List[float]]) -> List[Dict]:
+    return [
+        {"name": name, "count": len(values), "p50": percentile(values, 0.50),
+         "p95": percentile(values, 0.95), "p99": percentile(values, 0.99)}
+        for name, values in sorted(groups.items())
+    ]
+
+
+def print_table(title: str, rows: List[Dict]) -> None:
+    print(f"{title:<32} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for row in rows:
+        print(f"  {row['name']:<30} {row['count']:>7} {row['p50']:>10.2f} {row['p95']:>10.2f} {row['p99']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report hook latency percentiles",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    hook_stats.py
+    hook_stats.py --hours 1 --hook speech
+    hook_stats.py --days 7 --json
+        """
+    )
+    parser.add_argument('--hours', type=float, help='Window in hours (default: 24)')
+    parser.add_argument('--days', type=float, help='Window in days')
+    parser.add_argument('--hook', help='Only this hook (e.g., notification, stop, speech)')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help='SQLite index path')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable output')
+    args = parser.parse_args()
+
+    window = args.days * 86400 if args.days else (args.hours or 24) * 3600
+    index = LogIndex(args.index)
+    try:
+        index.ingest()
+        groups = collect(index, time.time() - window, args.hook)
+    finally:
+        index.close()
+
+    report = {"stages": summarize(groups["stages"]), "backends": summarize(groups["backends"]),
+              "context": summarize(groups["context"])}
+    lookups = sum(row["count"] for row in report["context"])
+    for row in report["context"]:
+        row["rate"] = row["count"] / lookups
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    if not report["stages"]:
+        print("No hook events in this window")
+        return
+    print_table("Stage", report["stages"])
+    if report["backends"]:
+        print()
+        print_table("Speech backend", report["backends"])
+    if report["context"]:
+        print()
+        print_table("Transcript lookup", report["context"])
+        print("  " + ", ".join(f"{row['name']} {row['rate']:.0%}" for row in report["context"]))
+
+
+if __name__ == "__main__":
+    main()
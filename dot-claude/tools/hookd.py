@@ -0,0 +1,116 @@
+#!/Users/codylandry/.claude/.venv/bin/python
+"""
+Control the long-lived hook daemon for Claude Code.
+
+Usage:
+    hookd.py start          Start the daemon in the background
+    hookd.py stop           Ask a running daemon to shut down
+    hookd.py status         Show daemon status
+    hookd.py run            Run the daemon in the foreground
+"""
+
+import sys
+import os
+import argparse
+import json
+import subprocess
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lib.daemon_client import send_request, is_daemon_running, get_socket_path
+
+
+def start(wait: float = 5.0) -> int:
+    """Spawn a detached daemon and wait for it to answer."""
+    if is_daemon_running():
+        print(f"hookd already running on {get_socket_path()}")
+        return 0
+
+    log_dir = os.path.expanduser("~/.claude/.hook-logs")
+    os.makedirs(log_dir, exist_ok=True)
+    with open(os.path.join(log_dir, "hookd.out"), "a") as out:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "run"],
+            stdin=subprocess.DEVNULL,
+            stdout=out,
+            stderr=out,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if is_daemon_running():
+            print(f"hookd started on {get_socket_path()}")
+            return 0
+        time.sleep(0.05)
+
+    print("hookd failed to start (see ~/.claude/.hook-logs/hookd.out)", file=sys.stderr)
+    return 1
+
+
+def stop(wait: float = 5.0) -> int:
+    """Ask the daemon to shut down and wait for the socket to go away."""
+    if not send_request({"op": "stop"}):
+        print("hookd is not running")
+        return 0
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if not os.path.exists(get_socket_path()):
+            print("hookd stopped")
+            return 0
+        time.sleep(0.05)
+
+    print("hookd did not stop in time", file=sys.stderr)
+    return 1
+
+
+def status() -> int:
+    """Print daemon status as JSON."""
+    response = send_request({"op": "status"})
+    if not response:
+        print("hookd is not running")
+        return 3
+
+    response.pop("ok", None)
+    print(json.dumps(response, indent=2))
+    return 0
+
+
+def run() -> int:
+    """Run the daemon in the foreground until stopped."""
+    from lib.hook_daemon import HookDaemon
+
+    try:
+        HookDaemon().serve_forever()
+    except RuntimeError as e:
+        print(f"hookd: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Manage the Claude Code hook daemon",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    hookd.py start
+    hookd.py status
+    hookd.py stop
+        """
+    )
+    parser.add_argument(
+        'command',
+        choices=['start', 'stop', 'status', 'run'],
+        help='Action to perform'
+    )
+
+    args = parser.parse_args()
+    commands = {'start': start, 'stop': stop, 'status': status, 'run': run}
+    sys.exit(commands[args.command]())
+
+
+if __name__ == "__main__":
+    main()
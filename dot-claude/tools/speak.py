@@ -6,15 +6,92 @@ Usage:
     speak.py "Text to speak"
     echo "Text to speak" | speak.py
     speak.py --voice nova "Text with specific voice"
+    speak.py --backend espeak-ng "Text with a specific engine"
+    make test 2>&1 | summarize | speak.py --stream
+    speak.py --probe
+    speak.py --prewarm
 """
 
 import sys
 import os
 import argparse
+import json
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from lib.tts_manager import speak_text
+from lib.tts_manager import speak_text, prewarm_openai_cache, OPENAI_VOICES
+from lib.tts_backends import default_registry
+
+
+def prewarm(voice: str) -> None:
+    """Fill the TTS cache with every phrase the hooks can speak."""
+    from lib.message_generator import get_static_messages
+    from lib.tts_cache import default_cache
+
+    counts = prewarm_openai_cache(get_static_messages(), voice=voice)
+    stats = default_cache.stats()
+    print(f"Prewarmed voice '{voice}': {counts['synthesized']} synthesized, "
+          f"{counts['cached']} already cached, {counts['failed']} failed")
+    print(f"Cache: {stats['entries']} entries, {stats['bytes']} bytes, "
+          f"{stats['hits']} hits, {stats['misses']} misses")
+
+    if counts['failed']:
+        sys.exit(1)
+
+
+def probe(as_json: bool) -> None:
+    """Probe every TTS backend and print what is available and how fast it is."""
+    report = default_registry.report(refresh=True)
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'Backend':<12} {'kind':<7} {'status':<12} {'median ms':>10} {'samples':>8} "
+          f"{'hedge W/L':>10}  detail")
+    for row in report["backends"]:
+        status = "available" if row["available"] else "unavailable"
+        median = f"{row['median_ms']:.0f}" if row["median_ms"] is not None else "-"
+        hedge = f"{row['hedge_wins']}/{row['hedge_losses']}"
+        print(f"{row['name']:<12} {row['kind']:<7} {status:<12} {median:>10} {row['samples']:>8} "
+              f"{hedge:>10}  {row['detail']}")
+    print(f"Player: {' '.join(report['player']) if report['player'] else 'none found'}")
+    print(f"Sink:   {report['sink'] or 'none (files go to the player)'}")
+    print(f"Order:  {', '.join(report['order']) or 'no backend available'}")
+    for row in report["backends"]:
+        circuit = row["circuit"]
+        if circuit:
+            line = f"Circuit: {row['name']} {circuit['state']}, {circuit['failures']} consecutive failures"
+            if "retry_in" in circuit:
+                line += f", next probe in {circuit['retry_in']:.0f}s"
+            print(line)
+    if report["hedge"]:
+        hedge = report["hedge"]
+        print(f"Hedge:  {hedge['secondary']} starts if {hedge['primary']} has no audio "
+              f"after {hedge['delay_ms']:.0f} ms")
+
+
+def stream(args) -> None:
+    """Speak stdin (or the text argument) sentence by sentence as it arrives."""
+    from lib.speech_pipeline import SpeechPipeline, iter_chunks
+
+    backend = "say" if args.macos_only else args.backend
+    hedge = False if args.no_hedge else None
+
+    def prepare(chunk: str):
+        return default_registry.prepare(chunk, args.voice, backend=backend, hedge=hedge)
+
+    lines = [args.text] if args.text else iter(sys.stdin.readline, "")
+    try:
+        stats = SpeechPipeline(prepare, ahead=args.ahead).run(iter_chunks(lines))
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    if stats["failed"]:
+        print(f"Failed to speak {stats['failed']} of {stats['chunks']} chunks", file=sys.stderr)
+    if stats["failed"] and not stats["spoken"]:
+        sys.exit(1)
 
 
 def main():
@@ -26,7 +103,11 @@ Examples:
     speak.py "Hello world"
     speak.py --voice nova "Hello with Nova voice"
     echo "Hello from pipe" | speak.py
+    tail -f build.log | speak.py --stream --ahead 2
     speak.py --macos-only "Use only macOS TTS"
+    speak.py --backend piper "Use only Piper"
+    speak.py --probe --json
+    speak.py --prewarm --voice nova
         """
     )
     
@@ -38,7 +119,7 @@ Examples:
     parser.add_argument(
         '--voice', 
         default='alloy',
-        choices=['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer'],
+        choices=OPENAI_VOICES,
         help='Voice to use for OpenAI TTS (default: alloy)'
     )
     parser.add_argument(
@@ -46,8 +127,59 @@ Examples:
         action='store_true',
         help='Use only macOS TTS (skip OpenAI)'
     )
+    parser.add_argument(
+        '--backend',
+        choices=default_registry.names(),
+        help='Use only this TTS backend (default: fastest available)'
+    )
+    parser.add_argument(
+        '--no-hedge',
+        action='store_true',
+        help='Do not race a second backend when the first is slow'
+    )
+    parser.add_argument(
+        '--probe',
+        action='store_true',
+        help='Probe TTS backends and report availability and latency'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Speak input sentence by sentence as it arrives, synthesizing ahead of playback'
+    )
+    parser.add_argument(
+        '--ahead',
+        type=int,
+        default=3,
+        help='With --stream, sentences synthesized ahead of the one playing (default: 3)'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='With --probe or --stream, print machine-readable output'
+    )
+    
+    parser.add_argument(
+        '--prewarm',
+        action='store_true',
+        help='Synthesize every hook message into the TTS cache and exit'
+    )
     
     args = parser.parse_args()
+
+    if args.prewarm:
+        prewarm(args.voice)
+        return
+
+    if args.probe:
+        probe(args.json)
+        return
+
+    if args.stream:
+        if not args.text and sys.stdin.isatty():
+            parser.error("--stream needs text on stdin")
+        stream(args)
+        return
     
     # Get text from argument or stdin
     if args.text:
@@ -61,8 +193,9 @@ Examples:
         parser.error("No text to speak")
     
     # Speak the text
-    prefer_openai = not args.macos_only
-    success = speak_text(text, voice=args.voice, prefer_openai=prefer_openai)
+    backend = "say" if args.macos_only else args.backend
+    success = speak_text(text, voice=args.voice, backend=backend,
+                         hedge=False if args.no_hedge else None)
     
     if not success:
         print("Failed to speak text", file=sys.stderr)
@@ -0,0 +1,80 @@
+#!/Users/codylandry/.claude/.venv/bin/python
+"""
+Inspect the background speech queue for Claude Code hooks.
+
+Usage:
+    speech_queue.py status          Show queue depth and wait times
+    speech_queue.py status --json   Same, as JSON
+"""
+
+import sys
+import os
+import argparse
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lib.speech_queue import get_spool_dir, is_worker_running
+from lib.speech_scheduler import queue_status
+
+
+def _seconds(value) -> str:
+    return "-" if value is None else f"{value:.2f}s"
+
+
+def status(as_json: bool = False) -> int:
+    """Print queue depth per priority and session plus recent wait times."""
+    spool = get_spool_dir()
+    report = queue_status(spool)
+    report["worker_running"] = is_worker_running()
+
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"Worker: {'running' if report['worker_running'] else 'idle'}")
+    print(f"Queued: {report['depth']} (oldest waiting {_seconds(report['oldest_wait'])})")
+    if report["current"]:
+        print(f"Speaking: {report['current']['text']!r}")
+    for name, count in sorted(report["by_priority"].items()):
+        print(f"  {name:<12} {count}")
+    if report["by_session"]:
+        print("By session:")
+        for session, count in sorted(report["by_session"].items()):
+            print(f"  {session:<40} {count}")
+    if report["waits"]:
+        print("Recent waits:")
+        for name, waits in sorted(report["waits"].items()):
+            print(f"  {name:<12} n={waits['count']:<4} p50 {_seconds(waits['p50'])}  p95 {_seconds(waits['p95'])}")
+    if report["dropped"]:
+        print("Dropped: " + ", ".join(f"{reason} {count}" for reason, count in sorted(report["dropped"].items())))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect the Claude Code speech queue",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    speech_queue.py status
+    speech_queue.py status --json
+        """
+    )
+    parser.add_argument(
+        'command',
+        choices=['status'],
+        help='Action to perform'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print machine-readable output'
+    )
+
+    args = parser.parse_args()
+    sys.exit(status(args.json))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/Users/codylandry/.claude/.venv/bin/python
+"""
+Usage statistics across every stored Claude Code transcript.
+
+Scans the session transcripts under ~/.claude/projects with a process pool.
+Each worker streams the tool records of one file (lib.transcript_records)
+through a reducer built on the lib.tool_context_extractor helpers (via
+lib.session_activity.add_entry), and the partial results are merged into
+one report: the most used tools, the mix of Bash commands, rejected tool
+uses, and which sessions hit errors. Permission prompts are counted from the hook event logs, since
+transcripts do not record them.
+
+Per-file results are cached in ~/.claude/.transcript-stats.cache keyed by
+(path, size, mtime), so a rerun only reads transcripts that changed.
+
+Usage:
+    transcript_stats.py                 Table report
+    transcript_stats.py --json          Machine-readable output
+    transcript_stats.py --workers 4     Limit the pool
+"""
+
+import sys
+import os
+import argparse
+import json
+import marshal
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lib.session_activity import EDIT_TOOLS, add_entry, empty_activity
+from lib.transcript_records import TOOL_BLOCKS, RecordScan
+
+
+DEFAULT_ROOT = "~/.claude/projects"
+DEFAULT_CACHE_PATH = "~/.claude/.transcript-stats.cache"
+CACHE_VERSION = 1
+
+
+def find_transcripts(root: str) -> List[str]:
+    """All transcript files under root, sorted."""
+    return sorted(str(path) for path in Path(root).expanduser().glob("**/*.jsonl"))
+
+
+def reduce_transcript(path: str) -> Dict[str, Any]:
+    """
+    Stream one transcript into compact counters.
+
+    Only lines with tool blocks are decoded.
+
+    Args:
+        path: Transcript file
+
+    Returns:
+        Dictionary with 'session_id', 'project', 'entries', per-tool
+        'tools' and per-command 'commands' counts, distinct 'files' and
+        'edited' files, 'failures' and 'rejections'
+    """
+    activity = empty_activity()
+    session_id = None
+    rejections = 0
+
+    scan = RecordScan(path, blocks=TOOL_BLOCKS)
+    for record in scan:
+        session_id = session_id or record.session_id
+        add_entry(activity, record)
+        rejections += record.rejections
+
+    files = activity["files"]
+    return {
+        "session_id": session_id or Path(path).stem,
+        "project": Path(path).parent.name,
+        "entries": scan.lines,
+        "tools": activity["tools"],
+        "commands": activity["commands"],
+        "files": len(files),
+        "edited": sum(1 for tools in files.values() if EDIT_TOOLS.intersection(tools)),
+        "failures": activity["failures"],
+        "rejections": rejections,
+    }
+
+
+def load_cache(cache_path: Path) -> Dict[str, Any]:
+    try:
+        cache = marshal.loads(cache_path.read_bytes())
+        if cache.get("version") == CACHE_VERSION:
+            return cache["files"]
+    except (OSError, ValueError, EOFError, TypeError, AttributeError, KeyError):
+        pass
+    return {}
+
+
+def save_cache(cache_path: Path, files: Dict[str, Any]) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(marshal.dumps({"version": CACHE_VERSION, "files": files}))
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError):
+        pass
+
+
+def scan(paths: List[str], cache: Dict[str, Any], workers: int) -> Dict[str, Any]:
+    """
+    Reduce every transcript, reusing cached results for unchanged files.
+
+    Args:
+        paths: Transcript files
+        cache: Per-file cache (path -> size, mtime and result); updated in
+            place, and entries for files that no longer exist are removed
+        workers: Worker processes (1 reduces in this process)
+
+    Returns:
+        Dictionary with the per-file 'results' and the 'cached' and
+        'scanned' file counts
+    """
+    results = []
+    stale = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entry = cache.get(path)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            results.append(entry["result"])
+        else:
+            stale.append((path, st.st_size, st.st_mtime_ns))
+
+    if workers > 1 and len(stale) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+            reduced = list(pool.map(reduce_transcript, [path for path, _, _ in stale],
+                                    chunksize=max(1, len(stale) // (workers * 4))))
+    else:
+        reduced = [reduce_transcript(path) for path, _, _ in stale]
+
+    for (path, size, mtime_ns), result in zip(stale, reduced):
+        cache[path] = {"size": size, "mtime_ns": mtime_ns, "result": result}
+        results.append(result)
+
+    # Forget transcripts that were deleted; entries outside this scan (e.g.,
+    # other projects when --root is narrower) are kept
+    for path in set(cache) - set(paths):
+        if not os.path.exists(path):
+            del cache[path]
+    return {"results": results, "cached": len(paths) - len(stale), "scanned": len(stale)}
+
+
+def count_permissions(since: float = 0.0) -> Optional[Dict[str, int]]:
+    """
+    Count permission notifications per session from the hook event logs.
+
+    Returns:
+        Session id -> permission prompts, or None if the logs can't be read
+    """
+    try:
+        from lib.log_index import LogIndex
+        index = LogIndex()
+        try:
+            index.ingest()
+            counts: Dict[str, int] = {}
+            for record in index.iter_events(since, "notification"):
+                if record.get("kind") == "permission":
+                    session_id = record.get("session_id") or "unknown"
+                    counts[session_id] = counts.get(session_id, 0) + 1
+            return counts
+        finally:
+            index.close()
+    except Exception:
+        return None
+
+
+def merge(results: List[Dict[str, Any]], permissions: Optional[Dict[str, int]],
+          top: int) -> Dict[str, Any]:
+    """
+    Merge per-file results into the report.
+
+    Args:
+        results: Output of reduce_transcript() for each file
+        permissions: Permission prompts per session, if known
+        top: Rows to keep in the command and session lists
+
+    Returns:
+        Report dictionary
+    """
+    tools: Dict[str, int] = {}
+    commands: Dict[str, int] = {}
+    totals = {"entries": 0, "tool_uses": 0, "files": 0, "edited": 0, "failures": 0, "rejections": 0}
+    error_sessions = []
+
+    for result in results:
+        for name, count in result["tools"].items():
+            tools[name] = tools.get(name, 0) + count
+        for name, count in result["commands"].items():
+            commands[name] = commands.get(name, 0) + count
+        tool_uses = sum(result["tools"].values())
+        totals["tool_uses"] += tool_uses
+        for key in ("entries", "files", "edited", "failures", "rejections"):
+            totals[key] += result[key]
+        if result["failures"]:
+            error_sessions.append({"session_id": result["session_id"], "project": result["project"],
+                                   "failures": result["failures"], "tool_uses": tool_uses,
+                                   "rate": result["failures"] / tool_uses if tool_uses else 0.0})
+
+    def ranked(counts: Dict[str, int], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        total = sum(counts.values()) or 1
+        rows = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{"name": name, "count": count, "share": count / total} for name, count in rows]
+
+    error_sessions.sort(key=lambda row: (-row["failures"], row["session_id"]))
+    report = {
+        "transcripts": len(results),
+        "sessions": len({result["session_id"] for result in results}),
+        "totals": totals,
+        "tools": ranked(tools),
+        "commands": ranked(commands, top),
+        "error_sessions": error_sessions[:top],
+        "sessions_with_errors": len(error_sessions),
+        "permissions": None,
+    }
+    if permissions is not None:
+        requested = sum(permissions.values())
+        report["permissions"] = {
+            "requested": requested,
+            "sessions": len(permissions),
+            "per_tool_use": requested / totals["tool_uses"] if totals["tool_uses"] else 0.0,
+            "rejected": totals["rejections"],
+        }
+        for row in report["error_sessions"]:
+            row["permissions"] = permissions.get(row["session_id"], 0)
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    totals = report["totals"]
+    scan_info = report["scan"]
+    print(f"{report['transcripts']} transcripts, {report['sessions']} sessions, "
+          f"{totals['entries']} entries, {totals['tool_uses']} tool uses "
+          f"({scan_info['scanned']} scanned, {scan_info['cached']} cached, "
+          f"{scan_info['workers']} workers, {scan_info['elapsed_ms']:.0f} ms)")
+    print(f"Files touched: {totals['files']} ({totals['edited']} edited)")
+
+    for title, rows in (("Tool", report["tools"]), ("Bash command", report["commands"])):
+        if rows:
+            print()
+            print(f"{title:<32} {'count':>9} {'share':>7}")
+            for row in rows:
+                print(f"  {row['name'][:30]:<30} {row['count']:>9} {row['share']:>7.1%}")
+
+    permissions = report["permissions"]
+    print()
+    if permissions is not None:
+        print(f"Permission prompts: {permissions['requested']} in {permissions['sessions']} sessions "
+              f"({permissions['per_tool_use']:.1%} of tool uses), {permissions['rejected']} rejected")
+    else:
+        print(f"Permission prompts: hook logs unavailable, {totals['rejections']} rejected")
+
+    print(f"Sessions with errors: {report['sessions_with_errors']} of {report['sessions']}, "
+          f"{totals['failures']} failed tool uses")
+    if report["error_sessions"]:
+        print(f"  {'session':<38} {'project':<30} {'failures':>8} {'rate':>7}")
+        for row in report["error_sessions"]:
+            print(f"  {row['session_id'][:36]:<38} {row['project'][-30:]:<30} "
+                  f"{row['failures']:>8} {row['rate']:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report tool, command and error statistics across all transcripts",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    transcript_stats.py
+    transcript_stats.py --json > stats.json
+    transcript_stats.py --root ~/.claude/projects/-Users-me-src-app --top 20
+        """
+    )
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='Directory searched for *.jsonl transcripts')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: one per core)')
+    parser.add_argument('--top', type=int, default=10, help='Rows in the command and error-session lists')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='Per-file result cache')
+    parser.add_argument('--no-cache', action='store_true', help='Reduce every transcript again')
+    parser.add_argument('--no-hook-logs', action='store_true', help='Skip permission counts from hook logs')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable output')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    cache_path = Path(args.cache).expanduser()
+    cache = {} if args.no_cache else load_cache(cache_path)
+    scanned = scan(find_transcripts(args.root), cache, max(1, args.workers))
+    save_cache(cache_path, cache)
+
+    permissions = None if args.no_hook_logs else count_permissions()
+    report = merge(scanned["results"], permissions, args.top)
+    report["scan"] = {"cached": scanned["cached"], "scanned": scanned["scanned"],
+                      "workers": max(1, args.workers),
+                      "elapsed_ms": (time.perf_counter() - started) * 1000}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Shared fixtures for the hook library tests.
+
+Tests import the libraries the way the hooks do (`from lib import ...`
+with dot-claude on sys.path) and run against a temporary HOME, so caches,
+logs and checkpoints never touch the real ~/.claude.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "dot-claude"))
+
+BENCH_DIR = os.path.join(ROOT, "bench")
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    """Point HOME at a fresh directory for each test."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for name in ("CLAUDE_MESSAGE_RULES", "CLAUDE_HOOK_LOG_FULL", "CLAUDE_LOG_MAX_STRING",
+                 "CLAUDE_LOG_MAX_RECORD_BYTES"):
+        monkeypatch.delenv(name, raising=False)
+    return tmp_path
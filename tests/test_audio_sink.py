@@ -0,0 +1,90 @@
+import os
+import sys
+import threading
+import time
+
+from conftest import BENCH_DIR
+from lib.audio_sink import FakeSink, PCMFormat, PipeSink, create_sink, read_wav
+
+FORMAT = PCMFormat(16000)
+
+
+def play_in_background(sink, pcm, cancel):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(ok=sink.play(pcm, FORMAT, cancel)))
+    thread.start()
+    return thread, result
+
+
+def test_fake_sink_records_plays(tmp_path):
+    sink = FakeSink(log_path=str(tmp_path / "plays.jsonl"))
+    assert sink.play(b"\x00\x00" * 1600, FORMAT)
+    assert sink.plays[0]["seconds"] == 0.1 and not sink.plays[0]["cancelled"]
+    assert (tmp_path / "plays.jsonl").read_text().count("\n") == 1
+    assert not sink.play(b"", FORMAT)
+
+
+def test_fake_sink_cancel():
+    sink = FakeSink(realtime=True)
+    cancel = threading.Event()
+    started = time.monotonic()
+    thread, result = play_in_background(sink, b"\x00\x00" * 16000 * 5, cancel)
+    time.sleep(0.05)
+    cancel.set()
+    thread.join(timeout=2)
+
+    assert result["ok"] is False
+    assert sink.plays[0]["cancelled"]
+    assert time.monotonic() - started < 1
+
+
+def test_pipe_sink_plays_through_one_player(tmp_path, monkeypatch):
+    log_path = tmp_path / "player.jsonl"
+    monkeypatch.setenv("FAKE_PLAYER_LOG", str(log_path))
+    sink = PipeSink([sys.executable, os.path.join(BENCH_DIR, "fake_player.py"), "--rate={rate}"],
+                    idle_timeout=None)
+    try:
+        assert sink.play(b"\x00\x00" * 800, FORMAT)
+        proc = sink._proc
+        assert sink.play(b"\x00\x00" * 800, FORMAT)
+        assert sink._proc is proc
+
+        # A new format respawns the player
+        assert sink.play(b"\x00\x00" * 1200, PCMFormat(24000))
+        assert sink._proc is not proc
+    finally:
+        sink.close()
+    assert [line.count('"--rate=') for line in log_path.read_text().splitlines()] == [1, 1]
+
+
+def test_pipe_sink_cancel_kills_player():
+    sink = PipeSink([sys.executable, os.path.join(BENCH_DIR, "fake_player.py")], idle_timeout=None)
+    cancel = threading.Event()
+    started = time.monotonic()
+    thread, result = play_in_background(sink, b"\x00\x00" * 16000 * 5, cancel)
+    time.sleep(0.2)
+    proc = sink._proc
+    cancel.set()
+    thread.join(timeout=3)
+
+    assert result["ok"] is False
+    assert proc.poll() is not None
+    assert time.monotonic() - started < 2
+    sink.close()
+
+
+def test_create_sink_settings():
+    assert create_sink("none") is None
+    assert isinstance(create_sink("fake"), FakeSink)
+    assert create_sink("aplay -r {rate} -").command == ["aplay", "-r", "{rate}", "-"]
+
+
+def test_read_wav_from_fake_engine():
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("fake_tts_engine", os.path.join(BENCH_DIR, "fake_tts_engine.py"))
+    engine = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(engine)
+
+    fmt, pcm = read_wav(engine.silent_wav(0.1))
+    assert fmt == PCMFormat(16000) and len(pcm) == 3200
+    assert read_wav(b"not a wav") is None
@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from conftest import ROOT
+from lib.circuit_breaker import CircuitBreaker
+
+
+def other_process(state_path, call):
+    """Run one breaker call in a separate process and return its result."""
+    script = (f"import sys; sys.path.insert(0, {os.path.join(ROOT, 'dot-claude')!r})\n"
+              "from lib.circuit_breaker import CircuitBreaker\n"
+              f"breaker = CircuitBreaker('remote', state_path={state_path!r}, "
+              "failure_threshold=2, cooldown=0.2)\n"
+              f"print(breaker.{call})")
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return out.stdout.strip()
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "breakers.json")
+
+
+@pytest.fixture
+def breaker(state_path):
+    return CircuitBreaker("remote", state_path=state_path, failure_threshold=2, cooldown=0.2)
+
+
+def test_failures_from_two_processes_open_the_breaker(breaker, state_path):
+    breaker.record_failure("HTTP 500")
+    assert breaker.status()["state"] == "closed"
+    other_process(state_path, "record_failure('timeout')")
+
+    assert breaker.status()["state"] == "open"
+    assert breaker.is_blocked() and not breaker.allow()
+    assert other_process(state_path, "allow()") == "False"
+
+
+def test_single_half_open_probe_across_processes(breaker, state_path):
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.25)
+
+    assert other_process(state_path, "allow()") == "True"
+    assert breaker.status()["state"] == "half-open"
+    assert not breaker.allow()
+
+    # The probe failed: open again with a doubled cooldown
+    other_process(state_path, "record_failure('still down')")
+    status = breaker.status()
+    assert status["state"] == "open" and status["cooldown"] == pytest.approx(0.4)
+
+    time.sleep(0.45)
+    assert breaker.allow()
+    assert other_process(state_path, "allow()") == "False"
+    breaker.record_success()
+    assert breaker.status() == {"state": "closed", "failures": 0, "changed_at": breaker.status()["changed_at"]}
+    assert other_process(state_path, "allow()") == "True"
+
+
+def test_release_only_frees_own_probe(breaker, state_path):
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.25)
+    assert breaker.allow()
+
+    other_process(state_path, "release()")
+    assert not CircuitBreaker("remote", state_path=state_path).allow()
+    breaker.release()
+    assert breaker.status()["state"] == "half-open" and not breaker.is_blocked()
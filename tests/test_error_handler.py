@@ -0,0 +1,42 @@
+import pytest
+
+from lib import hook_events
+from lib.error_handler import log_error, safe_hook_execution
+from lib.hook_events import HookInvocation
+
+
+@pytest.fixture
+def events(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(hook_events, "emit_event",
+                        lambda hook, outcome, data=None, error=None, **fields:
+                        emitted.append(dict(fields, hook=hook, outcome=outcome, error=error)))
+    return emitted
+
+
+def failing_hook(data):
+    raise ValueError("no transcript")
+
+
+def test_failed_hook_function_is_one_record(events):
+    with HookInvocation("stop", {"session_id": "s"}) as event:
+        message = safe_hook_execution(failing_hook, {}, "fallback")
+        event.update(message=message)
+
+    assert len(events) == 1
+    assert events[0]["outcome"] == "error"
+    assert events[0]["error"] == "Error in hook function: no transcript"
+    assert events[0]["message"] == "fallback"
+
+
+def test_later_errors_are_listed(events):
+    with HookInvocation("notification", {}):
+        log_error("first")
+        log_error("second")
+
+    assert [(e["error"], e.get("errors")) for e in events] == [("first", ["second"])]
+
+
+def test_error_outside_invocation_is_own_record(events):
+    log_error("rules file broken")
+    assert [(e["hook"], e["error"]) for e in events] == [("hook", "rules file broken")]
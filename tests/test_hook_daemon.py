@@ -0,0 +1,80 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from conftest import ROOT
+
+HOOKD = os.path.join(ROOT, "dot-claude", "tools", "hookd.py")
+
+
+@pytest.fixture
+def daemon_env(home, monkeypatch):
+    monkeypatch.setenv("CLAUDE_AUDIO_SINK", "none")
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    return {**os.environ}
+
+
+def socket_path(home):
+    return str(home / ".claude" / ".hookd.sock")
+
+
+def ping():
+    from lib.daemon_client import is_daemon_running
+    return is_daemon_running()
+
+
+def start_daemon(env):
+    return subprocess.Popen([sys.executable, HOOKD, "run"], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_second_daemon_leaves_the_first_running(daemon_env, home):
+    first = start_daemon(daemon_env)
+    try:
+        assert wait_for(lambda: ping())
+        second = start_daemon(daemon_env)
+        _, err = second.communicate(timeout=10)
+        assert second.returncode == 1 and b"already running" in err
+        assert ping()
+        assert (home / ".claude" / ".hookd.pid").read_text() == str(first.pid)
+    finally:
+        subprocess.run([sys.executable, HOOKD, "stop"], env=daemon_env, capture_output=True)
+        first.wait(timeout=10)
+    assert not os.path.exists(socket_path(home))
+    assert not (home / ".claude" / ".hookd.pid").exists()
+
+
+def test_stale_socket_is_replaced(daemon_env, home):
+    os.makedirs(home / ".claude", exist_ok=True)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(socket_path(home))
+    daemon = start_daemon(daemon_env)
+    try:
+        assert wait_for(lambda: ping())
+    finally:
+        subprocess.run([sys.executable, HOOKD, "stop"], env=daemon_env, capture_output=True)
+        daemon.wait(timeout=10)
+
+
+def test_live_socket_without_pid_lock_is_kept(daemon_env, home):
+    os.makedirs(home / ".claude", exist_ok=True)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as live:
+        live.bind(socket_path(home))
+        live.listen()
+        daemon = start_daemon(daemon_env)
+        _, err = daemon.communicate(timeout=10)
+        assert daemon.returncode == 1 and b"already listening" in err
+        assert os.path.exists(socket_path(home))
@@ -0,0 +1,101 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BENCH_DIR, ROOT
+
+HOOKS_DIR = os.path.join(ROOT, "dot-claude", "hooks")
+
+PAYLOADS = {
+    "notification": {"session_id": "test", "transcript_path": "", "hook_event_name": "Notification",
+                     "message": "Claude needs your permission to use Bash"},
+    "stop": {"session_id": "test", "transcript_path": "", "hook_event_name": "Stop"},
+}
+
+
+def load_bench_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BENCH_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def tts_server():
+    """Start a mock speech endpoint with the given config; shut it down after the test."""
+    mock_tts_server = load_bench_module("mock_tts_server")
+    servers = []
+
+    def start(**config):
+        servers.append(mock_tts_server.start_server(**config))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def run_hook(home, server, hook="notification", logs=None):
+    """Run a hook synchronously against the mock server, with fake say/afplay on PATH."""
+    logs = logs or home
+    bin_dir = home / "bin"
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    for name, script in (("afplay", "fake_player.py"), ("say", "fake_tts_engine.py")):
+        if not (bin_dir / name).exists():
+            (bin_dir / name).symlink_to(os.path.join(BENCH_DIR, script))
+
+    env = {
+        **os.environ,
+        "HOME": str(home),
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        "OPENAI_API_KEY": "test",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_port}/v1",
+        "CLAUDE_TTS_STREAM_PLAYER": f"{sys.executable} {os.path.join(BENCH_DIR, 'fake_player.py')}",
+        "CLAUDE_AUDIO_SINK": "none",
+        "CLAUDE_HOOKS_SPEECH": "sync",
+        "FAKE_PLAYER_LOG": str(logs / "player.jsonl"),
+        "FAKE_TTS_LOG": str(logs / "engine.jsonl"),
+    }
+    result = subprocess.run([sys.executable, os.path.join(HOOKS_DIR, f"{hook}.py")],
+                            input=json.dumps(PAYLOADS[hook]), env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)["continue"] is True
+    return result
+
+
+def json_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def test_hook_streams_chunked_audio_to_the_player(home, tts_server):
+    server = tts_server(chunks=6, chunk_size=1000, chunk_delay=0.01)
+    run_hook(home, server)
+
+    assert len(server.requests) == 1 and server.errors == 0
+    assert [play["bytes"] for play in json_lines(home / "player.jsonl")] == [6000]
+    assert json_lines(home / "engine.jsonl") == []
+
+
+def test_hook_falls_back_to_a_local_engine_when_the_server_fails(home, tts_server):
+    server = tts_server(error_rate=1.0, chunks=6, chunk_size=1000)
+    run_hook(home, server)
+
+    assert server.errors >= 1 and server.errors == len(server.requests)
+    assert [call["engine"] for call in json_lines(home / "engine.jsonl")] == ["say"]
+
+
+@pytest.mark.parametrize("hook", ["notification", "stop"])
+def test_hook_speaks_once_per_run_at_a_partial_error_rate(home, tts_server, hook):
+    server = tts_server(error_rate=0.5, seed=7, chunks=4, chunk_size=512)
+    # A fresh HOME per run, so neither the TTS cache nor backend ordering carries over
+    for run in range(6):
+        run_hook(home / f"run-{run}", server, hook, logs=home)
+
+    streamed = [play for play in json_lines(home / "player.jsonl") if play["bytes"] == 4 * 512]
+    spoken_locally = json_lines(home / "engine.jsonl")
+    assert 0 < server.errors < len(server.requests)
+    assert len(streamed) + len(spoken_locally) == 6
@@ -0,0 +1,45 @@
+import json
+
+from lib.log_encoder import clip_string, encode_record
+
+
+def test_short_record_is_unchanged():
+    record = {"hook": "notification", "outcome": "handled", "message": "hi", "timings": {"total": 1.5}}
+    line = encode_record(record)
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert json.loads(line) == record
+
+
+def test_long_strings_are_clipped_with_length_and_hash():
+    content = "x" * 100000
+    record = json.loads(encode_record({"hook": "n", "input": {"content": content}}))
+    clipped = record["input"]["content"]
+    assert clipped.startswith("x" * 128)
+    assert clipped.endswith(f"[{len(content)} chars sha1:{clipped[-13:-1]}]")
+    assert clipped == clip_string(content)
+    assert clip_string(content) != clip_string(content[:-1] + "y")
+
+
+def test_record_is_capped_by_dropping_largest_fields():
+    record = {"hook": "n", "outcome": "handled", "session_id": "s"}
+    record.update({f"field{i}": "z" * (400 + i) for i in range(40)})
+    line = encode_record(record, max_bytes=4096)
+    assert len(line) < 4096
+    decoded = json.loads(line)
+    assert decoded["hook"] == "n" and decoded["session_id"] == "s"
+    assert decoded["dropped"][0] == "field39"
+    assert not set(decoded["dropped"]) & set(decoded)
+
+
+def test_limits_from_environment(monkeypatch):
+    monkeypatch.setenv("CLAUDE_LOG_MAX_STRING", "10")
+    assert json.loads(encode_record({"m": "a" * 11}))["m"].startswith("aaaaaaaaaa…")
+    monkeypatch.setenv("CLAUDE_HOOK_LOG_FULL", "1")
+    assert json.loads(encode_record({"m": "a" * 100000}))["m"] == "a" * 100000
+
+
+def test_lone_surrogate_is_escaped():
+    record = {"hook": "n", "x": "\ud83d abc é"}
+    line = encode_record(record)
+    assert b"\\ud83d" in line
+    assert json.loads(line) == record
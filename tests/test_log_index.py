@@ -0,0 +1,30 @@
+import json
+import time
+
+from lib.log_index import LogIndex
+
+
+def write_events(path, records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def test_error_rate_counts_only_hook_invocations(tmp_path):
+    now = time.time()
+    write_events(tmp_path / "hook_events.jsonl", [
+        {"hook": "notification", "outcome": "handled", "logged_at": now},
+        {"hook": "stop", "outcome": "error", "error": "boom", "logged_at": now},
+        {"hook": "stop", "outcome": "handled", "logged_at": now},
+        {"hook": "speech", "outcome": "handled", "logged_at": now},
+        {"hook": "speech", "outcome": "error", "error": "All TTS backends failed", "logged_at": now},
+        {"hook": "circuit", "outcome": "transition", "logged_at": now},
+        {"hook": "hook", "outcome": "error", "error": "rules file broken", "logged_at": now},
+    ])
+    index = LogIndex(str(tmp_path / "index.sqlite3"), str(tmp_path), legacy_error_file=None)
+    try:
+        index.ingest()
+        [(_, invocations, errors)] = index.error_rate(now - 60)
+    finally:
+        index.close()
+    assert (invocations, errors) == (3, 1)
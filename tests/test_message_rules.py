@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from lib import message_rules
+from lib.message_rules import MessageRules, compile_rules, get_rules
+
+
+def make_rules(*rules):
+    return MessageRules(compile_rules({"notification_rules": list(rules)}))
+
+
+@pytest.fixture(autouse=True)
+def fresh_rules(monkeypatch):
+    monkeypatch.setattr(message_rules, "_rules", None)
+
+
+def test_earliest_rule_wins_over_position():
+    rules = make_rules({"kind": "a", "keywords": ["permission"]},
+                       {"kind": "b", "keywords": ["waiting"]})
+    assert rules.classify("waiting for your permission") == "a"
+    assert rules.classify("still waiting") == "b"
+    assert rules.classify("nothing here") == "attention"
+
+
+def test_keyword_that_is_a_prefix_of_a_later_one():
+    rules = make_rules({"kind": "a", "keywords": ["err"]},
+                       {"kind": "b", "keywords": ["error"]})
+    assert rules.classify("an error occurred") == "a"
+
+
+def test_overlapping_keywords():
+    rules = make_rules({"kind": "a", "keywords": ["led"]},
+                       {"kind": "b", "keywords": ["failed"]})
+    assert rules.classify("it failed") == "a"
+    assert rules.classify("IT FAILED") == "a"
+
+
+def test_regex_and_keyword_at_the_same_position():
+    rules = make_rules({"kind": "a", "regex": r"fail\w*"},
+                       {"kind": "b", "keywords": ["failed"]},
+                       {"kind": "c", "regex": r"it"})
+    assert rules.classify("it failed") == "a"
+    assert make_rules({"kind": "b", "keywords": ["fail"]},
+                      {"kind": "c", "regex": r"fail"}).classify("fail") == "b"
+
+
+def test_bundled_rules_classify():
+    rules = get_rules()
+    assert rules.classify("Claude needs your permission to use Bash") == "permission"
+    assert rules.permission_tool("Claude needs your permission to use Bash") == "Bash"
+
+
+def test_missing_rules_file_falls_back(monkeypatch, tmp_path):
+    monkeypatch.setenv("CLAUDE_MESSAGE_RULES", str(tmp_path / "missing.json"))
+    assert get_rules().classify("Claude needs your permission to use Bash") == "permission"
+
+
+def test_invalid_regex_falls_back(monkeypatch, tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"notification_rules": [{"kind": "broken", "regex": "(unclosed"}]}))
+    monkeypatch.setenv("CLAUDE_MESSAGE_RULES", str(path))
+    assert get_rules().classify("Claude needs your permission to use Bash") == "permission"
+
+    path.write_text(json.dumps({"notification_rules": [{"kind": "custom", "keywords": ["bash"]}]}))
+    assert get_rules().classify("Claude needs your permission to use Bash") == "custom"
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from lib import session_activity
+from lib.deadline import Deadline, DeadlineExceeded
+from lib.session_activity import ActivityCheckpoint, summarize
+
+
+def tool_use(name, **tool_input):
+    return {"type": "assistant", "message": {"role": "assistant", "content": [
+        {"type": "tool_use", "id": f"t-{name}", "name": name, "input": tool_input}]}}
+
+
+def tool_result(is_error=False):
+    return {"type": "user", "message": {"role": "user", "content": [
+        {"type": "tool_result", "tool_use_id": "t", "is_error": is_error, "content": "out"}]}}
+
+
+def append(path, *entries):
+    with open(path, "ab") as f:
+        for entry in entries:
+            f.write(json.dumps(entry).encode() + b"\n")
+
+
+def test_turn_counters(tmp_path):
+    path = tmp_path / "t.jsonl"
+    append(path, tool_use("Edit", file_path="/src/a.py"), tool_result(),
+           tool_use("Bash", command="pytest -q"), tool_result(is_error=True))
+    checkpoint = ActivityCheckpoint(str(path))
+    assert summarize(checkpoint.finish_turn()) == {"edited": 1, "read": 0, "commands": 1, "failures": 1}
+
+    append(path, tool_use("Read", file_path="/src/b.py"), tool_result())
+    assert summarize(checkpoint.finish_turn()) == {"edited": 0, "read": 1, "commands": 0, "failures": 0}
+    session = checkpoint.update()["session"]
+    assert session["tools"] == {"Edit": 1, "Bash": 1, "Read": 1}
+    assert session["commands"] == {"pytest": 1}
+
+
+def test_deadline_resumes_where_it_stopped(tmp_path):
+    path = tmp_path / "t.jsonl"
+    for n in range(100):
+        append(path, tool_use("Bash", command=f"make t{n % 3}"), tool_result(is_error=n % 10 == 0),
+               {"type": "user", "message": {"role": "user", "content": "next"}})
+    checkpoint = ActivityCheckpoint(str(path))
+
+    with pytest.raises(DeadlineExceeded):
+        checkpoint.update(Deadline(0))
+    assert 0 < json.loads(checkpoint.checkpoint_path.read_text())["offset"] < path.stat().st_size
+
+    state = checkpoint.update()
+    assert state["offset"] == path.stat().st_size
+    assert state["session"]["tools"] == {"Bash": 100}
+    assert state["session"]["failures"] == 10
+
+
+def test_files_map_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_activity, "MAX_FILES", 3)
+    path = tmp_path / "t.jsonl"
+    append(path, *[tool_use("Edit", file_path=f"/src/{n}.py") for n in range(5)],
+           tool_use("Read", file_path="/src/0.py"), tool_use("Read", file_path="/docs/a.md"))
+    checkpoint = ActivityCheckpoint(str(path))
+
+    session = checkpoint.update()["session"]
+    # Reading /src/0.py made it recent again
+    assert list(session["files"]) == ["/src/4.py", "/src/0.py", "/docs/a.md"]
+    assert session["dropped"] == {"edited": 3, "read": 0}
+    assert summarize(session)["edited"] == 5
+    stored = json.loads(checkpoint.checkpoint_path.read_text())
+    assert list(stored["session"]["files"]) == list(session["files"])
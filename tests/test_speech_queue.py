@@ -0,0 +1,77 @@
+import fcntl
+import os
+
+import pytest
+
+from lib import speech_queue
+
+
+@pytest.fixture
+def spoken(monkeypatch):
+    texts = []
+    monkeypatch.setattr(speech_queue, "deliver", lambda item: texts.append(item["text"]))
+    return texts
+
+
+def run_worker():
+    speech_queue.run_worker(idle_timeout=0.1, poll_interval=0.01, gather_delay=0)
+
+
+def test_items_are_spoken_and_removed(spoken):
+    assert speech_queue.enqueue_speech("first", kind="completion", spawn_worker=False)
+    assert speech_queue.enqueue_speech("second", kind="error", spawn_worker=False)
+    run_worker()
+
+    assert sorted(spoken) == ["first", "second"]
+    spool = speech_queue.get_spool_dir()
+    assert not speech_queue.pending_items(spool) and not speech_queue.claimed_items(spool)
+
+
+def test_claimed_items_survive_a_killed_worker(monkeypatch, spoken):
+    speech_queue.enqueue_speech("interrupted", kind="completion", spawn_worker=False)
+
+    def killed(item):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(speech_queue, "deliver", killed)
+    with pytest.raises(KeyboardInterrupt):
+        run_worker()
+    spool = speech_queue.get_spool_dir()
+    assert len(speech_queue.claimed_items(spool)) == 1
+    assert not speech_queue.is_worker_running()
+
+    monkeypatch.setattr(speech_queue, "deliver", lambda item: spoken.append(item["text"]))
+    run_worker()
+    assert spoken == ["interrupted"]
+    assert not speech_queue.claimed_items(spool)
+
+
+def test_dropped_items_are_removed(spoken):
+    speech_queue.enqueue_speech("stale", max_wait=-1, spawn_worker=False)
+    run_worker()
+    assert spoken == []
+    spool = speech_queue.get_spool_dir()
+    assert not speech_queue.pending_items(spool) and not speech_queue.claimed_items(spool)
+
+
+def test_status_check_does_not_take_the_worker_lock():
+    spool = speech_queue.get_spool_dir()
+    assert not speech_queue.is_worker_running()
+
+    # A status check in progress holds only the liveness lock
+    probe = os.open(spool / speech_queue.ALIVE_NAME, os.O_RDWR | os.O_CREAT)
+    fcntl.flock(probe, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    try:
+        worker = speech_queue._try_lock(spool)
+        assert worker is not None
+        speech_queue._release_lock(worker)
+    finally:
+        os.close(probe)
+
+    worker = speech_queue._try_lock(spool)
+    alive = speech_queue._mark_alive(spool)
+    try:
+        assert speech_queue.is_worker_running()
+    finally:
+        speech_queue._release_lock(alive)
+        speech_queue._release_lock(worker)
+    assert not speech_queue.is_worker_running()
@@ -0,0 +1,138 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+from lib import transcript_index
+from lib.deadline import Deadline, DeadlineExceeded
+from lib.transcript_index import TranscriptIndex, query_entries
+
+
+def line(role, text=None, tool=None):
+    content = [{"type": "tool_use", "id": "t", "name": tool, "input": {}}] if tool else text or role
+    return json.dumps({"type": role, "message": {"role": role, "content": content}}) + "\n"
+
+
+def append(path, *lines):
+    with open(path, "a") as f:
+        f.write("".join(lines))
+
+
+@pytest.fixture
+def transcript(tmp_path):
+    path = tmp_path / "session.jsonl"
+    append(path, line("user", "one"), line("assistant", tool="Bash"), line("user", "two"))
+    return path
+
+
+@pytest.fixture
+def decoded(monkeypatch):
+    """Count the lines the indexer decodes."""
+    calls = []
+    original = transcript_index.classify_entry
+
+    def counting(entry):
+        calls.append(entry)
+        return original(entry)
+    monkeypatch.setattr(transcript_index, "classify_entry", counting)
+    return calls
+
+
+def test_update_only_reads_appended_lines(transcript, decoded):
+    index = TranscriptIndex(str(transcript))
+    assert index.update() == 3
+    assert len(decoded) == 3
+
+    append(transcript, line("assistant", "three"))
+    assert index.update() == 4
+    assert len(decoded) == 4
+    assert TranscriptIndex(str(transcript)).update() == 4
+    assert len(decoded) == 4
+
+
+def test_partial_line_waits_for_its_newline(transcript):
+    index = TranscriptIndex(str(transcript))
+    partial = line("assistant", "late")
+    append(transcript, partial[:10])
+    assert index.update() == 3
+    append(transcript, partial[10:])
+    assert index.update() == 4
+    assert index.read_entry(index.query(limit=1)[0])["message"]["content"] == "late"
+
+
+def test_queries_by_role_and_tool(transcript):
+    index = TranscriptIndex(str(transcript))
+    assert [r.tool_name for r in index.query(tool_names=["Bash"])] == ["Bash"]
+    assert index.query(tool_names=["Edit"]) == []
+    assert [r.role for r in index.query(roles=["user"], limit=5)] == ["user", "user"]
+    assert [e["message"]["content"] for e in query_entries(str(transcript), limit=2, roles=["user"])] == \
+        ["one", "two"]
+
+
+def test_unknown_roles_match_nothing(transcript):
+    append(transcript, "not json\n")
+    index = TranscriptIndex(str(transcript))
+    assert index.query(roles=["usr"], limit=10) == []
+    assert [r.role for r in index.query(roles=["usr", "assistant"], limit=10)] == ["assistant"]
+
+
+def test_truncated_transcript_is_reindexed(transcript, decoded):
+    index = TranscriptIndex(str(transcript))
+    index.update()
+    with open(transcript, "r+") as f:
+        f.truncate(len(line("user", "one")))
+    assert index.update() == 1
+    assert index.query(tool_names=["Bash"]) == []
+
+
+def test_rotated_transcript_is_reindexed(transcript, tmp_path):
+    index = TranscriptIndex(str(transcript))
+    index.update()
+    replacement = tmp_path / "new.jsonl"
+    append(replacement, line("user", "fresh"), line("assistant", tool="Read"), line("user", "two"),
+           line("user", "four"))
+    os.replace(replacement, transcript)
+
+    assert index.update() == 4
+    assert [r.tool_name for r in index.query(tool_names=["Read", "Bash"])] == ["Read"]
+
+
+def test_rewritten_head_is_detected(transcript):
+    index = TranscriptIndex(str(transcript))
+    index.update()
+    content = transcript.read_bytes()
+    # Same inode and no shorter, but different contents up front
+    with open(transcript, "r+b") as f:
+        f.write(content.replace(b'"one"', b'"uno"'))
+    assert index.update() == 3
+    assert index.read_entry(index.query(roles=["user"], limit=5)[-1])["message"]["content"] == "uno"
+
+
+def test_deadline_keeps_progress(tmp_path):
+    path = tmp_path / "long.jsonl"
+    append(path, *(line("user", f"m{i}") for i in range(5000)))
+    index = TranscriptIndex(str(path))
+    with pytest.raises(DeadlineExceeded):
+        index.update(Deadline(0.01))
+    header = transcript_index.HEADER.unpack_from(index.index_path.read_bytes())
+    assert 0 < header[5] < 5000
+    assert index.update() == 5000
+
+
+def test_concurrent_updates_index_each_line_once(tmp_path):
+    path = tmp_path / "shared.jsonl"
+    append(path, *(line("user", f"m{i}") for i in range(3000)))
+    script = (f"import sys; sys.path.insert(0, {os.path.join(ROOT, 'dot-claude')!r})\n"
+              "from lib.transcript_index import TranscriptIndex\n"
+              f"print(TranscriptIndex({str(path)!r}).update())")
+    workers = [subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True)
+               for _ in range(4)]
+    counts = [int(worker.communicate(timeout=60)[0]) for worker in workers]
+    assert counts == [3000] * 4
+
+    index = TranscriptIndex(str(path))
+    offsets = [record.offset for record in index.query(limit=10000)]
+    assert len(offsets) == len(set(offsets)) == 3000
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from lib import tool_context_extractor
+from lib.deadline import Deadline, DeadlineExceeded
+from lib.transcript_parser import iter_lines_reverse
+from lib.transcript_records import TOOL_BLOCKS, RecordScan, iter_records
+
+
+def write_transcript(path, entries, partial=b""):
+    with open(path, "wb") as f:
+        for entry in entries:
+            f.write(json.dumps(entry).encode() + b"\n")
+        f.write(partial)
+
+
+ENTRIES = [
+    {"type": "user", "message": {"role": "user", "content": "hi"}},
+    {"type": "assistant", "message": {"role": "assistant", "content": [
+        {"type": "tool_use", "id": "t1", "name": "Bash", "input": {"command": "ls"}}]}},
+    {"type": "user", "message": {"role": "user", "content": "thanks"}},
+]
+
+
+def test_reverse_iteration_matches_forward_offsets(tmp_path):
+    path = tmp_path / "t.jsonl"
+    write_transcript(path, ENTRIES, partial=b'{"type": "assis')
+
+    forward = [record.offset for record in iter_records(str(path))]
+    backward = [record.offset for record in iter_records(str(path), reverse=True)]
+    assert len(forward) == 3
+    assert backward == forward[::-1]
+
+
+def test_reverse_filters_by_tool(tmp_path):
+    path = tmp_path / "t.jsonl"
+    write_transcript(path, ENTRIES)
+    records = list(iter_records(str(path), tool_names=["Bash"], reverse=True))
+    assert [record.tool_uses[0].name for record in records] == ["Bash"]
+
+
+def test_iter_lines_reverse_offsets(tmp_path):
+    path = tmp_path / "t.jsonl"
+    path.write_bytes(b"a\n\nbc\n")
+    assert list(iter_lines_reverse(str(path))) == [b"bc", b"a"]
+    assert list(iter_lines_reverse(str(path), with_offsets=True)) == [(3, b"bc"), (0, b"a")]
+
+
+def test_scan_resumes_after_partial_line(tmp_path):
+    path = tmp_path / "t.jsonl"
+    tail = json.dumps(ENTRIES[1]).encode() + b"\n"
+    write_transcript(path, ENTRIES, partial=tail[:10])
+
+    scan = RecordScan(str(path), blocks=TOOL_BLOCKS)
+    assert [record.tool_use.name for record in scan] == ["Bash"]
+    assert scan.lines == 3
+    assert scan.offset == path.stat().st_size - 10
+
+    with open(path, "ab") as f:
+        f.write(tail[10:])
+    resumed = RecordScan(str(path), blocks=TOOL_BLOCKS, start=scan.offset)
+    assert [record.offset for record in resumed] == [scan.offset]
+    assert resumed.offset == path.stat().st_size
+
+
+def test_scan_deadline_keeps_progress(tmp_path):
+    path = tmp_path / "t.jsonl"
+    write_transcript(path, ENTRIES * 40)
+
+    scan = RecordScan(str(path), blocks=TOOL_BLOCKS, deadline=Deadline(0))
+    seen = []
+    with pytest.raises(DeadlineExceeded):
+        for record in scan:
+            seen.append(record.offset)
+    assert 0 < scan.offset < path.stat().st_size
+    seen += [record.offset for record in RecordScan(str(path), blocks=TOOL_BLOCKS, start=scan.offset)]
+    assert seen == [record.offset for record in iter_records(str(path), tool_names=["Bash"])]
+
+
+def test_tool_result_counts(tmp_path):
+    path = tmp_path / "t.jsonl"
+    write_transcript(path, [{"type": "user", "message": {"role": "user", "content": [
+        {"type": "tool_result", "tool_use_id": "t1", "is_error": True,
+         "content": [{"type": "text", "text": "The user doesn't want to proceed with this tool use."}]},
+        {"type": "tool_result", "tool_use_id": "t2", "is_error": True, "content": "exit 1"},
+        {"type": "tool_result", "tool_use_id": "t3", "content": "ok"}]}}])
+
+    [record] = iter_records(str(path), blocks=["tool_result"])
+    assert (record.tool_results, record.errors, record.rejections) == (3, 2, 1)
+    assert list(iter_records(str(path), blocks=["tool_use"])) == []
+
+
+def test_find_recent_tool_use_without_index(tmp_path, monkeypatch):
+    path = tmp_path / "t.jsonl"
+    write_transcript(path, ENTRIES + [{"type": "user", "message": {"role": "user", "content": "x"}}] * 5)
+    monkeypatch.setattr(tool_context_extractor, "_find_recent_tool_use_indexed",
+                        lambda *args: 1 / 0)
+
+    found = tool_context_extractor.find_recent_tool_use(str(path), ["Bash"])
+    assert found == {"name": "Bash", "input": {"command": "ls"}, "id": "t1"}
+    assert tool_context_extractor.find_recent_tool_use(str(path), ["Bash"], max_messages=6) is None
+    assert tool_context_extractor.find_recent_tool_use(str(path), ["Read"]) is None
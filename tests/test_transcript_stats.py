@@ -0,0 +1,44 @@
+import importlib.util
+import json
+import os
+
+from conftest import ROOT
+
+spec = importlib.util.spec_from_file_location(
+    "transcript_stats", os.path.join(ROOT, "dot-claude", "tools", "transcript_stats.py"))
+transcript_stats = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(transcript_stats)
+
+
+def write_transcript(path, session_id, command):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entry = {"sessionId": session_id, "message": {"content": [
+        {"type": "tool_use", "name": "Bash", "input": {"command": command}}]}}
+    path.write_text(json.dumps(entry) + "\n")
+
+
+def test_narrow_root_keeps_other_projects_cached(tmp_path):
+    first = tmp_path / "projects" / "a" / "s1.jsonl"
+    second = tmp_path / "projects" / "b" / "s2.jsonl"
+    write_transcript(first, "s1", "git status")
+    write_transcript(second, "s2", "pytest -q")
+
+    cache = {}
+    everything = transcript_stats.scan(transcript_stats.find_transcripts(str(tmp_path / "projects")), cache, 1)
+    assert everything["scanned"] == 2
+
+    transcript_stats.scan(transcript_stats.find_transcripts(str(first.parent)), cache, 1)
+    assert set(cache) == {str(first), str(second)}
+
+    second.unlink()
+    transcript_stats.scan(transcript_stats.find_transcripts(str(first.parent)), cache, 1)
+    assert set(cache) == {str(first)}
+
+
+def test_reduce_counts_commands(tmp_path):
+    path = tmp_path / "s.jsonl"
+    write_transcript(path, "s", "git status")
+    result = transcript_stats.reduce_transcript(str(path))
+    assert result["session_id"] == "s"
+    assert result["tools"] == {"Bash": 1}
+    assert result["commands"] == {"git": 1}
@@ -0,0 +1,287 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from conftest import ROOT
+from lib import hook_events
+from lib.hook_events import HookInvocation, span, tag
+from lib.tts_backends import BackendRegistry, EngineBackend, TTSBackend
+from lib.tts_manager import PreparedAudio
+
+
+class ScriptedBackend(TTSBackend):
+    """In-process backend whose synthesis time and outcome are set by the test."""
+
+    def __init__(self, name, kind="local", latency_ms=100.0, delay=0.0,
+                 synthesizes=True, plays=True):
+        self.name = name
+        self.kind = kind
+        self.default_latency_ms = latency_ms
+        self.delay = delay
+        self.synthesizes = synthesizes
+        self.plays = plays
+        self.prepared = 0
+        self.played = 0
+        self.discarded = 0
+
+    def probe(self):
+        return {"available": True}
+
+    def prepare(self, text, voice, capability, player, cancel=None):
+        self.prepared += 1
+        if cancel is not None and cancel.wait(self.delay):
+            return None
+        if cancel is None:
+            time.sleep(self.delay)
+        if not self.synthesizes:
+            return None
+
+        def play():
+            self.played += 1
+            return self.plays
+
+        def discard():
+            self.discarded += 1
+        return PreparedAudio(play, discard, cancel=cancel or threading.Event())
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return BackendRegistry(state_path=str(tmp_path / "backends.json"))
+
+
+def test_playback_failure_moves_on_to_next_backend(registry):
+    silent = ScriptedBackend("silent", latency_ms=100, plays=False)
+    spoken = ScriptedBackend("spoken", latency_ms=200)
+    registry.register(silent)
+    registry.register(spoken)
+
+    assert registry.speak("hello", hedge=False)
+    assert (silent.played, spoken.played) == (1, 1)
+
+
+def test_forced_backend_playback_failure(registry):
+    silent = ScriptedBackend("silent", plays=False)
+    spoken = ScriptedBackend("spoken", latency_ms=200)
+    registry.register(silent)
+    registry.register(spoken)
+
+    assert not registry.speak("hello", backend="silent")
+    assert spoken.prepared == 0
+
+
+def test_playback_failure_after_hedged_win(registry):
+    remote = ScriptedBackend("remote", kind="remote", latency_ms=100, plays=False)
+    local = ScriptedBackend("local", latency_ms=200, delay=0.2)
+    registry.register(remote)
+    registry.register(local)
+
+    assert registry.speak("hello")
+    assert (remote.played, local.played) == (1, 1)
+
+
+class FlakyRemote(ScriptedBackend):
+    """Remote backend that hangs, then fails with an error reason."""
+
+    def __init__(self, breaker, **kwargs):
+        super().__init__("remote", kind="remote", latency_ms=100, **kwargs)
+        self.breaker = breaker
+        self.reason = None
+
+    def failure_reason(self):
+        return self.reason
+
+    def prepare(self, text, voice, capability, player, cancel=None):
+        self.reason = None
+        self.prepared += 1
+        # A blocking request does not notice the cancel
+        time.sleep(self.delay)
+        self.reason = "HTTP 500"
+        return None
+
+
+def test_failure_after_losing_race_counts_against_breaker(registry, tmp_path, monkeypatch):
+    from lib.circuit_breaker import CircuitBreaker
+    monkeypatch.setenv("CLAUDE_TTS_HEDGE_DELAY_MS", "20")
+    breaker = CircuitBreaker("remote", state_path=str(tmp_path / "breakers.json"))
+    remote = FlakyRemote(breaker, delay=0.3)
+    local = ScriptedBackend("local", latency_ms=200, delay=0.05)
+    registry.register(remote)
+    registry.register(local)
+
+    assert registry.speak("hello")
+    assert local.played == 1 and remote.played == 0
+    deadline = time.monotonic() + 5
+    while breaker.status().get("failures", 0) == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert breaker.status()["failures"] == 1
+
+
+def test_cancelled_call_gives_no_verdict(registry, tmp_path, monkeypatch):
+    from lib.circuit_breaker import CircuitBreaker
+    monkeypatch.setenv("CLAUDE_TTS_HEDGE_DELAY_MS", "20")
+    breaker = CircuitBreaker("slow", state_path=str(tmp_path / "breakers.json"))
+    slow = ScriptedBackend("slow", kind="remote", latency_ms=100, delay=5)
+    slow.breaker = breaker
+    local = ScriptedBackend("local", latency_ms=200, delay=0.05)
+    registry.register(slow)
+    registry.register(local)
+
+    assert registry.speak("hello")
+    time.sleep(0.1)
+    assert breaker.status() == {"state": "closed", "failures": 0}
+
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    """A PATH where espeak-ng and pico2wave are bench/fake_tts_engine.py."""
+    import os
+    from conftest import BENCH_DIR
+    from lib import audio_sink
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name in ("espeak-ng", "pico2wave"):
+        (bin_dir / name).symlink_to(os.path.join(BENCH_DIR, "fake_tts_engine.py"))
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_TTS_LOG", str(tmp_path / "engine.jsonl"))
+
+    sink = audio_sink.FakeSink()
+    monkeypatch.setattr(audio_sink, "_sink", sink)
+    monkeypatch.setattr(audio_sink, "_sink_resolved", True)
+    return bin_dir, sink
+
+
+def engine_calls(tmp_path):
+    import json
+    path = tmp_path / "engine.jsonl"
+    return [json.loads(line)["engine"] for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def local_registry(tmp_path):
+    from lib.tts_backends import EspeakBackend, Pico2WaveBackend
+    registry = BackendRegistry(state_path=str(tmp_path / "backends.json"))
+    registry.register(EspeakBackend())
+    registry.register(Pico2WaveBackend())
+    return registry
+
+
+def test_fastest_available_engine_speaks(engines, tmp_path):
+    _, sink = engines
+    registry = local_registry(tmp_path)
+    assert registry.candidates() == ["espeak-ng", "pico2wave"]
+
+    assert registry.speak("hello")
+    assert engine_calls(tmp_path) == ["espeak-ng"]
+    assert len(sink.plays) == 1 and sink.plays[0]["rate"] == 16000
+    assert len(registry._load()["latency"]["espeak-ng"]) == 1
+
+
+def test_measured_latency_reorders_candidates(engines, tmp_path):
+    registry = local_registry(tmp_path)
+    for _ in range(3):
+        registry.record_latency("pico2wave", 50.0)
+    assert registry.candidates() == ["pico2wave", "espeak-ng"]
+
+
+def test_failing_engine_falls_back(engines, tmp_path):
+    bin_dir, sink = engines
+    (bin_dir / "espeak-ng").unlink()
+    (bin_dir / "espeak-ng").write_text("#!/bin/sh\nexit 1\n")
+    (bin_dir / "espeak-ng").chmod(0o755)
+    registry = local_registry(tmp_path)
+
+    assert registry.speak("hello")
+    assert engine_calls(tmp_path) == ["pico2wave"]
+    assert len(sink.plays) == 1
+
+
+def test_missing_engine_is_not_a_candidate(engines, tmp_path):
+    bin_dir, _ = engines
+    (bin_dir / "pico2wave").unlink()
+    registry = local_registry(tmp_path)
+    report = {row["name"]: row for row in registry.report()["backends"]}
+    assert report["espeak-ng"]["available"] and not report["pico2wave"]["available"]
+    assert registry.candidates() == ["espeak-ng"]
+
+
+def test_hedge_win_and_loss_counts(registry, monkeypatch):
+    monkeypatch.setenv("CLAUDE_TTS_HEDGE_DELAY_MS", "20")
+    remote = ScriptedBackend("remote", kind="remote", latency_ms=100, delay=5)
+    # Slow enough that its measured latency keeps it behind remote
+    local = ScriptedBackend("local", latency_ms=200, delay=0.15)
+    registry.register(remote)
+    registry.register(local)
+
+    assert registry.hedge_pair(registry.candidates()) == ("remote", "local")
+    assert registry.speak("one") and registry.speak("two")
+    rows = {row["name"]: row for row in registry.report(refresh=False)["backends"]}
+    assert (rows["local"]["hedge_wins"], rows["local"]["hedge_losses"]) == (2, 0)
+    assert (rows["remote"]["hedge_wins"], rows["remote"]["hedge_losses"]) == (0, 2)
+    assert local.played == 2 and remote.played == 0
+
+
+def test_fast_primary_does_not_hedge(registry, monkeypatch):
+    monkeypatch.setenv("CLAUDE_TTS_HEDGE_DELAY_MS", "500")
+    remote = ScriptedBackend("remote", kind="remote", latency_ms=100)
+    local = ScriptedBackend("local", latency_ms=200)
+    registry.register(remote)
+    registry.register(local)
+
+    assert registry.speak("hello")
+    assert local.prepared == 0
+    assert "hedge" not in registry._load()
+
+
+class TaggingBackend(ScriptedBackend):
+    """ScriptedBackend that times and tags its synthesis like the real engines."""
+
+    def prepare(self, text, voice, capability, player, cancel=None):
+        with span(f"{self.name}_synthesis"):
+            tag(engine=self.name)
+            return super().prepare(text, voice, capability, player, cancel)
+
+
+def test_race_keeps_the_winners_spans_and_tags(registry, monkeypatch):
+    monkeypatch.setenv("CLAUDE_TTS_HEDGE_DELAY_MS", "20")
+    records = []
+    monkeypatch.setattr(hook_events, "emit_event",
+                        lambda hook, outcome, data=None, error=None, **fields: records.append(fields))
+    registry.register(TaggingBackend("remote", kind="remote", latency_ms=100, delay=5))
+    registry.register(TaggingBackend("local", latency_ms=200, delay=0.1))
+
+    with HookInvocation("stop", {}):
+        assert registry.prepare("hello").backend == "local"
+
+    [fields] = records
+    assert fields["engine"] == "local" and fields["backend"] == "local"
+    assert fields["hedge"] == "fired"
+    assert set(fields["timings"]) == {"synthesize", "local_synthesis"}
+
+
+def test_state_updates_from_concurrent_processes_are_not_lost(tmp_path):
+    state_path = str(tmp_path / "backends.json")
+    script = (f"import sys; sys.path.insert(0, {os.path.join(ROOT, 'dot-claude')!r})\n"
+              "from lib.tts_backends import BackendRegistry\n"
+              f"registry = BackendRegistry(state_path={state_path!r})\n"
+              "for i in range(50):\n"
+              "    registry.record_race('local', ['remote'])\n"
+              "    registry.record_latency('local', 100.0)\n")
+    workers = [subprocess.Popen([sys.executable, "-c", script]) for _ in range(4)]
+    assert all(worker.wait(timeout=60) == 0 for worker in workers)
+
+    state = BackendRegistry(state_path=state_path)._load()
+    assert state["hedge"] == {"local": {"wins": 200, "losses": 0}, "remote": {"wins": 0, "losses": 200}}
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
+
+
+def test_engine_backends_must_build_a_command():
+    class NoCommand(EngineBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        NoCommand()
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+from lib import tts_cache
+from lib.tts_cache import TTSCache
+
+
+def test_hits_misses_and_eviction(tmp_path):
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=250)
+    assert cache.get("hello", "alloy", "tts-1", "mp3") is None
+    assert cache.put("hello", "alloy", "tts-1", "mp3", b"a" * 100)
+    assert cache.get("hello", "alloy", "tts-1", "mp3") is not None
+
+    cache.put("two", "alloy", "tts-1", "mp3", b"b" * 100)
+    os.utime(cache.path_for(cache.make_key("two", "alloy", "tts-1", "mp3"), "mp3"), (1, 1))
+    cache.put("three", "alloy", "tts-1", "mp3", b"c" * 100)
+    assert not cache.contains("two", "alloy", "tts-1", "mp3")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 2)
+
+
+def test_counts_from_concurrent_processes_are_not_lost(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    script = (f"import sys; sys.path.insert(0, {os.path.join(ROOT, 'dot-claude')!r})\n"
+              "from lib.tts_cache import TTSCache\n"
+              f"cache = TTSCache({cache_dir!r})\n"
+              "for i in range(200):\n"
+              "    cache.get('missing', 'alloy', 'tts-1', 'mp3')\n"
+              "    if i % 50 == 0:\n"
+              "        cache.stats()\n")
+    workers = [subprocess.Popen([sys.executable, "-c", script]) for _ in range(4)]
+    assert all(worker.wait(timeout=60) == 0 for worker in workers)
+    assert TTSCache(cache_dir).stats()["misses"] == 800
+
+
+def test_counts_file_is_restarted_when_large(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_cache, "MAX_COUNTS_BYTES", 10)
+    cache = TTSCache(str(tmp_path / "cache"))
+    for _ in range(12):
+        cache.get("missing", "alloy", "tts-1", "mp3")
+    assert cache.stats()["misses"] == 12
+    assert not (tmp_path / "cache" / tts_cache.COUNTS_FILE).exists()
+
+    cache.get("missing", "alloy", "tts-1", "mp3")
+    assert cache.stats()["misses"] == 13
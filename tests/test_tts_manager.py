@@ -0,0 +1,68 @@
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+
+from lib import tts_manager
+from lib.audio_sink import AudioSink
+
+# Reads nothing and never finishes on its own, like a player stuck on a long clip
+STALLED_PLAYER = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+class FakeResponse:
+    def __init__(self):
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+
+def cancel_after(seconds):
+    cancel = threading.Event()
+    threading.Timer(seconds, cancel.set).start()
+    return cancel
+
+
+def test_pipe_to_player_cancel_kills_player():
+    response = FakeResponse()
+    # Far more than the pipe buffer, so writes block until the player is killed
+    rest = iter([b"\x00" * 4096] * 10000)
+    started = time.monotonic()
+    assert tts_manager._pipe_to_player(response, b"\x00", rest, STALLED_PLAYER, cancel_after(0.2)) is None
+    assert time.monotonic() - started < 2
+    assert response.closed
+
+
+def test_play_audio_file_cancel_kills_player(tmp_path, monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+    monkeypatch.setattr(tts_manager, "get_stream_player", lambda: STALLED_PLAYER)
+    audio = tmp_path / "clip.mp3"
+    audio.write_bytes(b"\x00" * 1024)
+
+    started = time.monotonic()
+    assert tts_manager._play_audio_file(str(audio), cancel_after(0.2)) is False
+    assert tts_manager._play_audio_bytes(b"\x00" * 1024, cancel_after(0.2)) is False
+    assert time.monotonic() - started < 2
+
+
+def test_play_audio_file_without_cancel(tmp_path, monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+    monkeypatch.setattr(tts_manager, "get_stream_player",
+                        lambda: [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"])
+    audio = tmp_path / "clip.mp3"
+    audio.write_bytes(b"\x00" * 1024)
+    assert tts_manager._play_audio_file(str(audio)) is True
+
+
+def test_audio_sink_requires_play_stream():
+    class Incomplete(AudioSink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()